@@ -1,6 +1,9 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory, session
+from flask import Flask, Blueprint, current_app, g, has_request_context, request, jsonify, render_template, send_from_directory, session, Response, stream_with_context, url_for
 from flask_cors import CORS
+from jinja2 import FileSystemBytecodeCache
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from datetime import datetime, timedelta
@@ -8,12 +11,44 @@ import os
 import requests
 import uuid
 import json
+import base64
 import random
+from collections import OrderedDict, deque
 from datetime import date
 from dotenv import load_dotenv
 import webbrowser
 import threading
 import time
+import queue
+import atexit
+import zlib
+import gzip
+import hashlib
+import hmac
+import contextlib
+import io
+import cProfile
+import pstats
+import functools
+import math
+import multiprocessing
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import re
+import html
+import unicodedata
+import click
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Load environment variables
 load_dotenv()
@@ -150,8 +185,18 @@ class TranslationManager:
         """Get list of available language codes"""
         return list(self.translations.keys())
 
-# Initialize translation manager (will be set later)
+# Loaded on first use (see get_translation_manager)
 translation_manager = None
+_translation_lock = threading.Lock()
+
+def get_translation_manager():
+    """Return the translation manager, loading translation files on first use"""
+    global translation_manager
+    if translation_manager is None:
+        with _translation_lock:
+            if translation_manager is None:
+                translation_manager = TranslationManager(current_app._get_current_object())
+    return translation_manager
 
 # ========== LANGUAGE DETECTION HELPERS ==========
 def detect_browser_language(request):
@@ -223,65 +268,85 @@ def get_user_language_from_request(request):
     return 'en'
 
 # ========== FLASK APP INITIALIZATION ==========
-app = Flask(__name__, 
-            static_folder='static',
-            template_folder='templates')
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Session configuration for Flask-Login
-app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
-app.config['SESSION_COOKIE_HTTPONLY'] = True
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
-app.config['REMEMBER_COOKIE_DURATION'] = timedelta(days=30)
-
-# Initialize extensions
-db = SQLAlchemy(app)
-bcrypt = Bcrypt(app)
+# Extensions are created unbound and attached to an app in create_app(), so
+# importing this module has no side effects.
+db = SQLAlchemy()
+bcrypt = Bcrypt()
 
 # Configure Flask-Login
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
+login_manager.login_view = 'main.login'
 login_manager.session_protection = "strong"
 
-# Configure CORS properly
-CORS(app, 
-     resources={r"/*": {
-         "origins": ["http://localhost:5500", "http://127.0.0.1:5500", 
-                    "http://localhost:3000", "http://127.0.0.1:3000",
-                    "http://localhost:8080", "http://127.0.0.1:8080",
-                    "http://localhost:5000", "http://127.0.0.1:5000"],
-         "supports_credentials": True,
-         "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Accept"],
-         "expose_headers": ["Set-Cookie", "Content-Type", "Authorization"],
-         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
-     }},
-     supports_credentials=True)
+# All routes, hooks and CLI commands are registered on this blueprint
+bp = Blueprint('main', __name__, cli_group=None)
+
+def get_default_config():
+    """Default configuration, read from the environment"""
+    return {
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production'),
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///users.db',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        
+        # Session configuration for Flask-Login
+        'SESSION_COOKIE_SAMESITE': 'Lax',
+        'SESSION_COOKIE_SECURE': False,  # Set to True in production with HTTPS
+        'SESSION_COOKIE_HTTPONLY': True,
+        'PERMANENT_SESSION_LIFETIME': timedelta(hours=24),
+        'REMEMBER_COOKIE_DURATION': timedelta(days=30),
+        
+        # Password hashing cost (2^rounds iterations); existing hashes are migrated on login
+        'BCRYPT_LOG_ROUNDS': int(os.environ.get('BCRYPT_LOG_ROUNDS', 12)),
+        
+        # Create tables and apply pending migrations when the app is created
+        'AUTO_MIGRATE': True,
+        
+        # SQL statements slower than this are logged with their parameters
+        'DB_SLOW_QUERY_MS': float(os.environ.get('DB_SLOW_QUERY_MS', 200)),
+        
+        # Add X-DB-Queries / X-DB-Time to every response (off in production)
+        'DB_QUERY_HEADERS': os.environ.get('APP_ENV', 'development') != 'production',
+        
+        # Where compiled templates are cached (empty to disable)
+        'JINJA_BYTECODE_CACHE_DIR': os.environ.get(
+            'JINJA_BYTECODE_CACHE_DIR',
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'jinja_cache')
+        )
+    }
 
 # ========== API CONFIGURATION ==========
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
-if not GROQ_API_KEY:
-    print("⚠️  WARNING: GROQ_API_KEY environment variable not set!")
-    print("⚠️  Chat functionality will not work without API key")
-    print("⚠️  Set it in .env file: GROQ_API_KEY='your-key-here'")
-
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = os.environ.get('GROQ_MODEL', 'llama-3.1-8b-instant')
+
+# Pooled HTTP session for Groq, created on first use
+_llm_session = None
+_llm_session_lock = threading.Lock()
+
+def get_llm_session():
+    """Return the shared HTTP session used for LLM calls"""
+    global _llm_session
+    if _llm_session is None:
+        with _llm_session_lock:
+            if _llm_session is None:
+                llm_session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                llm_session.mount('https://', adapter)
+                _llm_session = llm_session
+    return _llm_session
 
 # ========== WEBSITE ROUTES ==========
-@app.route('/')
+@bp.route('/')
 def index():
     """Serve the main index page"""
-    return render_template('index.html')
+    return render_page('index.html')
 
-@app.route('/weather')
+@bp.route('/weather')
 def weather_page():
     """Serve the weather page"""
-    return render_template('weather.html')
+    return render_page('weather.html')
 
-@app.route('/<page_name>')
+@bp.route('/<page_name>')
 def serve_page(page_name):
     """Serve other HTML pages"""
     # List of valid HTML pages
@@ -293,36 +358,103 @@ def serve_page(page_name):
     
     if page_name in valid_pages:
         try:
-            return render_template(f'{page_name}.html')
+            return render_page(f'{page_name}.html')
         except:
             return "Page not found", 404
     else:
         # Try with .html extension
         if page_name.endswith('.html') and page_name.replace('.html', '') in valid_pages:
             try:
-                return render_template(page_name)
+                return render_page(page_name)
             except:
                 return "Page not found", 404
     
     return "Page not found", 404
 
-@app.route('/static/<path:filename>')
+# ========== STATIC ASSETS ==========
+# Page CSS/JS live in static/src and are built into fingerprinted bundles under
+# static/dist by build_assets.py. A bundle's URL changes whenever its content
+# does, so bundles are cached for a year; other files revalidate after
+# STATIC_MAX_AGE seconds.
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 3600))
+ASSET_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+ASSET_DIST_PREFIX = 'dist/'
+ASSET_MANIFEST_FILE = os.path.join(STATIC_FOLDER, 'dist', 'manifest.json')
+I18N_KEY_PATTERN = re.compile(r'\bI18N\.([A-Za-z0-9_]+)')
+PRECOMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+_asset_manifest = None
+_asset_i18n_keys = {}
+
+def get_asset_manifest():
+    """Load the build manifest once; empty if the assets were not built"""
+    global _asset_manifest
+    if _asset_manifest is None:
+        try:
+            with open(ASSET_MANIFEST_FILE) as f:
+                _asset_manifest = json.load(f)
+        except FileNotFoundError:
+            _asset_manifest = {}
+    return _asset_manifest
+
+@bp.app_template_global()
+def asset_url(path):
+    """URL of a page asset: the built bundle, or the source if not built"""
+    built = get_asset_manifest().get(path)
+    if built:
+        return url_for('main.serve_static', filename=built)
+    source = os.path.join(STATIC_FOLDER, 'src', path)
+    return url_for('main.serve_static', filename=f'src/{path}', v=int(os.path.getmtime(source)))
+
+@bp.app_template_global()
+def asset_translations(path, lang):
+    """Translations a page script reads as I18N.<key>, to inline as JSON"""
+    source = os.path.join(STATIC_FOLDER, 'src', path)
+    mtime = os.path.getmtime(source)
+    cached = _asset_i18n_keys.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(source, encoding='utf-8') as f:
+            cached = (mtime, sorted(set(I18N_KEY_PATTERN.findall(f.read()))))
+        _asset_i18n_keys[path] = cached
+    get_text = get_translation_manager().get_text
+    return {key: get_text(key, lang) for key in cached[1]}
+
+@bp.route('/static/<path:filename>')
 def serve_static(filename):
-    """Serve static files"""
-    return send_from_directory(app.static_folder, filename)
+    """Serve static files; fingerprinted bundles are immutable and precompressed"""
+    if not filename.startswith(ASSET_DIST_PREFIX) or filename.endswith('manifest.json'):
+        return send_from_directory(STATIC_FOLDER, filename, max_age=STATIC_MAX_AGE)
+    
+    available = [encoding for encoding, suffix in PRECOMPRESSED_SUFFIXES.items()
+                 if os.path.isfile(os.path.join(STATIC_FOLDER, filename + suffix))]
+    encoding = request.accept_encodings.best_match(available) if available else None
+    if encoding:
+        response = send_from_directory(STATIC_FOLDER, filename + PRECOMPRESSED_SUFFIXES[encoding],
+                                       mimetype=mimetypes.guess_type(filename)[0],
+                                       max_age=ASSET_IMMUTABLE_MAX_AGE)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(STATIC_FOLDER, filename, max_age=ASSET_IMMUTABLE_MAX_AGE)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@bp.cli.command('build-assets')
+def build_assets_command():
+    """Minify and fingerprint page CSS/JS into static/dist"""
+    from build_assets import build_assets
+    manifest = build_assets(STATIC_FOLDER)
+    print(f"✓ Built {len(manifest)} asset bundle(s)")
 
 # ========== LOAD DISTRICTS DATA ==========
+DISTRICTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'districts.json')
+
 def load_districts_data():
     """Load districts data from JSON file"""
     try:
-        with open('districts.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Convert to state->districts mapping
         state_districts = {}
-        for item in data:
-            state = item['state']
-            district = item['district']
+        for (state, district) in get_district_coordinates():
             if state not in state_districts:
                 state_districts[state] = []
             state_districts[state].append(district)
@@ -341,7 +473,102 @@ def load_districts_data():
         print(f"Error loading districts data: {e}")
         return {}
 
-stateDistricts = load_districts_data()
+# Gazetteer data is loaded once, on first use (or preloaded, see preload_shared_data)
+_district_coordinates = None
+_state_districts = None
+# Reentrant: get_state_districts loads through get_district_coordinates
+_districts_lock = threading.RLock()
+
+def get_district_coordinates():
+    """
+    Return {(state, district): (lat, lon)} from districts.json, loaded on first use.
+    Raises FileNotFoundError if the file is missing.
+    """
+    global _district_coordinates
+    if _district_coordinates is None:
+        with _districts_lock:
+            if _district_coordinates is None:
+                with open(DISTRICTS_FILE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                _district_coordinates = {
+                    (item['state'], item['district']): (item.get('lat'), item.get('lon'))
+                    for item in data
+                }
+    return _district_coordinates
+
+def get_state_districts():
+    """Return the state -> districts mapping, loaded on first use"""
+    global _state_districts
+    if _state_districts is None:
+        with _districts_lock:
+            if _state_districts is None:
+                _state_districts = load_districts_data()
+    return _state_districts
+
+def preload_shared_data(app):
+    """
+    Load translations and districts data now instead of on first use. Called in
+    the gunicorn master so the preloaded copies are shared with every worker.
+    """
+    with app.app_context():
+        get_translation_manager()
+        get_state_districts()
+        try:
+            get_district_coordinates()
+        except FileNotFoundError:
+            pass
+
+# ========== PASSWORD HASHING ==========
+# bcrypt runs on a small dedicated pool so signup/login bursts cannot use every
+# CPU; requests wait for a slot and get a 503 if the backlog is full. The pool
+# is per process, but every hash also takes one of BCRYPT_MAX_CONCURRENT slots of
+# a semaphore created at import: with gunicorn's preload it is created in the
+# master and shared by all forked workers, bounding hashes server-wide.
+BCRYPT_WORKERS = max(1, int(os.environ.get('BCRYPT_WORKERS', 2)))
+BCRYPT_MAX_CONCURRENT = max(1, int(os.environ.get('BCRYPT_MAX_CONCURRENT', os.cpu_count() or 2)))
+BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', 64))
+BCRYPT_QUEUE_TIMEOUT = float(os.environ.get('BCRYPT_QUEUE_TIMEOUT', 10))
+
+class HashingBusyError(Exception):
+    """Raised when the password hashing pool is saturated"""
+
+class BoundedExecutor:
+    """
+    Thread pool that limits how much work may be queued. If run_slots (e.g. a
+    process-shared semaphore) is given, each task also holds one while running.
+    """
+    def __init__(self, max_workers, max_pending, name, run_slots=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._run_slots = run_slots
+
+    def _call(self, fn, *args):
+        if self._run_slots is None:
+            return fn(*args)
+        with self._run_slots:
+            return fn(*args)
+
+    def run(self, fn, *args, timeout=None):
+        """Run fn(*args) on the pool and wait for the result"""
+        if not self._slots.acquire(timeout=timeout):
+            raise HashingBusyError('Password hashing queue is full')
+        try:
+            future = self._executor.submit(self._call, fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+bcrypt_executor = BoundedExecutor(BCRYPT_WORKERS, BCRYPT_MAX_PENDING, 'bcrypt',
+                                  run_slots=multiprocessing.BoundedSemaphore(BCRYPT_MAX_CONCURRENT))
+
+def get_bcrypt_cost(password_hash):
+    """Read the cost factor from a '$2b$12$...' hash, or None if unparseable"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
 
 # ========== USER MODEL ==========
 class User(db.Model, UserMixin):
@@ -371,12 +598,27 @@ class User(db.Model, UserMixin):
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
     last_weather_fetch = db.Column(db.DateTime, nullable=True)
+    
+    # Chat counters, maintained with every chat write (see stage_chat_turn)
+    message_count = db.Column(db.Integer, default=0, nullable=False)
+    session_count = db.Column(db.Integer, default=0, nullable=False)
+    last_activity = db.Column(db.DateTime, nullable=True)
 
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        password_hash = bcrypt_executor.run(
+            bcrypt.generate_password_hash, password, current_app.config['BCRYPT_LOG_ROUNDS'],
+            timeout=BCRYPT_QUEUE_TIMEOUT
+        )
+        self.password_hash = password_hash.decode('utf-8')
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return bcrypt_executor.run(
+            bcrypt.check_password_hash, self.password_hash, password, timeout=BCRYPT_QUEUE_TIMEOUT
+        )
+
+    def needs_rehash(self):
+        """True if the stored hash uses a different cost than BCRYPT_LOG_ROUNDS"""
+        return get_bcrypt_cost(self.password_hash) != current_app.config['BCRYPT_LOG_ROUNDS']
 
     def to_dict(self):
         return {
@@ -407,8 +649,12 @@ class ChatSession(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    message_count = db.Column(db.Integer, default=0, nullable=False)
     
-    __table_args__ = (db.UniqueConstraint('session_id', 'user_id', name='unique_user_session'),)
+    __table_args__ = (
+        db.UniqueConstraint('session_id', 'user_id', name='unique_user_session'),
+        db.Index('ix_chat_session_user_updated', 'user_id', 'updated_at'),
+    )
 
 class ChatMessage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -419,22 +665,1112 @@ class ChatMessage(db.Model):
     language = db.Column(db.String(10), default='en')
     was_spoken = db.Column(db.Boolean, default=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_chat_message_session_user_ts', 'session_id', 'user_id', 'timestamp'),
+        db.Index('ix_chat_message_user_ts', 'user_id', 'timestamp'),
+    )
+
+class ChatArchive(db.Model):
+    """Compressed cold-storage copy of an idle session's messages"""
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(100), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    codec = db.Column(db.String(10), nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)
+    message_count = db.Column(db.Integer, nullable=False)
+    first_timestamp = db.Column(db.DateTime, nullable=True)
+    last_timestamp = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.UniqueConstraint('session_id', 'user_id', name='unique_archived_session'),)
+
+class GuestChatSession(db.Model):
+    """Guest conversations live outside chat_message and expire after GUEST_CHAT_TTL_HOURS"""
+    session_id = db.Column(db.String(100), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_activity = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class GuestChatMessage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(100), nullable=False)
+    role = db.Column(db.String(20), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    language = db.Column(db.String(10), default='en')
+    was_spoken = db.Column(db.Boolean, default=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('ix_guest_chat_message_session_ts', 'session_id', 'timestamp'),)
+
+# ========== SCHEMA MIGRATIONS ==========
+# db.create_all() only creates missing tables, so changes to existing tables
+# are applied here. Each migration runs once and is recorded in schema_migration.
+class SchemaMigration(db.Model):
+    version = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class MigrationSkipped(Exception):
+    """Raised by a step that cannot run here; the migration stays pending and is retried"""
+
+MIGRATIONS = [
+    ('0001_chat_message_indexes', [
+        "CREATE INDEX IF NOT EXISTS ix_chat_message_session_user_ts "
+        "ON chat_message (session_id, user_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_chat_message_user_ts "
+        "ON chat_message (user_id, timestamp)"
+    ]),
+    ('0002_chat_session_indexes', [
+        "CREATE INDEX IF NOT EXISTS ix_chat_session_user_updated "
+        "ON chat_session (user_id, updated_at)"
+    ]),
+    ('0003_chat_counters', [
+        lambda: add_column_if_missing('user', 'message_count', 'INTEGER NOT NULL DEFAULT 0'),
+        lambda: add_column_if_missing('user', 'session_count', 'INTEGER NOT NULL DEFAULT 0'),
+        lambda: add_column_if_missing('user', 'last_activity', 'DATETIME'),
+        lambda: add_column_if_missing('chat_session', 'message_count', 'INTEGER NOT NULL DEFAULT 0'),
+        lambda: backfill_chat_counters()
+    ]),
+    ('0004_chat_search_index', [
+        lambda: require_chat_search_index()
+    ]),
+    ('0005_move_guest_chats', [
+        """INSERT INTO guest_chat_session (session_id, created_at, last_activity)
+           SELECT session_id, MIN(timestamp), MAX(timestamp) FROM chat_message
+           WHERE user_id IS NULL GROUP BY session_id""",
+        """INSERT INTO guest_chat_message (session_id, role, content, language, was_spoken, timestamp)
+           SELECT session_id, role, content, language, was_spoken, timestamp FROM chat_message
+           WHERE user_id IS NULL ORDER BY timestamp, id""",
+        "DELETE FROM chat_message WHERE user_id IS NULL",
+        # Archived guest sessions are long past the guest TTL
+        "DELETE FROM chat_archive WHERE user_id IS NULL"
+    ]),
+    # Rebuild the index with a tokenizer that keeps Indic vowel signs and viramas
+    ('0006_chat_search_tokenizer', [
+        "DROP TABLE IF EXISTS chat_message_fts",
+        lambda: require_chat_search_index()
+    ]),
+]
+
+def create_chat_search_index():
+    """
+    Create the FTS5 index over chat_message plus the triggers that keep it in
+    sync. user_id is indexed as a token so searches are scoped inside MATCH.
+    Combining marks (category M) are token characters, so Devanagari, Telugu,
+    Tamil etc. words are not split at vowel signs and viramas.
+    Returns False if this SQLite has no FTS5.
+    """
+    try:
+        db.session.execute(db.text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chat_message_fts USING fts5("
+            "content, user_id, content='chat_message', content_rowid='id', "
+            "tokenize=\"unicode61 remove_diacritics 2 categories 'L* N* M* Co'\")"
+        ))
+    except Exception as e:
+        print(f"⚠️  SQLite FTS5 unavailable, chat search disabled: {e}")
+        return False
+    
+    db.session.execute(db.text("""
+        CREATE TRIGGER IF NOT EXISTS chat_message_fts_insert AFTER INSERT ON chat_message BEGIN
+            INSERT INTO chat_message_fts(rowid, content, user_id)
+            VALUES (new.id, new.content, new.user_id);
+        END
+    """))
+    db.session.execute(db.text("""
+        CREATE TRIGGER IF NOT EXISTS chat_message_fts_delete AFTER DELETE ON chat_message BEGIN
+            INSERT INTO chat_message_fts(chat_message_fts, rowid, content, user_id)
+            VALUES ('delete', old.id, old.content, old.user_id);
+        END
+    """))
+    db.session.execute(db.text("""
+        CREATE TRIGGER IF NOT EXISTS chat_message_fts_update AFTER UPDATE ON chat_message BEGIN
+            INSERT INTO chat_message_fts(chat_message_fts, rowid, content, user_id)
+            VALUES ('delete', old.id, old.content, old.user_id);
+            INSERT INTO chat_message_fts(rowid, content, user_id)
+            VALUES (new.id, new.content, new.user_id);
+        END
+    """))
+    db.session.execute(db.text("INSERT INTO chat_message_fts(chat_message_fts) VALUES ('rebuild')"))
+    return True
+
+def require_chat_search_index():
+    """Migration step: build the search index, or leave the migration pending without FTS5"""
+    if not create_chat_search_index():
+        raise MigrationSkipped('SQLite FTS5 unavailable')
+
+def chat_search_available():
+    return db.session.execute(db.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chat_message_fts'"
+    )).first() is not None
+
+def add_column_if_missing(table, column, ddl):
+    """Add a column to an existing table unless it is already there"""
+    columns = {c['name'] for c in db.inspect(db.engine).get_columns(table)}
+    if column not in columns:
+        db.session.execute(db.text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+
+def run_migrations():
+    """Apply pending schema migrations in order, one transaction each"""
+    applied = {m.version for m in SchemaMigration.query.all()}
+    pending = [(version, steps) for version, steps in MIGRATIONS if version not in applied]
+    skipped = set()
+    
+    for version, steps in pending:
+        try:
+            for step in steps:
+                if callable(step):
+                    step()
+                else:
+                    db.session.execute(db.text(step))
+            db.session.add(SchemaMigration(version=version))
+            db.session.commit()
+            print(f"✓ Applied migration: {version}")
+        except MigrationSkipped as e:
+            db.session.rollback()
+            skipped.add(version)
+            print(f"⚠️  Skipped migration {version} ({e}); it will be retried on the next start")
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Migration {version} failed: {e}")
+            raise
+    
+    return [version for version, _ in pending if version not in skipped]
+
+def backfill_chat_counters():
+    """Recompute the denormalized chat counters from the chat tables (no commit)"""
+    db.session.execute(db.text("""
+        UPDATE chat_session SET message_count = (
+            SELECT COUNT(*) FROM chat_message
+            WHERE chat_message.session_id = chat_session.session_id
+              AND chat_message.user_id = chat_session.user_id
+        ) + (
+            SELECT COALESCE(SUM(message_count), 0) FROM chat_archive
+            WHERE chat_archive.session_id = chat_session.session_id
+              AND chat_archive.user_id = chat_session.user_id
+        )
+    """))
+    db.session.execute(db.text("""
+        UPDATE "user" SET
+            message_count = (SELECT COUNT(*) FROM chat_message WHERE chat_message.user_id = "user".id)
+                + (SELECT COALESCE(SUM(message_count), 0) FROM chat_archive WHERE chat_archive.user_id = "user".id),
+            session_count = (SELECT COUNT(*) FROM chat_session WHERE chat_session.user_id = "user".id),
+            last_activity = (SELECT MAX(activity) FROM (
+                SELECT timestamp AS activity FROM chat_message WHERE chat_message.user_id = "user".id
+                UNION ALL
+                SELECT last_timestamp FROM chat_archive WHERE chat_archive.user_id = "user".id
+            ))
+    """))
+
+@bp.cli.command('backfill-chat-counters')
+def backfill_chat_counters_command():
+    """Recompute per-user and per-session chat counters"""
+    backfill_chat_counters()
+    db.session.commit()
+    print("✓ Chat counters backfilled")
+
+@bp.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations"""
+    applied = run_migrations()
+    print(f"Applied {len(applied)} migration(s)")
+
+@bp.cli.command('generate-dataset')
+@click.option('--users', type=int, default=1000, help='Users to create')
+@click.option('--sessions', type=int, default=10000, help='Chat sessions, spread over the users')
+@click.option('--messages', type=int, default=100000, help='Chat messages (question/answer pairs)')
+@click.option('--seed', type=int, default=42, help='Random seed; the same seed gives the same data')
+@click.option('--batch-size', type=int, default=10000, help='Rows per executemany batch')
+def generate_dataset_command(users, sessions, messages, seed, batch_size):
+    """Fill the database with synthetic users and chats for scale testing"""
+    from generate_dataset import generate_dataset
+    generate_dataset(users, sessions, messages, seed=seed, batch_size=batch_size)
+
+# ========== CACHING ==========
+class TTLCache:
+    """Thread-safe TTL cache with LRU eviction"""
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """Store value under key"""
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+# ========== PAGE CACHE ==========
+# A guest's page depends only on the template and the resolved language, so it
+# is rendered once per (template, language). Logged-in pages get per-user
+# context (current_user, voice_enabled) and are always rendered. Cached pages
+# are dropped, and translations reloaded, when files under templates/,
+# translations/ or static/ change.
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE', 'true').lower() == 'true'
+PAGE_CACHE_TTL = float(os.environ.get('PAGE_CACHE_TTL', 3600))
+PAGE_CACHE_CHECK_INTERVAL = float(os.environ.get('PAGE_CACHE_CHECK_INTERVAL', 2))
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+TRANSLATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translations')
+page_cache = TTLCache(PAGE_CACHE_TTL, 256)
+_page_sources = {'checked_at': 0.0, 'signatures': None}
+_page_sources_lock = threading.Lock()
+
+def directory_signature(directory):
+    """(file count, newest mtime) of a directory tree; changes on any edit, add or delete"""
+    count, newest = 0, 0.0
+    for root, _, filenames in os.walk(directory):
+        newest = max(newest, os.path.getmtime(root))
+        for filename in filenames:
+            try:
+                newest = max(newest, os.path.getmtime(os.path.join(root, filename)))
+                count += 1
+            except OSError:
+                pass
+    return count, newest
+
+def check_page_sources():
+    """Invalidate cached pages when templates, translations or static assets change"""
+    global _asset_manifest
+    now = time.monotonic()
+    if now - _page_sources['checked_at'] < PAGE_CACHE_CHECK_INTERVAL:
+        return
+    with _page_sources_lock:
+        if now - _page_sources['checked_at'] < PAGE_CACHE_CHECK_INTERVAL:
+            return
+        _page_sources['checked_at'] = now
+        signatures = {
+            'templates': directory_signature(TEMPLATE_DIR),
+            'translations': directory_signature(TRANSLATION_DIR),
+            'static': directory_signature(STATIC_FOLDER)
+        }
+        previous = _page_sources['signatures']
+        _page_sources['signatures'] = signatures
+        if previous is None or previous == signatures:
+            return
+        
+        if previous['translations'] != signatures['translations'] and translation_manager is not None:
+            translation_manager.load_translations()
+        if previous['templates'] != signatures['templates'] and current_app.jinja_env.cache is not None:
+            current_app.jinja_env.cache.clear()
+        if previous['static'] != signatures['static']:
+            _asset_manifest = None
+        page_cache.clear()
+        print("🔄 Page sources changed; cleared the page cache")
+
+def render_page(template_name):
+    """render_template() for a page, cached per (template, language) for guests"""
+    user_language = resolve_user_language()
+    if not PAGE_CACHE_ENABLED or current_user.is_authenticated:
+        return render_template(template_name, user_language=user_language)
+    
+    check_page_sources()
+    key = (template_name, user_language)
+    html = page_cache.get(key)
+    if html is None:
+        html = render_template(template_name, user_language=user_language)
+        page_cache.set(key, html)
+    return html
+
+# ========== METRICS ==========
+# Prometheus-style metrics for this process, exposed at /metrics. Each
+# gunicorn/uvicorn worker keeps its own series; scrape the workers individually
+# or add a `worker` label in the scrape config.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """A metric family with optional labels; values are kept per label tuple"""
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for name, key, extra, value in self.samples():
+            lines.append(f'{name}{format_labels(self.labelnames, key, extra)} {format_number(value)}')
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state['counts']):
+                    cumulative += count
+                    samples.append((f'{self.name}_bucket', key, (('le', format_number(bound)),), cumulative))
+                samples.append((f'{self.name}_sum', key, (), state['sum']))
+                samples.append((f'{self.name}_count', key, (), state['count']))
+        return samples
+
+class MetricsRegistry:
+    """Holds metric families and collectors and renders the text exposition format"""
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """collect() returns metrics built on demand (e.g. from cache stats)"""
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for metric in collect():
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = metrics.histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint', ('method', 'endpoint'))
+HTTP_REQUESTS = metrics.counter(
+    'http_requests_total', 'Requests by endpoint and status code', ('method', 'endpoint', 'status'))
+HTTP_REQUESTS_IN_FLIGHT = metrics.gauge(
+    'http_requests_in_flight', 'Requests currently being handled')
+UPSTREAM_REQUEST_DURATION = metrics.histogram(
+    'upstream_request_duration_seconds', 'Latency of calls to Groq and Open-Meteo', ('upstream',))
+UPSTREAM_REQUESTS = metrics.counter(
+    'upstream_requests_total', 'Upstream calls by outcome (2xx/4xx/5xx/timeout/error)', ('upstream', 'outcome'))
+FALLBACK_INVOCATIONS = metrics.counter(
+    'fallback_invocations_total', 'Responses generated by a generate_fallback_* function', ('fallback',))
+
+def counts_fallback(name):
+    """Count calls of a generate_fallback_* function"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            FALLBACK_INVOCATIONS.inc(fallback=name)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def collect_cache_metrics():
+    hits = Counter('cache_hits_total', 'Cache hits', ('cache',))
+    misses = Counter('cache_misses_total', 'Cache misses', ('cache',))
+    entries = Gauge('cache_entries', 'Entries currently cached', ('cache',))
+    for name, cache in (('user', user_cache), ('advisory', advisory_cache),
+                        ('advisory_render', advisory_render_cache), ('page', page_cache)):
+        stats = cache.stats()
+        hits.inc(stats['hits'], cache=name)
+        misses.inc(stats['misses'], cache=name)
+        entries.set(stats['entries'], cache=name)
+    return [hits, misses, entries]
+
+metrics.add_collector(collect_cache_metrics)
+
+@bp.before_app_request
+def start_request_metrics():
+    g.metrics_started_at = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+
+@bp.after_app_request
+def record_request_metrics(response):
+    started_at = g.get('metrics_started_at')
+    if started_at is not None:
+        endpoint = request.endpoint or 'unmatched'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started_at, method=request.method, endpoint=endpoint)
+        HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+        g.metrics_recorded = True
+    return response
+
+@bp.teardown_app_request
+def finish_request_metrics(error=None):
+    started_at = g.get('metrics_started_at')
+    if started_at is None:
+        return
+    if not g.get('metrics_recorded'):
+        # The request failed before a response was made
+        endpoint = request.endpoint or 'unmatched'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started_at, method=request.method, endpoint=endpoint)
+        HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=500)
+    HTTP_REQUESTS_IN_FLIGHT.dec()
+
+@bp.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text exposition of this process's metrics"""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# ========== TRACING ==========
+# OpenTelemetry-compatible spans for the request, ORM statements, upstream
+# calls, LLM completions, prompt construction and JSON parsing. Spans are
+# exported as OTLP/JSON (ExportTraceServiceRequest): appended to TRACE_FILE as
+# one JSON document per line, and/or POSTed to an OTLP/HTTP collector at
+# TRACE_OTLP_ENDPOINT (e.g. http://localhost:4318/v1/traces). Incoming W3C
+# `traceparent` headers are continued and propagated to Groq/Open-Meteo.
+# With neither exporter set, tracing is off and the hooks return immediately.
+TRACE_FILE = os.environ.get('TRACE_FILE', '')
+TRACE_OTLP_ENDPOINT = os.environ.get('TRACE_OTLP_ENDPOINT', '')
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 1.0))
+TRACE_SERVICE_NAME = os.environ.get('TRACE_SERVICE_NAME', 'smart-crop-advisory')
+TRACE_EXPORT_BATCH = 512
+# Spans waiting for export; beyond this (e.g. collector down) new spans are dropped
+TRACE_QUEUE_SIZE = int(os.environ.get('TRACE_QUEUE_SIZE', 10000))
+# Longest wait for queued spans at shutdown
+TRACE_FLUSH_TIMEOUT = float(os.environ.get('TRACE_FLUSH_TIMEOUT', 5))
+TRACING_ENABLED = bool(TRACE_FILE or TRACE_OTLP_ENDPOINT)
+
+TRACEPARENT_PATTERN = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+SPAN_KINDS = {'INTERNAL': 1, 'SERVER': 2, 'CLIENT': 3}
+SPAN_STATUS_OK = 1
+SPAN_STATUS_ERROR = 2
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def otlp_attributes(attributes):
+    return [{'key': key, 'value': otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+class Span:
+    """One timed operation in a trace"""
+    def __init__(self, name, trace_id, parent_id=None, kind='INTERNAL', attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = 0
+        self.status_message = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_error(self, error):
+        self.status = SPAN_STATUS_ERROR
+        self.status_message = str(error)[:200]
+        self.attributes['exception.type'] = type(error).__name__
+
+    def traceparent(self):
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            trace_exporter.export(self)
+
+    def to_otlp(self):
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': SPAN_KINDS[self.kind],
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': otlp_attributes(self.attributes),
+            'status': {'code': self.status}
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.status_message:
+            span['status']['message'] = self.status_message
+        return span
+
+TRACE_SPANS_DROPPED = metrics.counter(
+    'trace_spans_dropped_total', 'Spans dropped because the export queue was full')
+
+class TraceExporter:
+    """Batches finished spans and writes them from a background thread"""
+    def __init__(self, path, endpoint, max_queued=TRACE_QUEUE_SIZE):
+        self.path = path
+        self.endpoint = endpoint
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def export(self, span):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            TRACE_SPANS_DROPPED.inc()
+
+    def _ensure_thread(self):
+        # Threads do not survive fork(), so each worker process starts its own
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._run, name='trace-exporter', daemon=True).start()
+                    atexit.register(self.flush)
+
+    def flush(self, timeout=TRACE_FLUSH_TIMEOUT):
+        """Wait up to `timeout` seconds for queued spans to be written; True if all were"""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"⚠️  Trace export: {self._queue.unfinished_tasks} span(s) not written at exit")
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < TRACE_EXPORT_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+            except Exception as e:
+                print(f"⚠️  Trace export failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def write(self, spans):
+        payload = {'resourceSpans': [{
+            'resource': {'attributes': otlp_attributes({'service.name': TRACE_SERVICE_NAME})},
+            'scopeSpans': [{'scope': {'name': 'smartcrop'}, 'spans': [span.to_otlp() for span in spans]}]
+        }]}
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(payload, separators=(',', ':')) + '\n')
+        if self.endpoint:
+            requests.post(self.endpoint, json=payload, timeout=5)
+
+trace_exporter = TraceExporter(TRACE_FILE, TRACE_OTLP_ENDPOINT)
+
+def current_span():
+    """The innermost open span of the current request, or None"""
+    if not TRACING_ENABLED or not has_request_context():
+        return None
+    spans = g.get('trace_spans')
+    return spans[-1] if spans else None
+
+def start_span(name, kind='INTERNAL', **attributes):
+    """Open a child of the current span and make it current; None when not tracing"""
+    parent = current_span()
+    if parent is None:
+        return None
+    span = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+    g.trace_spans.append(span)
+    return span
+
+def finish_span(span, error=None):
+    if span is None:
+        return
+    if error is not None:
+        span.record_error(error)
+    # Flows can finish outside the request (e.g. when garbage collected)
+    if has_request_context():
+        spans = g.get('trace_spans')
+        if spans and spans[-1] is span:
+            spans.pop()
+    span.end()
+
+@contextlib.contextmanager
+def trace_span(name, **attributes):
+    span = start_span(name, **attributes)
+    try:
+        yield span
+    except Exception as e:
+        finish_span(span, e)
+        raise
+    finish_span(span)
+
+def traced(name):
+    """Run the decorated function in a span of its own"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return fn(*args, **kwargs)
+            with trace_span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def start_upstream_span(upstream_request):
+    """Start a CLIENT span for an upstream call and propagate it in `traceparent`"""
+    parent = current_span()
+    if parent is None:
+        return
+    url = urlparse(upstream_request.url)
+    upstream_request.span = Span(f'{upstream_request.method} {upstream_request.name}', parent.trace_id,
+                                 parent.span_id, 'CLIENT', {
+                                     'http.method': upstream_request.method,
+                                     'http.url': f'{url.scheme}://{url.netloc}{url.path}',
+                                     'peer.service': upstream_request.name
+                                 })
+    upstream_request.headers = {**(upstream_request.headers or {}),
+                                'traceparent': upstream_request.span.traceparent()}
+
+@bp.before_app_request
+def start_request_trace():
+    if not TRACING_ENABLED:
+        return
+    incoming = TRACEPARENT_PATTERN.match(request.headers.get('traceparent', ''))
+    if incoming:
+        if not int(incoming.group(3), 16) & 1:
+            return  # the caller decided not to sample this trace
+        trace_id, parent_id = incoming.group(1), incoming.group(2)
+    elif random.random() < TRACE_SAMPLE_RATE:
+        trace_id, parent_id = os.urandom(16).hex(), None
+    else:
+        return
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.trace_spans = [Span(f'{request.method} {route}', trace_id, parent_id, 'SERVER', {
+        'http.method': request.method,
+        'http.route': route,
+        'http.target': request.path,
+        'http.user_agent': request.user_agent.string or None
+    })]
+
+@bp.after_app_request
+def record_request_trace(response):
+    spans = g.get('trace_spans')
+    if spans:
+        spans[0].set_attribute('http.status_code', response.status_code)
+        spans[0].status = SPAN_STATUS_ERROR if response.status_code >= 500 else SPAN_STATUS_OK
+        response.headers['X-Trace-Id'] = spans[0].trace_id
+    return response
+
+@bp.teardown_app_request
+def finish_request_trace(error=None):
+    spans = g.pop('trace_spans', None)
+    if not spans:
+        return
+    # Anything still open was cut short by an exception
+    for span in reversed(spans):
+        if error is not None:
+            span.record_error(error)
+        span.end()
+
+# ========== QUERY INSTRUMENTATION ==========
+# Engine event hooks count and time every SQL statement. Per-request totals go
+# into g (and X-DB-Queries / X-DB-Time headers when DB_QUERY_HEADERS is on);
+# statements slower than DB_SLOW_QUERY_MS are logged with their parameters and
+# the endpoint that issued them.
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+SLOW_QUERY_LOG_LIMIT = 1000
+
+DB_QUERIES_PER_REQUEST = metrics.histogram(
+    'db_queries_per_request', 'SQL statements issued per request', ('endpoint',), QUERY_COUNT_BUCKETS)
+DB_SLOW_QUERIES = metrics.counter(
+    'db_slow_queries_total', 'Statements slower than DB_SLOW_QUERY_MS', ('endpoint',))
+
+def query_endpoint():
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+    parent = current_span()
+    span = None
+    if parent is not None:
+        span = Span(f"db {statement.split(None, 1)[0].upper() if statement else 'query'}", parent.trace_id,
+                    parent.span_id, 'CLIENT', {
+                        'db.system': conn.dialect.name,
+                        'db.statement': ' '.join(statement.split())[:SLOW_QUERY_LOG_LIMIT]
+                    })
+    conn.info.setdefault('query_spans', []).append(span)
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started_at')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    spans = conn.info.get('query_spans')
+    span = spans.pop() if spans else None
+    if span is not None:
+        span.end()
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_time = g.get('db_time', 0.0) + elapsed
+    threshold = slow_query_thresholds.get(conn.engine)
+    if threshold is not None and elapsed >= threshold:
+        endpoint = query_endpoint()
+        DB_SLOW_QUERIES.inc(endpoint=endpoint)
+        text = ' '.join(statement.split())[:SLOW_QUERY_LOG_LIMIT]
+        params = repr(parameters)[:SLOW_QUERY_LOG_LIMIT]
+        print(f"🐢 Slow query ({elapsed * 1000:.1f} ms) in {endpoint}: {text} -- params: {params}")
+
+def handle_query_error(exception_context):
+    """Close the timing entry and span of a statement that raised"""
+    conn = exception_context.connection
+    if conn is None:
+        return
+    if conn.info.get('query_started_at'):
+        conn.info['query_started_at'].pop()
+    spans = conn.info.get('query_spans')
+    span = spans.pop() if spans else None
+    if span is not None:
+        span.record_error(exception_context.original_exception)
+        span.end()
+
+# Slow-query threshold in seconds for each instrumented engine
+slow_query_thresholds = {}
+
+def install_query_hooks(engine, slow_query_ms):
+    """Attach the counting/timing listeners to an engine (once)"""
+    slow_query_thresholds[engine] = slow_query_ms / 1000
+    if not event.contains(engine, 'before_cursor_execute', before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+        event.listen(engine, 'handle_error', handle_query_error)
+
+@bp.after_app_request
+def add_query_stats(response):
+    queries = g.get('db_queries', 0)
+    DB_QUERIES_PER_REQUEST.observe(queries, endpoint=request.endpoint or 'unmatched')
+    if current_app.config['DB_QUERY_HEADERS']:
+        response.headers['X-DB-Queries'] = str(queries)
+        response.headers['X-DB-Time'] = f"{g.get('db_time', 0.0) * 1000:.1f}ms"
+    return response
+
+# ========== ADMIN ACCESS ==========
+# Admin endpoints require `Authorization: Bearer $ADMIN_TOKEN`; with no
+# ADMIN_TOKEN set they are disabled. Accounts are never trusted for this, since
+# signup does not verify email addresses.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+def is_admin_request():
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {ADMIN_TOKEN}')
+
+def admin_required(view):
+    """Reject the request with 403 unless it comes from an admin"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request():
+            return jsonify({
+                'success': False,
+                'message': 'Admin access required'
+            }), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+# ========== REQUEST PROFILING ==========
+# Opt-in cProfile capture of single live requests. A request is profiled when
+# it carries a valid signed X-Profile header (see `flask profile-token`) or is
+# picked by PROFILE_SAMPLE_RATE. The .prof files are listed and downloadable at
+# /admin/profiles. When neither trigger is set the cost is one header lookup.
+PROFILE_HEADER = 'X-Profile'
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 50))
+PROFILE_DIR = os.environ.get(
+    'PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'profiles')
+)
+PROFILE_NAME_PATTERN = re.compile(r'^[\w.-]+\.prof$')
+# Never sampled: cheap or admin-only routes that would only add noise
+PROFILE_SKIP_ENDPOINTS = {'main.serve_static', 'main.metrics_endpoint', 'main.list_profiles', 'main.download_profile'}
+# Only one profiler can be active per process (enforced since Python 3.12), so
+# a request is only profiled if no other request is; held until teardown
+_profile_lock = threading.Lock()
+
+def sign_profile_token(expires_at):
+    key = current_app.config['SECRET_KEY'].encode('utf-8')
+    signature = hmac.new(key, str(expires_at).encode('utf-8'), hashlib.sha256).hexdigest()
+    return f'{expires_at}.{signature}'
+
+def verify_profile_token(token):
+    """A token is '<unix expiry>.<hmac>' signed with SECRET_KEY"""
+    expires_at, _, _ = token.partition('.')
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(token, sign_profile_token(int(expires_at)))
+
+def should_profile():
+    token = request.headers.get(PROFILE_HEADER)
+    if token:
+        return verify_profile_token(token)
+    return (PROFILE_SAMPLE_RATE > 0 and request.endpoint not in PROFILE_SKIP_ENDPOINTS
+            and random.random() < PROFILE_SAMPLE_RATE)
+
+def active_profiler():
+    return g.get('profiler') if has_request_context() else None
+
+def switch_profiler(profiler, enable):
+    """Enable or disable a profiler; profiling errors never fail the request"""
+    try:
+        if enable:
+            profiler.enable()
+        else:
+            profiler.disable()
+        return True
+    except Exception as e:
+        print(f"⚠️  Profiler {'enable' if enable else 'disable'} failed: {e}")
+        return False
+
+def run_profiled_step(fn, *args):
+    """
+    Run one step of a request with its profiler enabled. cProfile only sees
+    the thread it is enabled on, so asgi.py wraps every executor step in this.
+    """
+    profiler = active_profiler()
+    if profiler is not None:
+        switch_profiler(profiler, True)
+    try:
+        return fn(*args)
+    finally:
+        profiler = active_profiler()
+        if profiler is not None:
+            switch_profiler(profiler, False)
+
+def prune_profiles():
+    names = sorted(name for name in os.listdir(PROFILE_DIR) if PROFILE_NAME_PATTERN.match(name))
+    for name in names[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else []:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            pass
+
+@bp.before_app_request
+def start_request_profile():
+    if not (PROFILE_SAMPLE_RATE > 0 or PROFILE_HEADER in request.headers):
+        return
+    if not should_profile():
+        return
+    # Skipped while another request is being profiled
+    if not _profile_lock.acquire(blocking=False):
+        return
+    profiler = cProfile.Profile()
+    if not switch_profiler(profiler, True):
+        _profile_lock.release()
+        return
+    endpoint = (request.endpoint or 'unmatched').replace('main.', '')
+    g.profile_name = f"{datetime.utcnow():%Y%m%d-%H%M%S}-{endpoint}-{uuid.uuid4().hex[:8]}.prof"
+    g.profile_started_at = time.perf_counter()
+    g.profiler = profiler
+
+@bp.after_app_request
+def add_profile_header(response):
+    if g.get('profile_name'):
+        response.headers['X-Profile-Id'] = g.profile_name
+    return response
+
+@bp.teardown_app_request
+def finish_request_profile(error=None):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    try:
+        switch_profiler(profiler, False)
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, g.profile_name))
+        prune_profiles()
+        elapsed_ms = (time.perf_counter() - g.profile_started_at) * 1000
+        print(f"🔬 Profiled {request.method} {request.path} ({elapsed_ms:.0f} ms): {g.profile_name}")
+    except Exception as e:
+        print(f"⚠️  Could not save profile {g.profile_name}: {e}")
+    finally:
+        _profile_lock.release()
+
+@bp.route('/admin/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    """Saved request profiles, newest first"""
+    profiles = []
+    if os.path.isdir(PROFILE_DIR):
+        for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+            if PROFILE_NAME_PATTERN.match(name):
+                stat = os.stat(os.path.join(PROFILE_DIR, name))
+                profiles.append({
+                    'name': name,
+                    'size': stat.st_size,
+                    'created_at': datetime.utcfromtimestamp(stat.st_mtime).isoformat(),
+                    'url': url_for('main.download_profile', name=name)
+                })
+    return jsonify({
+        'success': True,
+        'sample_rate': PROFILE_SAMPLE_RATE,
+        'keep': PROFILE_KEEP,
+        'profiles': profiles
+    })
+
+@bp.route('/admin/profiles/<name>', methods=['GET'])
+@admin_required
+def download_profile(name):
+    """
+    Download a .prof file (open with snakeviz, flameprof or pstats), or
+    ?format=text&sort=cumulative&limit=40 for a pstats report
+    """
+    if not PROFILE_NAME_PATTERN.match(name) or not os.path.isfile(os.path.join(PROFILE_DIR, name)):
+        return jsonify({
+            'success': False,
+            'message': 'Profile not found'
+        }), 404
+    if request.args.get('format') != 'text':
+        return send_from_directory(PROFILE_DIR, name, as_attachment=True, mimetype='application/octet-stream')
+    
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'ncalls', 'filename'):
+        sort = 'cumulative'
+    limit = min(request.args.get('limit', 40, type=int), 500)
+    report = io.StringIO()
+    pstats.Stats(os.path.join(PROFILE_DIR, name), stream=report).strip_dirs().sort_stats(sort).print_stats(limit)
+    return Response(report.getvalue(), mimetype='text/plain')
+
+@bp.cli.command('profile-token')
+@click.option('--ttl', type=int, default=600, help='Seconds the token stays valid')
+def profile_token_command(ttl):
+    """Print a signed X-Profile header value for profiling live requests"""
+    print(f"{PROFILE_HEADER}: {sign_profile_token(int(time.time()) + ttl)}")
 
 # ========== FLASK-LOGIN USER LOADER ==========
+# Users are cached per process for a few seconds so that the several API calls
+# a page makes do not each reload the user. The cache holds detached snapshots
+# that are merged into the request's session without a SELECT.
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 30))
+user_cache = TTLCache(USER_CACHE_TTL, 10000)
+
+def snapshot_user(user):
+    """Copy a user's column values into a detached instance safe to share"""
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in db.inspect(User).column_attrs})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def invalidate_cached_user(user_id):
+    """Drop a user from the loader cache after it has been modified"""
+    user_cache.delete(int(user_id))
+
 @login_manager.user_loader
+@traced('user.load')
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    if USER_CACHE_TTL > 0:
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return db.session.merge(snapshot, load=False)
+    
+    user = db.session.get(User, user_id)
+    if user is not None and USER_CACHE_TTL > 0:
+        user_cache.set(user_id, snapshot_user(user))
+    return user
 
 # ========== HELPER FUNCTIONS ==========
 def get_coordinates_from_json(state, district):
     """Get coordinates from districts.json file"""
     try:
-        with open('districts.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        for item in data:
-            if item['state'] == state and item['district'] == district:
-                return item.get('lat'), item.get('lon')
+        coords = get_district_coordinates().get((state, district))
+        if coords is not None:
+            return coords
         
         # Fallback if not found
         fallback_coords = {
@@ -474,74 +1810,294 @@ def get_or_create_chat_session(session_id, user_id=None):
                 title="New Chat"
             )
             db.session.add(chat_session)
+            increment_user_chat_counters(user_id, sessions=1)
             db.session.commit()
+            invalidate_cached_user(user_id)
         
         return chat_session
     except Exception as e:
         db.session.rollback()
         return None
 
-def save_chat_message(session_id, user_id, role, content, language='en', was_spoken=False):
-    """Save a chat message to database"""
-    try:
-        chat_message = ChatMessage(
+# ========== CHAT PERSISTENCE ==========
+# A chat turn (user message + assistant reply + session touch) is written in a
+# single transaction. With CHAT_WRITE_BEHIND=true, turns are queued and a
+# background writer group-commits them across concurrent requests.
+CHAT_WRITE_BEHIND = os.environ.get('CHAT_WRITE_BEHIND', 'false').lower() == 'true'
+CHAT_WRITE_BEHIND_BATCH = int(os.environ.get('CHAT_WRITE_BEHIND_BATCH', 100))
+CHAT_WRITE_BEHIND_INTERVAL = float(os.environ.get('CHAT_WRITE_BEHIND_INTERVAL', 0.05))
+
+def make_chat_title(content):
+    """Build a session title from the first user message"""
+    return content[:40] + '...' if len(content) > 40 else content
+
+def increment_user_chat_counters(user_id, messages=0, sessions=0, activity=None):
+    """Bump a user's chat counters in the current transaction"""
+    values = {
+        User.message_count: User.message_count + messages,
+        User.session_count: User.session_count + sessions
+    }
+    if activity is not None:
+        values[User.last_activity] = activity
+    User.query.filter_by(id=user_id).update(values, synchronize_session=False)
+
+def stage_guest_chat_turn(turn, staged_sessions):
+    """Add a guest chat turn to the guest store and refresh its expiry"""
+    session_id = turn['session_id']
+    
+    db.session.add(GuestChatMessage(
+        session_id=session_id,
+        role='user',
+        content=turn['user_message'],
+        language=turn['language'],
+        timestamp=turn['received_at']
+    ))
+    if turn['reply'] is not None:
+        db.session.add(GuestChatMessage(
+            session_id=session_id,
+            role='assistant',
+            content=turn['reply'],
+            language=turn['language'],
+            timestamp=turn['replied_at']
+        ))
+    
+    key = (session_id, None)
+    guest_session = staged_sessions.get(key) or db.session.get(GuestChatSession, session_id)
+    if guest_session is None:
+        guest_session = GuestChatSession(session_id=session_id, created_at=turn['received_at'])
+        db.session.add(guest_session)
+    guest_session.last_activity = turn['replied_at']
+    staged_sessions[key] = guest_session
+
+def stage_chat_turn(turn, staged_sessions):
+    """
+    Add one chat turn to the current DB session without committing.
+    staged_sessions maps (session_id, user_id) -> ChatSession for turns in the
+    same batch, so a session is looked up at most once per transaction.
+    """
+    session_id = turn['session_id']
+    user_id = turn['user_id']
+    
+    if user_id is None:
+        stage_guest_chat_turn(turn, staged_sessions)
+        return
+    
+    db.session.add(ChatMessage(
+        session_id=session_id,
+        user_id=user_id,
+        role='user',
+        content=turn['user_message'],
+        language=turn['language'],
+        timestamp=turn['received_at']
+    ))
+    if turn['reply'] is not None:
+        db.session.add(ChatMessage(
+            session_id=session_id,
+            user_id=user_id,
+            role='assistant',
+            content=turn['reply'],
+            language=turn['language'],
+            timestamp=turn['replied_at']
+        ))
+    
+    message_count = 1 if turn['reply'] is None else 2
+    
+    key = (session_id, user_id)
+    chat_session = staged_sessions.get(key)
+    if chat_session is None:
+        chat_session = ChatSession.query.filter_by(session_id=session_id, user_id=user_id).first()
+    
+    new_sessions = 0
+    if chat_session is None:
+        chat_session = ChatSession(
             session_id=session_id,
             user_id=user_id,
-            role=role,
-            content=content,
-            language=language,
-            was_spoken=was_spoken,
-            timestamp=datetime.utcnow()
+            title=make_chat_title(turn['user_message']),
+            message_count=0
         )
-        db.session.add(chat_message)
-        
-        # Update or create chat session
-        if user_id is not None:
-            chat_session = ChatSession.query.filter_by(
-                session_id=session_id, 
-                user_id=user_id
-            ).first()
-            
-            if not chat_session:
-                chat_session = ChatSession(
-                    session_id=session_id,
-                    user_id=user_id,
-                    title=content[:40] + '...' if len(content) > 40 else content
-                )
-                db.session.add(chat_session)
-            else:
-                chat_session.updated_at = datetime.utcnow()
-                if role == 'user' and chat_session.title == "New Chat":
-                    title = content[:40] + '...' if len(content) > 40 else content
-                    chat_session.title = title
-        
-        db.session.commit()
+        db.session.add(chat_session)
+        new_sessions = 1
+    else:
+        chat_session.updated_at = turn['replied_at']
+        if chat_session.title == "New Chat":
+            chat_session.title = make_chat_title(turn['user_message'])
+    if chat_session in db.session.new:
+        chat_session.message_count += message_count
+    else:
+        # Incremented in SQL so concurrent turns in one session don't lose counts
+        ChatSession.query.filter_by(session_id=session_id, user_id=user_id).update(
+            {ChatSession.message_count: ChatSession.message_count + message_count},
+            synchronize_session=False
+        )
+    staged_sessions[key] = chat_session
+    
+    increment_user_chat_counters(user_id, messages=message_count, sessions=new_sessions,
+                                 activity=turn['replied_at'])
+
+def persist_chat_turns(turns):
+    """Write a batch of chat turns in one transaction"""
+    staged_sessions = {}
+    with db.session.no_autoflush:
+        for turn in turns:
+            stage_chat_turn(turn, staged_sessions)
+    db.session.commit()
+    
+    # Chat counters live on User, so cached copies are now stale
+    for user_id in {turn['user_id'] for turn in turns if turn['user_id'] is not None}:
+        invalidate_cached_user(user_id)
+
+class ChatWriteQueue:
+    """Background writer that group-commits chat turns"""
+    def __init__(self, app, batch_size, interval):
+        self.app = app
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='chat-write-behind', daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        atexit.register(self.flush)
+    
+    def submit(self, turn):
+        self._queue.put(turn)
+    
+    def flush(self):
+        """Block until every queued turn has been written"""
+        self._queue.join()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+    
+    def _write(self, batch):
+        with self.app.app_context():
+            try:
+                persist_chat_turns(batch)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Chat write-behind batch failed, retrying individually: {e}")
+                for turn in batch:
+                    try:
+                        persist_chat_turns([turn])
+                    except Exception as turn_error:
+                        db.session.rollback()
+                        print(f"Dropped chat turn for session {turn['session_id']}: {turn_error}")
+            finally:
+                db.session.remove()
+                for _ in batch:
+                    self._queue.task_done()
+
+# Set up with the database at startup when CHAT_WRITE_BEHIND is enabled
+chat_write_queue = None
+
+def save_chat_turn(session_id, user_id, user_message, reply, language='en', received_at=None):
+    """
+    Save a user message and the assistant reply (None if there is none) in one
+    transaction, or queue them for the write-behind writer.
+    """
+    now = datetime.utcnow()
+    turn = {
+        'session_id': session_id,
+        'user_id': user_id,
+        'user_message': user_message,
+        'reply': reply,
+        'language': language,
+        'received_at': received_at or now,
+        'replied_at': now
+    }
+    
+    if chat_write_queue is not None:
+        chat_write_queue.submit(turn)
+        return True
+    
+    try:
+        persist_chat_turns([turn])
         return True
     except Exception as e:
         db.session.rollback()
         return False
 
-def get_chat_history(session_id, user_id=None):
-    """Get chat history for a session"""
+CHAT_HISTORY_DEFAULT_LIMIT = 50
+CHAT_HISTORY_MAX_LIMIT = 200
+
+def encode_chat_cursor(timestamp, message_id):
+    """Encode a (timestamp, id) keyset position as an opaque cursor"""
+    raw = f"{timestamp.isoformat()}|{message_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_chat_cursor(cursor):
+    """Decode a cursor into (timestamp, id), or raise ValueError"""
     try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        timestamp, message_id = raw.split('|', 1)
+        return datetime.fromisoformat(timestamp), int(message_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def serialize_chat_message(msg):
+    """Convert a ChatMessage into the API dict format"""
+    return {
+        'id': msg.id,
+        'role': msg.role,
+        'content': msg.content,
+        'language': msg.language,
+        'was_spoken': msg.was_spoken,
+        'timestamp': msg.timestamp.isoformat(),
+        'cursor': encode_chat_cursor(msg.timestamp, msg.id)
+    }
+
+def get_chat_history(session_id, user_id=None, before=None, after=None, limit=None):
+    """
+    Get chat history for a session, oldest message first.
+    before/after are (timestamp, id) keyset positions. With a limit, returns the
+    newest `limit` messages before `before` (or the oldest after `after`), so
+    the cost does not grow with the length of the conversation.
+    """
+    try:
+        # Guest conversations are kept in their own TTL-bound store
         if user_id is None:
-            messages = ChatMessage.query.filter_by(
-                session_id=session_id, 
-                user_id=None
-            ).order_by(ChatMessage.timestamp.asc()).all()
+            model = GuestChatMessage
+            query = GuestChatMessage.query.filter_by(session_id=session_id)
         else:
-            messages = ChatMessage.query.filter_by(
-                session_id=session_id, 
-                user_id=user_id
-            ).order_by(ChatMessage.timestamp.asc()).all()
+            model = ChatMessage
+            query = ChatMessage.query.filter_by(session_id=session_id, user_id=user_id)
+        
+        if before is not None:
+            before_ts, before_id = before
+            query = query.filter(db.or_(
+                model.timestamp < before_ts,
+                db.and_(model.timestamp == before_ts, model.id < before_id)
+            ))
+        if after is not None:
+            after_ts, after_id = after
+            query = query.filter(db.or_(
+                model.timestamp > after_ts,
+                db.and_(model.timestamp == after_ts, model.id > after_id)
+            ))
+        
+        if limit is not None and after is None:
+            # Walk the index backwards from the newest end, then restore order
+            messages = query.order_by(model.timestamp.desc(), model.id.desc())\
+                            .limit(limit).all()
+            messages.reverse()
+        else:
+            query = query.order_by(model.timestamp.asc(), model.id.asc())
+            if limit is not None:
+                query = query.limit(limit)
+            messages = query.all()
         
-        return [{
-            'role': msg.role,
-            'content': msg.content,
-            'language': msg.language,
-            'was_spoken': msg.was_spoken,
-            'timestamp': msg.timestamp.isoformat()
-        } for msg in messages]
+        return [serialize_chat_message(msg) for msg in messages]
     except Exception as e:
         return []
 
@@ -565,7 +2121,566 @@ def get_user_chat_sessions(user_id):
     except Exception as e:
         return []
 
+# ========== GUEST CHAT EXPIRY ==========
+GUEST_CHAT_TTL_HOURS = int(os.environ.get('GUEST_CHAT_TTL_HOURS', 72))
+GUEST_CHAT_SWEEP_INTERVAL = int(os.environ.get('GUEST_CHAT_SWEEP_INTERVAL', 15 * 60))
+
+def sweep_expired_guest_chats(ttl_hours=None, batch_size=500):
+    """Delete guest sessions idle longer than the TTL. Returns sessions removed."""
+    ttl_hours = GUEST_CHAT_TTL_HOURS if ttl_hours is None else ttl_hours
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+    removed = 0
+    
+    while True:
+        expired = [row.session_id for row in db.session.query(GuestChatSession.session_id)
+                                                       .filter(GuestChatSession.last_activity < cutoff)
+                                                       .limit(batch_size)]
+        if not expired:
+            break
+        GuestChatMessage.query.filter(GuestChatMessage.session_id.in_(expired))\
+                              .delete(synchronize_session=False)
+        GuestChatSession.query.filter(GuestChatSession.session_id.in_(expired))\
+                              .delete(synchronize_session=False)
+        db.session.commit()
+        removed += len(expired)
+    
+    return removed
+
+def start_guest_chat_sweeper(app):
+    """Run sweep_expired_guest_chats every GUEST_CHAT_SWEEP_INTERVAL seconds"""
+    def sweep_forever():
+        while True:
+            time.sleep(GUEST_CHAT_SWEEP_INTERVAL)
+            with app.app_context():
+                try:
+                    removed = sweep_expired_guest_chats()
+                    if removed:
+                        print(f"🧹 Removed {removed} expired guest chat session(s)")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"✗ Guest chat sweep failed: {e}")
+    
+    threading.Thread(target=sweep_forever, name='guest-chat-sweeper', daemon=True).start()
+
+@bp.cli.command('sweep-guest-chats')
+@click.option('--ttl-hours', type=int, default=None, help='Remove guest sessions idle longer than this')
+def sweep_guest_chats_command(ttl_hours):
+    """Delete expired guest chat sessions"""
+    removed = sweep_expired_guest_chats(ttl_hours)
+    print(f"✓ Removed {removed} expired guest chat session(s)")
+
+# ========== CHAT SEARCH ==========
+CHAT_SEARCH_MAX_LIMIT = 50
+
+# Common English words left out of search queries (kept if the query is only stopwords)
+CHAT_SEARCH_STOPWORDS = frozenset(
+    'a about an and any are as at be but by can could did do does for from had has have how i if in '
+    'is it its me my of on or said say says should so than that the their them then there these they '
+    'this to was we what when where which who why will with would you your'.split()
+)
+
+# Control characters used as highlight markers, swapped for <mark> after escaping
+SNIPPET_OPEN = '\x02'
+SNIPPET_CLOSE = '\x03'
+
+def chat_search_terms(text):
+    """Split text the way the index tokenizer does: runs of letters, digits and combining marks"""
+    return ''.join(
+        ch if unicodedata.category(ch)[0] in 'LNM' or unicodedata.category(ch) == 'Co' else ' '
+        for ch in text
+    ).split()
+
+def build_chat_search_query(text, user_id):
+    """
+    Turn free text into a safe FTS5 query scoped to one user, or None. Terms
+    are ORed (after dropping stopwords) and bm25() ranks messages matching more
+    of them first, so questions like 'what did it say about urea?' still match.
+    """
+    terms = list(dict.fromkeys(term.lower() for term in chat_search_terms(text)))
+    terms = [term for term in terms if term not in CHAT_SEARCH_STOPWORDS] or terms
+    if not terms:
+        return None
+    content_terms = ' OR '.join(f'"{term}"' for term in terms[:20])
+    return f'user_id:"{int(user_id)}" AND content:({content_terms})'
+
+def search_chat_messages(user_id, text, limit=20):
+    """Full-text search a user's chat messages, best matches first"""
+    match = build_chat_search_query(text, user_id)
+    if match is None:
+        return []
+    
+    rows = db.session.execute(db.text("""
+        SELECT m.id, m.session_id, m.role, m.timestamp, s.title,
+               snippet(chat_message_fts, 0, :open, :close, '…', 16) AS snippet,
+               bm25(chat_message_fts) AS rank
+        FROM chat_message_fts
+        JOIN chat_message m ON m.id = chat_message_fts.rowid
+        LEFT JOIN chat_session s ON s.session_id = m.session_id AND s.user_id = m.user_id
+        WHERE chat_message_fts MATCH :match
+        ORDER BY rank
+        LIMIT :limit
+    """), {'match': match, 'open': SNIPPET_OPEN, 'close': SNIPPET_CLOSE, 'limit': limit})
+    
+    return [{
+        'message_id': row.id,
+        'session_id': row.session_id,
+        'session_title': row.title,
+        'role': row.role,
+        'timestamp': datetime.fromisoformat(str(row.timestamp)).isoformat(),
+        'snippet': html.escape(row.snippet).replace(SNIPPET_OPEN, '<mark>').replace(SNIPPET_CLOSE, '</mark>'),
+        'rank': row.rank
+    } for row in rows]
+
+# ========== CHAT EXPORT ==========
+CHAT_EXPORT_BATCH_SIZE = 1000
+
+def iter_chat_export_lines(user_id):
+    """
+    Yield a user's chat history as NDJSON lines: hot messages in keyset-paged
+    batches, then archived sessions one at a time. The DB session is closed
+    before each batch is sent, so no read transaction (which would block every
+    SQLite writer) stays open while a slow client downloads.
+    """
+    last = None
+    while True:
+        query = ChatMessage.query.filter_by(user_id=user_id)
+        if last is not None:
+            query = query.filter(db.or_(
+                ChatMessage.timestamp > last.timestamp,
+                db.and_(ChatMessage.timestamp == last.timestamp, ChatMessage.id > last.id)
+            ))
+        batch = query.order_by(ChatMessage.timestamp.asc(), ChatMessage.id.asc())\
+                     .limit(CHAT_EXPORT_BATCH_SIZE).all()
+        lines = [json.dumps({
+            'session_id': msg.session_id,
+            'role': msg.role,
+            'content': msg.content,
+            'language': msg.language,
+            'was_spoken': msg.was_spoken,
+            'timestamp': msg.timestamp.isoformat(),
+            'archived': False
+        }, ensure_ascii=False) + '\n' for msg in batch]
+        db.session.close()
+        yield from lines
+        if len(batch) < CHAT_EXPORT_BATCH_SIZE:
+            break
+        last = batch[-1]
+    
+    archive_ids = [row.id for row in db.session.query(ChatArchive.id).filter_by(user_id=user_id)]
+    db.session.close()
+    for archive_id in archive_ids:
+        archive = db.session.get(ChatArchive, archive_id)
+        if archive is None:
+            continue
+        lines = [json.dumps(dict(record, session_id=archive.session_id, archived=True), ensure_ascii=False) + '\n'
+                 for record in load_archived_messages(archive)]
+        db.session.close()
+        yield from lines
+
+def iter_gzip(lines):
+    """Gzip-compress a stream of text lines incrementally"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for line in lines:
+        chunk = compressor.compress(line.encode('utf-8'))
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+# ========== CHAT ARCHIVE ==========
+# Sessions idle for CHAT_ARCHIVE_IDLE_DAYS are moved out of chat_message into one
+# compressed blob per session, and moved back the next time they are opened.
+CHAT_ARCHIVE_IDLE_DAYS = int(os.environ.get('CHAT_ARCHIVE_IDLE_DAYS', 90))
+CHAT_ARCHIVE_CODEC = os.environ.get('CHAT_ARCHIVE_CODEC', 'zstd' if zstandard else 'zlib')
+
+def compress_chat_payload(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd codec requires the zstandard package')
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+def decompress_chat_payload(payload, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd codec requires the zstandard package')
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+def archive_chat_session(session_id, user_id, codec=None):
+    """Move one session's messages into a compressed archive row"""
+    codec = codec or CHAT_ARCHIVE_CODEC
+    messages = ChatMessage.query.filter_by(session_id=session_id, user_id=user_id)\
+                                .order_by(ChatMessage.timestamp.asc(), ChatMessage.id.asc())\
+                                .all()
+    if not messages:
+        return 0
+    
+    records = [{
+        'role': msg.role,
+        'content': msg.content,
+        'language': msg.language,
+        'was_spoken': msg.was_spoken,
+        'timestamp': msg.timestamp.isoformat()
+    } for msg in messages]
+    
+    # A session archived before and reopened since gets its old blob merged in
+    archive = ChatArchive.query.filter_by(session_id=session_id, user_id=user_id).first()
+    if archive is not None:
+        records = load_archived_messages(archive) + records
+    else:
+        archive = ChatArchive(session_id=session_id, user_id=user_id)
+        db.session.add(archive)
+    
+    archive.codec = codec
+    archive.payload = compress_chat_payload(
+        json.dumps(records, ensure_ascii=False).encode('utf-8'), codec
+    )
+    archive.message_count = len(records)
+    archive.first_timestamp = datetime.fromisoformat(records[0]['timestamp'])
+    archive.last_timestamp = datetime.fromisoformat(records[-1]['timestamp'])
+    archive.archived_at = datetime.utcnow()
+    
+    ChatMessage.query.filter(ChatMessage.id.in_([msg.id for msg in messages]))\
+                     .delete(synchronize_session=False)
+    return len(messages)
+
+def load_archived_messages(archive):
+    """Decode an archive row into its list of message dicts"""
+    return json.loads(decompress_chat_payload(archive.payload, archive.codec).decode('utf-8'))
+
+def archive_idle_chat_sessions(idle_days=None, max_sessions=500):
+    """Archive sessions whose newest message is older than idle_days"""
+    idle_days = CHAT_ARCHIVE_IDLE_DAYS if idle_days is None else idle_days
+    cutoff = datetime.utcnow() - timedelta(days=idle_days)
+    
+    idle_sessions = db.session.query(ChatMessage.session_id, ChatMessage.user_id)\
+                              .filter(ChatMessage.user_id.isnot(None))\
+                              .group_by(ChatMessage.session_id, ChatMessage.user_id)\
+                              .having(db.func.max(ChatMessage.timestamp) < cutoff)\
+                              .limit(max_sessions)\
+                              .all()
+    
+    archived_sessions = 0
+    archived_messages = 0
+    for session_id, user_id in idle_sessions:
+        try:
+            archived_messages += archive_chat_session(session_id, user_id)
+            db.session.commit()
+            archived_sessions += 1
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Error archiving chat session {session_id}: {e}")
+    
+    return archived_sessions, archived_messages
+
+def rehydrate_chat_session(session_id, user_id=None):
+    """Move an archived session back into chat_message. Returns True if it was archived."""
+    if user_id is None:
+        return False
+    try:
+        archive = ChatArchive.query.filter_by(session_id=session_id, user_id=user_id).first()
+        if archive is None:
+            return False
+        
+        db.session.add_all([ChatMessage(
+            session_id=session_id,
+            user_id=user_id,
+            role=record['role'],
+            content=record['content'],
+            language=record['language'],
+            was_spoken=record['was_spoken'],
+            timestamp=datetime.fromisoformat(record['timestamp'])
+        ) for record in load_archived_messages(archive)])
+        db.session.delete(archive)
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        print(f"✗ Error rehydrating chat session {session_id}: {e}")
+        return False
+
+@bp.cli.command('archive-chats')
+@click.option('--idle-days', type=int, default=None, help='Archive sessions idle for this many days')
+@click.option('--max-sessions', type=int, default=500, help='Maximum sessions to archive in this run')
+def archive_chats_command(idle_days, max_sessions):
+    """Move idle chat sessions into compressed cold storage"""
+    sessions, messages = archive_idle_chat_sessions(idle_days, max_sessions)
+    print(f"✓ Archived {messages} message(s) from {sessions} session(s)")
+
+# ========== UPSTREAM CALLS ==========
+# Views that call Groq/Open-Meteo are written as "flows": generators that yield
+# an UpstreamRequest and receive an UpstreamResponse back (or have a
+# requests.exceptions.RequestException thrown in). run_flow_sync() performs the
+# calls with requests; asgi.py drives the same flows with an async client.
+ASYNC_FLOW_ENVIRON_KEY = 'smartcrop.async_flows'
+
+class UpstreamRequest:
+    """An outbound HTTP call requested by a flow"""
+    def __init__(self, method, url, headers=None, params=None, json=None, timeout=None, name=None):
+        self.method = method
+        self.url = url
+        # Label for metrics, e.g. 'groq'
+        self.name = name or urlparse(url).hostname
+        self.headers = headers
+        self.params = params
+        self.json = json
+        self.timeout = timeout
+        # Tracing span, started when the flow yields this request
+        self.span = None
+
+class UpstreamResponse:
+    """HTTP response handed back to a flow, independent of the client library"""
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f'{self.status_code} error from upstream')
+
+class DeferredFlow:
+    """Returned by a view instead of a response when asgi.py will drive the flow"""
+    def __init__(self, flow):
+        self.flow = flow
+
+def advance_flow(flow, value=None, error=None):
+    """Resume a flow. Returns (True, result) when it finished, else (False, next_request)."""
+    try:
+        upstream_request = flow.throw(error) if error is not None else flow.send(value)
+    except StopIteration as stop:
+        return True, stop.value
+    start_upstream_span(upstream_request)
+    return False, upstream_request
+
+def record_upstream_call(upstream_request, started_at, status_code=None, error=None):
+    """Record the latency and outcome of one upstream call"""
+    UPSTREAM_REQUEST_DURATION.observe(time.perf_counter() - started_at, upstream=upstream_request.name)
+    if error is None:
+        outcome = f'{status_code // 100}xx'
+    elif isinstance(error, requests.exceptions.Timeout):
+        outcome = 'timeout'
+    else:
+        outcome = 'error'
+    UPSTREAM_REQUESTS.inc(upstream=upstream_request.name, outcome=outcome)
+    span = upstream_request.span
+    if span is not None:
+        if error is not None:
+            span.record_error(error)
+        else:
+            span.set_attribute('http.status_code', status_code)
+            span.status = SPAN_STATUS_ERROR if status_code >= 400 else SPAN_STATUS_OK
+        span.end()
+
+def execute_upstream_sync(upstream_request):
+    started_at = time.perf_counter()
+    try:
+        response = get_llm_session().request(
+            upstream_request.method,
+            upstream_request.url,
+            headers=upstream_request.headers,
+            params=upstream_request.params,
+            json=upstream_request.json,
+            timeout=upstream_request.timeout
+        )
+    except requests.exceptions.RequestException as e:
+        record_upstream_call(upstream_request, started_at, error=e)
+        raise
+    record_upstream_call(upstream_request, started_at, status_code=response.status_code)
+    return UpstreamResponse(response.status_code, response.content)
+
+def run_flow_sync(flow):
+    """Drive a flow to completion, performing its upstream calls with requests"""
+    finished, result = advance_flow(flow)
+    while not finished:
+        try:
+            response = execute_upstream_sync(result)
+        except requests.exceptions.RequestException as e:
+            finished, result = advance_flow(flow, error=e)
+        else:
+            finished, result = advance_flow(flow, response)
+    return result
+
+def run_flow(flow):
+    """Run a view's flow now, or hand it to the async driver when served by asgi.py"""
+    if request.environ.get(ASYNC_FLOW_ENVIRON_KEY):
+        return DeferredFlow(flow)
+    return run_flow_sync(flow)
+
+def groq_request(messages, temperature):
+    """Build a Groq chat completion request"""
+    return UpstreamRequest(
+        'POST',
+        GROQ_API_URL,
+        name='groq',
+        headers={
+            "Authorization": f"Bearer {GROQ_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        json={
+            "model": GROQ_MODEL,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": 1024
+        }
+    )
+
+# ========== LLM TELEMETRY ==========
+# Every Groq call is recorded with its call site, model, token usage, latency,
+# how the JSON reply was extracted and whether it parsed. The most recent
+# LLM_TELEMETRY_SIZE calls are kept and summarised at /admin/llm-telemetry.
+LLM_TELEMETRY_SIZE = int(os.environ.get('LLM_TELEMETRY_SIZE', 2000))
+
+LLM_CALLS = metrics.counter(
+    'llm_calls_total', 'LLM calls by outcome (ok/parse_error/http_error/request_error/error/no_api_key)',
+    ('call_site', 'model', 'outcome'))
+LLM_TOKENS = metrics.counter(
+    'llm_tokens_total', 'Tokens reported in the Groq usage field', ('call_site', 'model', 'kind'))
+
+class LLMTelemetry:
+    """Thread-safe ring buffer of recent LLM calls"""
+    def __init__(self, size):
+        self._calls = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def record(self, call):
+        with self._lock:
+            self._calls.append(call)
+            self.recorded += 1
+
+    def recent(self, limit):
+        with self._lock:
+            calls = list(self._calls)
+        return calls[::-1][:limit]
+
+    def summary(self):
+        with self._lock:
+            calls = list(self._calls)
+        groups = {}
+        for call in calls:
+            groups.setdefault((call['call_site'], call['model']), []).append(call)
+        return [summarize_llm_calls(call_site, model, group)
+                for (call_site, model), group in sorted(groups.items())]
+
+llm_telemetry = LLMTelemetry(LLM_TELEMETRY_SIZE)
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def summarize_llm_calls(call_site, model, calls):
+    outcomes = {}
+    extraction_paths = {}
+    for call in calls:
+        outcomes[call['outcome']] = outcomes.get(call['outcome'], 0) + 1
+        if call['extraction']:
+            extraction_paths[call['extraction']] = extraction_paths.get(call['extraction'], 0) + 1
+    parse_attempts = sum(extraction_paths.values())
+    latencies = [call['latency_ms'] for call in calls if call['latency_ms'] is not None]
+    return {
+        'call_site': call_site,
+        'model': model,
+        'calls': len(calls),
+        'outcomes': outcomes,
+        'extraction_paths': extraction_paths,
+        'parse_failure_rate': round(outcomes.get('parse_error', 0) / parse_attempts, 4) if parse_attempts else None,
+        'fallback_rate': round(sum(1 for call in calls if call['fallback']) / len(calls), 4),
+        'prompt_tokens': sum(call['prompt_tokens'] or 0 for call in calls),
+        'completion_tokens': sum(call['completion_tokens'] or 0 for call in calls),
+        'latency_ms': {
+            'p50': percentile(latencies, 0.5),
+            'p95': percentile(latencies, 0.95),
+            'max': max(latencies) if latencies else None
+        }
+    }
+
+def start_llm_call(call_site):
+    return {'call_site': call_site, 'model': GROQ_MODEL, 'started_at': time.perf_counter(), 'usage': {}}
+
+def finish_llm_call(call, outcome, fallback=False, extraction=None, error=None):
+    """Record a finished LLM call in the telemetry buffer and metrics"""
+    usage = call['usage']
+    started_at = call['started_at']
+    llm_telemetry.record({
+        'timestamp': datetime.utcnow().isoformat(),
+        'call_site': call['call_site'],
+        'model': call['model'],
+        'outcome': outcome,
+        'fallback': fallback,
+        'extraction': extraction,
+        'latency_ms': round((time.perf_counter() - started_at) * 1000, 1) if started_at else None,
+        'prompt_tokens': usage.get('prompt_tokens'),
+        'completion_tokens': usage.get('completion_tokens'),
+        'total_tokens': usage.get('total_tokens'),
+        'error': str(error)[:200] if error else None
+    })
+    LLM_CALLS.inc(call_site=call['call_site'], model=call['model'], outcome=outcome)
+    for kind in ('prompt_tokens', 'completion_tokens'):
+        if usage.get(kind):
+            LLM_TOKENS.inc(usage[kind], call_site=call['call_site'], model=call['model'], kind=kind.replace('_tokens', ''))
+
+def llm_error_outcome(error):
+    if isinstance(error, requests.exceptions.HTTPError):
+        return 'http_error'
+    if isinstance(error, requests.exceptions.RequestException):
+        return 'request_error'
+    return 'error'
+
+def groq_completion_flow(messages, temperature, call_site, fallback_on_error=False):
+    """
+    Flow: one Groq chat completion. Returns (call, reply text); the caller
+    finishes the telemetry record. Failed calls are recorded and re-raised.
+    """
+    call = start_llm_call(call_site)
+    span = start_span('llm.completion', **{'llm.call_site': call_site, 'llm.model': GROQ_MODEL})
+    try:
+        response = yield groq_request(messages, temperature)
+        response.raise_for_status()
+        result = response.json()
+        call['usage'] = result.get('usage') or {}
+        reply = result['choices'][0]['message']['content']
+    except Exception as e:
+        finish_span(span, e)
+        finish_llm_call(call, llm_error_outcome(e), fallback=fallback_on_error, error=e)
+        raise
+    if span is not None:
+        span.set_attribute('llm.prompt_tokens', call['usage'].get('prompt_tokens'))
+        span.set_attribute('llm.completion_tokens', call['usage'].get('completion_tokens'))
+    finish_span(span)
+    return call, reply
+
+def extract_json_text(reply):
+    """Strip a markdown fence around a JSON reply. Returns (extraction path, text)."""
+    if '```json' in reply:
+        return 'json_fence', reply.split('```json')[1].split('```')[0].strip()
+    if '```' in reply:
+        return 'bare_fence', reply.split('```')[1].strip()
+    return 'raw', reply.strip()
+
+@bp.route('/admin/llm-telemetry', methods=['GET'])
+@admin_required
+def llm_telemetry_summary():
+    """Summary of recent LLM calls per call site and model"""
+    limit = min(request.args.get('recent', 20, type=int), LLM_TELEMETRY_SIZE)
+    return jsonify({
+        'success': True,
+        'buffer_size': LLM_TELEMETRY_SIZE,
+        'recorded': llm_telemetry.recorded,
+        'summary': llm_telemetry.summary(),
+        'recent': llm_telemetry.recent(limit)
+    })
+
 # ========== LLM HELPER FUNCTIONS ==========
+@traced('prompt.market')
 def create_market_prompt(user_data):
     """Create personalized market price prompt"""
     return f"""You are an agricultural market expert for India. Provide personalized market advice in JSON format.
@@ -598,105 +2713,87 @@ Provide this exact JSON structure:
 
 Make the data realistic for the location and crop. If crop is not specified, use 'Rice' as default."""
 
-def create_fertilizer_prompt(user_data):
-    """Create personalized fertilizer recommendation prompt"""
-    return f"""You are an agricultural scientist specializing in Indian farming. Provide personalized fertilizer advice in JSON format.
+@traced('prompt.fertilizer')
+def create_fertilizer_narrative_prompt(inputs, plan):
+    """Prompt for the explanatory text around an already computed plan"""
+    basis = plan['basis']
+    schedule = '\n'.join(f"- {item['stage']} ({item['timing']}): {item['quantity']}"
+                         for item in plan['application_schedule'])
+    return f"""You are an agricultural scientist advising an Indian farmer. The fertilizer doses below are FINAL; do not change them or give other numbers for N, P or K.
 
-FARMER PROFILE:
-- Location: {user_data.get('state', 'Unknown')}, {user_data.get('district', 'Unknown')}
-- Primary Crop: {user_data.get('primary_crop', 'Not specified')}
-- Farm Size: {user_data.get('farm_size', 'Not specified')} acres
-- Soil Type: {user_data.get('soil_type', 'Not specified')}
-- Irrigation Type: {user_data.get('irrigation_type', 'Not specified')}
-- Preferred Language: {user_data.get('preferred_language', 'en')}
-- Current Date: {date.today().strftime('%B %d, %Y')}
-- Current Season: {'Kharif' if date.today().month in [6,7,8,9,10] else 'Rabi'}
+PLAN:
+- Crop: {inputs['crop']} (growth stage: {inputs['growth_stage'] or 'not specified'})
+- Soil: {basis['soil_type']}, irrigation: {basis['irrigation_type']}, season: {basis['season']}
+- Nutrients: {plan['npk_ratio']} kg/acre of N:P2O5:K2O
+{schedule}
 
-Provide this exact JSON structure:
+Write short practical advice in this exact JSON structure:
 {{
-    "npk_ratio": "X:X:X",
-    "quantity_per_acre": "XXX kg",
-    "total_required": "XXX kg for your farm",
-    "recommended_brands": ["Brand1", "Brand2", "Brand3"],
-    "application_schedule": [
-        {{"stage": "Basal", "timing": "At sowing", "quantity": "XX% of total"}},
-        {{"stage": "Top Dressing", "timing": "After X days", "quantity": "XX% of total"}}
-    ],
-    "organic_alternatives": ["Alternative1", "Alternative2"],
-    "estimated_cost": "₹ X,XXX",
-    "government_subsidies": "XX% subsidy available under...",
-    "soil_health_tips": "Based on your soil type...",
-    "irrigation_tips": "Based on your irrigation method...",
-    "personalized_advice": "Based on your profile..."
-}}
-
-Make recommendations realistic for the crop and location."""
+    "plan_summary": "One or two sentences summarising the plan",
+    "pro_tip": "One practical tip",
+    "weather_adjustment": "How to adjust application to weather",
+    "soil_health_tips": "Advice for this soil type",
+    "irrigation_tips": "Advice for this irrigation method",
+    "personalized_advice": "Advice for this crop and growth stage"
+}}"""
 
-def call_llm_api(prompt):
+def call_llm_api(prompt, call_site='call_llm_api'):
     """Call LLM API (using Groq as in your existing code)"""
+    return run_flow_sync(llm_json_flow(prompt, call_site))
+
+def llm_json_flow(prompt, call_site='call_llm_api'):
+    """Flow: ask the LLM for JSON and parse it, falling back on any failure"""
+    if not GROQ_API_KEY:
+        finish_llm_call({'call_site': call_site, 'model': GROQ_MODEL, 'started_at': None, 'usage': {}},
+                        'no_api_key', fallback=True)
+        return generate_fallback_response(prompt)
+    
     try:
-        if not GROQ_API_KEY:
-            return generate_fallback_response(prompt)
-        
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "llama-3.1-8b-instant",
-            "messages": [
-                {
-                    "role": "system", 
-                    "content": "You are an agricultural expert. Always respond with valid JSON only, no additional text."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": 0.3,
-            "max_tokens": 1024
-        }
-        
-        response = requests.post(GROQ_API_URL, headers=headers, json=data)
-        response.raise_for_status()
-        result = response.json()
-        
-        # Extract JSON from response
-        reply = result['choices'][0]['message']['content']
-        
-        # Try to parse JSON
-        try:
-            # Extract JSON if wrapped in markdown
-            if '```json' in reply:
-                json_str = reply.split('```json')[1].split('```')[0].strip()
-            elif '```' in reply:
-                json_str = reply.split('```')[1].strip()
-            else:
-                json_str = reply.strip()
-            
-            return json.loads(json_str)
-        except:
-            # If JSON parsing fails, return fallback
-            return generate_fallback_response(prompt)
-            
+        call, reply = yield from groq_completion_flow([
+            {
+                "role": "system", 
+                "content": "You are an agricultural expert. Always respond with valid JSON only, no additional text."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ], temperature=0.3, call_site=call_site, fallback_on_error=True)
     except Exception as e:
         print(f"LLM API Error: {e}")
         return generate_fallback_response(prompt)
+    
+    # Extract JSON if wrapped in markdown, then parse it
+    parse_span = start_span('llm.parse_json', **{'llm.call_site': call_site,
+                                                  'llm.reply_length': len(reply) if isinstance(reply, str) else 0})
+    extraction = None
+    try:
+        extraction, json_str = extract_json_text(reply)
+        data = json.loads(json_str)
+    except (ValueError, TypeError, AttributeError) as e:
+        finish_span(parse_span, e)
+        finish_llm_call(call, 'parse_error', fallback=True, extraction=extraction, error=e)
+        return generate_fallback_response(prompt)
+    finish_span(parse_span)
+    
+    finish_llm_call(call, 'ok', extraction=extraction)
+    return data
 
+@counts_fallback('response')
 def generate_fallback_response(prompt):
     """Generate fallback response when LLM fails"""
     if "market" in prompt.lower():
+        # Seeded per prompt and day, so repeated requests get the same figures
+        rng = random.Random(f"{prompt}|{date.today().isoformat()}")
         return {
-            "price": f"₹ {random.randint(1800, 3200):,} per quintal",
-            "trend": random.choice(["up", "down", "stable"]),
-            "trend_percentage": f"{random.uniform(0.5, 5.0):.1f}%",
+            "price": f"₹ {rng.randint(1800, 3200):,} per quintal",
+            "trend": rng.choice(["up", "down", "stable"]),
+            "trend_percentage": f"{rng.uniform(0.5, 5.0):.1f}%",
             "trend_explanation": "Prices influenced by seasonal demand",
             "best_time_to_sell": "Within 7-10 days",
             "nearby_mandis": [
-                {"name": "APMC Market", "price": f"₹ {random.randint(1850, 3100):,}", "distance": "15 km"},
-                {"name": "Co-op Market", "price": f"₹ {random.randint(1750, 3000):,}", "distance": "25 km"}
+                {"name": "APMC Market", "price": f"₹ {rng.randint(1850, 3100):,}", "distance": "15 km"},
+                {"name": "Co-op Market", "price": f"₹ {rng.randint(1750, 3000):,}", "distance": "25 km"}
             ],
             "storage_advice": "Store in dry place if prices are expected to rise",
             "government_schemes": "Check PM-KISAN for subsidy updates",
@@ -721,6 +2818,102 @@ def generate_fallback_response(prompt):
             "personalized_advice": "Get soil testing done for precise recommendations"
         }
 
+# ========== ADVISORY CACHE ==========
+# Advisories are generated once per cohort in canonical English and rendered
+# into other languages separately, so all languages share one generation.
+ADVISORY_CACHE_TTL = int(os.environ.get('ADVISORY_CACHE_TTL', 6 * 60 * 60))
+ADVISORY_CACHE_MAX_ENTRIES = int(os.environ.get('ADVISORY_CACHE_MAX_ENTRIES', 4096))
+
+LANGUAGE_NAMES = {
+    'en': 'English',
+    'hi': 'Hindi',
+    'te': 'Telugu',
+    'ta': 'Tamil',
+    'mr': 'Marathi',
+    'bn': 'Bengali'
+}
+
+# Canonical advisories keyed by cohort, and renders keyed by (cohort, language)
+advisory_cache = TTLCache(ADVISORY_CACHE_TTL, ADVISORY_CACHE_MAX_ENTRIES)
+advisory_render_cache = TTLCache(ADVISORY_CACHE_TTL, ADVISORY_CACHE_MAX_ENTRIES)
+
+def canonical_advisory_flow(cohort_key, prompt, is_valid):
+    """
+    Flow: return the canonical (English) advisory for a cohort, generating it once.
+    Responses that fail is_valid (e.g. LLM fallbacks) are returned but not cached.
+    """
+    advisory = advisory_cache.get(cohort_key)
+    if advisory is not None:
+        return advisory
+
+    advisory = yield from llm_json_flow(prompt, call_site=cohort_key[0])
+    if is_valid(advisory):
+        advisory_cache.set(cohort_key, advisory)
+    return advisory
+
+@traced('prompt.translation')
+def create_translation_prompt(advisory, lang):
+    """Create prompt to render a canonical advisory into another language"""
+    lang_name = LANGUAGE_NAMES.get(lang, 'English')
+    return f"""Translate this farming advisory JSON into {lang_name}.
+
+Rules:
+- Translate ONLY human-readable text values into {lang_name}
+- Keep every key, icon name, color, time, number and emoji exactly as-is
+- Keep the exact same JSON structure
+
+{json.dumps(advisory, ensure_ascii=False)}"""
+
+def render_advisory_flow(cohort_key, advisory, lang, is_valid=None):
+    """
+    Flow: render a canonical advisory in the user's language, cached per language.
+    Translations that fail is_valid (if given) are not cached or served.
+    """
+    if lang not in LANGUAGE_NAMES or lang == 'en':
+        return advisory
+
+    render_key = (cohort_key, lang)
+    rendered = advisory_render_cache.get(render_key)
+    if rendered is not None:
+        return rendered
+
+    rendered = yield from llm_json_flow(create_translation_prompt(advisory, lang),
+                                        call_site=f'{cohort_key[0]}:translate')
+    if (not isinstance(rendered, dict) or set(rendered.keys()) != set(advisory.keys())
+            or (is_valid is not None and not is_valid(rendered))):
+        # Translation failed - serve canonical English rather than a fallback
+        return advisory
+
+    advisory_render_cache.set(render_key, rendered)
+    return rendered
+
+def round_weather_for_cohort(weather_data):
+    """Round the weather readings used in prompts so advisories can be shared"""
+    def _round(value):
+        return round(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+
+    current = weather_data.get('current', {}) or {}
+    daily = weather_data.get('daily', {}) or {}
+    current_fields = ['temperature_2m', 'apparent_temperature', 'relative_humidity_2m',
+                      'wind_speed_10m', 'precipitation', 'weather_code']
+    daily_fields = ['temperature_2m_max', 'temperature_2m_min',
+                    'precipitation_sum', 'et0_fao_evapotranspiration']
+
+    return {
+        'current': {k: _round(current[k]) for k in current_fields if k in current},
+        'daily': {k: [_round(v) for v in (daily.get(k) or [])[:2]] for k in daily_fields if k in daily}
+    }
+
+def get_farm_size_bucket(farm_size):
+    """Bucket farm size so similar farms share one advisory cohort"""
+    if not farm_size:
+        return 'Unknown'
+    if farm_size < 2.5:
+        return 'Small (under 2.5 acres)'
+    if farm_size < 10:
+        return 'Medium (2.5-10 acres)'
+    return 'Large (over 10 acres)'
+
 def get_crop_stage(crop):
     """Get crop growth stage based on crop type"""
     stages = {
@@ -744,13 +2937,13 @@ def get_next_action(crop):
     return actions.get(crop, 'Regular monitoring')
 
 # ========== CORS PREFLIGHT HANDLER ==========
-@app.before_request
+@bp.before_app_request
 def handle_options():
     if request.method == "OPTIONS":
         return "", 200
 
 # ========== LANGUAGE ROUTES ==========
-@app.route('/api/languages', methods=['GET'])
+@bp.route('/api/languages', methods=['GET'])
 def get_languages():
     """Get available languages"""
     languages = [
@@ -763,7 +2956,7 @@ def get_languages():
     ]
     return jsonify({'success': True, 'languages': languages})
 
-@app.route('/api/set-language', methods=['POST'])
+@bp.route('/api/set-language', methods=['POST'])
 @login_required
 def set_language():
     """Set user's preferred language"""
@@ -782,6 +2975,7 @@ def set_language():
         # Update user's language preference
         current_user.preferred_language = language
         db.session.commit()
+        invalidate_cached_user(current_user.id)
         
         # Update session
         session['user_language'] = language
@@ -799,7 +2993,7 @@ def set_language():
             'message': f'Error updating language: {str(e)}'
         }), 500
 
-@app.route('/api/set-guest-language', methods=['POST'])
+@bp.route('/api/set-guest-language', methods=['POST'])
 def set_guest_language():
     """Set language preference for guest users"""
     try:
@@ -841,7 +3035,7 @@ def set_guest_language():
             'message': f'Error setting guest language: {str(e)}'
         }), 500
 
-@app.route('/api/detect-language', methods=['GET'])
+@bp.route('/api/detect-language', methods=['GET'])
 def detect_language():
     """Detect and suggest language based on browser"""
     try:
@@ -867,7 +3061,7 @@ def detect_language():
             'message': f'Error detecting language: {str(e)}'
         }), 500
 
-@app.route('/api/translate', methods=['POST'])
+@bp.route('/api/translate', methods=['POST'])
 def translate_text():
     """Translate text (for dynamic content)"""
     try:
@@ -896,7 +3090,7 @@ def translate_text():
         }), 500
 
 # ========== VOICE FEATURE ROUTES ==========
-@app.route('/api/voice/settings', methods=['POST'])
+@bp.route('/api/voice/settings', methods=['POST'])
 @login_required
 def update_voice_settings():
     """Update user's voice preferences"""
@@ -906,6 +3100,7 @@ def update_voice_settings():
         voice_enabled = data.get('voice_enabled', True)
         current_user.voice_enabled = voice_enabled
         db.session.commit()
+        invalidate_cached_user(current_user.id)
         
         return jsonify({
             'success': True,
@@ -919,7 +3114,7 @@ def update_voice_settings():
             'message': f'Error updating voice settings: {str(e)}'
         }), 500
 
-@app.route('/api/voice/speak', methods=['POST'])
+@bp.route('/api/voice/speak', methods=['POST'])
 def text_to_speech():
     """Convert text to speech (server-side if needed)"""
     try:
@@ -946,10 +3141,14 @@ def text_to_speech():
         }), 500
 
 # ========== CONTEXT PROCESSOR FOR TEMPLATES ==========
-@app.context_processor
-def inject_user_and_language():
-    """Inject user and language info into all templates"""
-    context = {}
+def resolve_user_language():
+    """
+    Return the language pages render in for this request, remembering the
+    detected language in the session and syncing it to a logged-in user.
+    Resolved once per request; later calls reuse the result.
+    """
+    if 'resolved_language' in g:
+        return g.resolved_language
     
     # Get current language using detection chain
     current_lang = get_user_language_from_request(request)
@@ -957,30 +3156,44 @@ def inject_user_and_language():
     # Store in session for future requests
     session['user_language'] = current_lang
     
+    if not current_user.is_authenticated:
+        g.resolved_language = current_lang
+        return current_lang
+    
+    user_language = current_user.preferred_language or current_lang
+    
+    # Sync if different (user changed language while logged in)
+    if current_user.preferred_language != current_lang:
+        current_user.preferred_language = current_lang
+        try:
+            db.session.commit()
+            invalidate_cached_user(current_user.id)
+        except:
+            db.session.rollback()
+    
+    g.resolved_language = user_language
+    return user_language
+
+@bp.app_context_processor
+def inject_user_and_language():
+    """Inject user and language info into all templates"""
+    context = {}
+    
+    user_language = resolve_user_language()
+    
     if current_user.is_authenticated:
         context['current_user'] = current_user
-        context['user_language'] = current_user.preferred_language or current_lang
+        context['user_language'] = user_language
         context['voice_enabled'] = current_user.voice_enabled
         context['is_guest'] = False
-        
-        # Sync if different (user changed language while logged in)
-        if current_user.preferred_language != current_lang:
-            current_user.preferred_language = current_lang
-            try:
-                db.session.commit()
-            except:
-                db.session.rollback()
     else:
         context['current_user'] = None
-        context['user_language'] = current_lang
+        context['user_language'] = user_language
         context['voice_enabled'] = True
         context['is_guest'] = True
     
     # Make translation function available
-    if translation_manager:
-        context['t'] = translation_manager.get_text
-    else:
-        context['t'] = lambda key, lang='en': key
+    context['t'] = get_translation_manager().get_text
     
     # Add list of available languages for templates
     context['available_languages'] = [
@@ -998,7 +3211,7 @@ def inject_user_and_language():
     return context
 
 # ========== AUTHENTICATION ROUTES ==========
-@app.route('/signup', methods=['POST'])
+@bp.route('/signup', methods=['POST'])
 def signup():
     """User registration"""
     try:
@@ -1097,6 +3310,12 @@ def signup():
             'detected_language': browser_lang
         }), 201
 
+    except HashingBusyError:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Server is busy, please try again shortly'
+        }), 503, {'Retry-After': '5'}
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -1104,7 +3323,7 @@ def signup():
             'message': f'Error creating account: {str(e)}'
         }), 500
 
-@app.route('/login', methods=['POST'])
+@bp.route('/login', methods=['POST'])
 def login():
     """User login"""
     try:
@@ -1123,6 +3342,16 @@ def login():
 
         if user and user.check_password(password):
             if user.is_active:
+                # Move the stored hash to the configured cost factor
+                if user.needs_rehash():
+                    try:
+                        user.set_password(password)
+                        db.session.commit()
+                        invalidate_cached_user(user.id)
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"Password rehash failed for user {user.id}: {e}")
+                
                 login_user(user, remember=True)
                 
                 # Set session language to user's preference
@@ -1144,13 +3373,18 @@ def login():
                 'message': 'Invalid email or password'
             }), 401
 
+    except HashingBusyError:
+        return jsonify({
+            'success': False,
+            'message': 'Server is busy, please try again shortly'
+        }), 503, {'Retry-After': '5'}
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Login error: {str(e)}'
         }), 500
 
-@app.route('/logout', methods=['POST'])
+@bp.route('/logout', methods=['POST'])
 @login_required
 def logout():
     """User logout"""
@@ -1161,7 +3395,7 @@ def logout():
         'message': 'Logged out successfully'
     }), 200
 
-@app.route('/check-auth', methods=['GET'])
+@bp.route('/check-auth', methods=['GET'])
 def check_auth():
     """Check if user is authenticated"""
     if current_user.is_authenticated:
@@ -1178,7 +3412,7 @@ def check_auth():
     }), 200
 
 # ========== PROFILE ROUTES ==========
-@app.route('/user/profile', methods=['GET'])
+@bp.route('/user/profile', methods=['GET'])
 @login_required
 def get_user_profile():
     """Get user profile"""
@@ -1194,7 +3428,7 @@ def get_user_profile():
             'message': f'Error fetching profile: {str(e)}'
         }), 500
 
-@app.route('/save-profile', methods=['POST'])
+@bp.route('/save-profile', methods=['POST'])
 @login_required
 def save_profile():
     """Save user profile"""
@@ -1236,6 +3470,7 @@ def save_profile():
         user.last_weather_fetch = datetime.utcnow()
         
         db.session.commit()
+        invalidate_cached_user(user.id)
         
         return jsonify({
             'success': True,
@@ -1250,11 +3485,346 @@ def save_profile():
             'message': f'Error saving profile: {str(e)}'
         }), 500
 
+# ========== NUTRIENT ENGINE ==========
+# Fertilizer doses are computed from tables instead of being asked of the LLM:
+# a base N-P2O5-K2O dose per crop (kg/ha, general package-of-practice values)
+# is adjusted by soil, irrigation and season factors, converted to urea/DAP/MOP
+# and split over the crop's application schedule. Per-acre plans are cached per
+# (crop, soil, irrigation, season) and scaled by farm size; the LLM only writes
+# the narrative text around the numbers.
+HECTARE_ACRES = 2.471
+
+# crop: ((N, P2O5, K2O) kg/ha, application group)
+CROP_NUTRIENTS = {
+    'rice': ((120, 60, 40), 'cereal'),
+    'wheat': ((120, 60, 40), 'cereal'),
+    'maize': ((150, 75, 40), 'cereal'),
+    'barley': ((60, 30, 20), 'cereal'),
+    'millets': ((60, 30, 20), 'cereal'),
+    'chickpea': ((20, 50, 20), 'pulse'),
+    'pigeon pea': ((25, 50, 25), 'pulse'),
+    'black gram': ((20, 40, 20), 'pulse'),
+    'green gram': ((20, 40, 20), 'pulse'),
+    'pulses': ((20, 50, 20), 'pulse'),
+    'groundnut': ((25, 50, 50), 'oilseed'),
+    'soybean': ((30, 60, 40), 'oilseed'),
+    'oilseeds': ((40, 60, 40), 'oilseed'),
+    'cotton': ((120, 60, 60), 'fibre'),
+    'jute': ((60, 30, 30), 'fibre'),
+    'sugarcane': ((250, 100, 120), 'long_duration'),
+    'banana': ((200, 60, 300), 'long_duration'),
+    'tomato': ((150, 100, 100), 'vegetable'),
+    'potato': ((180, 80, 100), 'vegetable'),
+    'onion': ((100, 50, 80), 'vegetable'),
+    'brinjal': ((120, 80, 60), 'vegetable'),
+    'vegetables': ((120, 80, 80), 'vegetable'),
+    'mango': ((100, 50, 100), 'fruit'),
+    'orange': ((120, 60, 60), 'fruit'),
+    'guava': ((100, 50, 100), 'fruit'),
+    'fruits': ((100, 50, 100), 'fruit'),
+}
+DEFAULT_CROP_NUTRIENTS = ((100, 50, 50), 'cereal')
+CROP_ALIASES = {
+    'paddy': 'rice', 'corn': 'maize', 'chana': 'chickpea', 'gram': 'chickpea', 'tur': 'pigeon pea',
+    'arhar': 'pigeon pea', 'red gram': 'pigeon pea', 'urad': 'black gram', 'moong': 'green gram',
+    'eggplant': 'brinjal', 'millet': 'millets', 'soyabean': 'soybean'
+}
+
+# Multipliers on (N, P2O5, K2O)
+NEUTRAL_FACTORS = (1.0, 1.0, 1.0)
+SOIL_FACTORS = {
+    'clay': (0.9, 1.0, 0.85),     # holds nutrients, little leaching
+    'loam': NEUTRAL_FACTORS,
+    'sandy': (1.15, 1.0, 1.15),   # N and K leach
+    'silt': (1.0, 1.0, 0.95),
+    'red': (1.05, 1.15, 1.05),    # low fertility, P fixed by iron oxides
+    'black': (1.0, 1.1, 0.8),     # rich in K, fixes P
+}
+SOIL_ALIASES = {'loamy': 'loam', 'red soil': 'red', 'black soil': 'black', 'sand': 'sandy',
+                'clayey': 'clay', 'alluvial': 'loam', 'regur': 'black'}
+IRRIGATION_FACTORS = {
+    'drip': (0.8, 0.9, 0.85),     # fertigation puts nutrients at the roots
+    'sprinkler': (0.9, 1.0, 0.95),
+    'flood': (1.1, 1.0, 1.05),    # runoff and leaching losses
+    'manual': (0.9, 1.0, 0.95),
+    'rainfed': (0.75, 0.85, 0.8), # lower yield target
+}
+SEASON_FACTORS = {
+    'kharif': (1.05, 1.0, 1.0),   # monsoon rain washes out N
+    'rabi': NEUTRAL_FACTORS,
+    'zaid': (0.95, 1.0, 1.05),    # K helps with heat stress
+}
+
+# group: [(stage, timing, share of N, share of K2O)]; all P2O5 goes in the first application
+APPLICATION_SPLITS = {
+    'cereal': [('Basal', 'At sowing/transplanting', 0.5, 1.0),
+               ('Top Dressing 1', '25-30 days after sowing', 0.25, 0.0),
+               ('Top Dressing 2', '45-55 days after sowing (panicle/ear initiation)', 0.25, 0.0)],
+    'pulse': [('Basal', 'At sowing', 1.0, 1.0)],
+    'oilseed': [('Basal', 'At sowing', 0.5, 1.0),
+                ('Top Dressing', '30-35 days after sowing', 0.5, 0.0)],
+    'fibre': [('Basal', 'At sowing', 0.25, 0.5),
+              ('Top Dressing 1', '30 days after sowing (squaring)', 0.375, 0.0),
+              ('Top Dressing 2', '60 days after sowing (flowering)', 0.375, 0.5)],
+    'long_duration': [('Basal', 'At planting', 0.25, 0.5),
+                      ('Top Dressing 1', '45 days after planting', 0.25, 0.0),
+                      ('Top Dressing 2', '90 days after planting', 0.25, 0.5),
+                      ('Top Dressing 3', '120 days after planting', 0.25, 0.0)],
+    'vegetable': [('Basal', 'At transplanting', 0.5, 0.5),
+                  ('Top Dressing 1', '30 days after transplanting', 0.25, 0.25),
+                  ('Top Dressing 2', '50-60 days after transplanting (flowering)', 0.25, 0.25)],
+    'fruit': [('Pre-monsoon', 'June-July, in the basin around each tree', 0.5, 0.5),
+              ('Post-monsoon', 'September-October, in the basin around each tree', 0.5, 0.5)],
+}
+
+# name: ((N, P2O5, K2O) fraction, bag kg, price per bag ₹, type, brands)
+FERTILIZER_PRODUCTS = {
+    'Urea': ((0.46, 0.0, 0.0), 45, 266.5, 'Nitrogen', 'IFFCO / NFL'),
+    'DAP': ((0.18, 0.46, 0.0), 50, 1350, 'Phosphorus', 'IFFCO / Coromandel'),
+    'MOP': ((0.0, 0.0, 0.60), 50, 1700, 'Potassium', 'IPL / Nagarjuna'),
+}
+# Budget category by fertilizer cost per acre (₹)
+COST_RANGES = [(2000, 'low'), (5000, 'medium')]
+
+ORGANIC_ALTERNATIVES = [
+    {'name': 'Farmyard manure / compost', 'source': 'Cattle dung, crop residue',
+     'quantity': '4-5 tonnes/acre, 2-3 weeks before sowing', 'benefits': 'Adds organic carbon and improves soil structure'},
+    {'name': 'Vermicompost', 'source': 'Earthworm-processed organic waste',
+     'quantity': '1 tonne/acre at sowing', 'benefits': 'Readily available nutrients and beneficial microbes'},
+    {'name': 'Neem cake', 'source': 'Neem seed residue',
+     'quantity': '80-100 kg/acre with the basal dose', 'benefits': 'Slows nitrogen loss and deters soil pests'},
+]
+BIOFERTILIZERS = {
+    'pulse': {'name': 'Rhizobium + PSB', 'source': 'Seed treatment culture',
+              'quantity': '200 g each per 10 kg seed', 'benefits': 'Fixes atmospheric nitrogen and frees soil phosphorus'},
+    'oilseed': {'name': 'Rhizobium + PSB', 'source': 'Seed treatment culture',
+                'quantity': '200 g each per 10 kg seed', 'benefits': 'Fixes atmospheric nitrogen and frees soil phosphorus'},
+}
+DEFAULT_BIOFERTILIZER = {'name': 'Azospirillum + PSB', 'source': 'Seed or seedling treatment culture',
+                         'quantity': '2 kg each per acre mixed with compost', 'benefits': 'Supplies up to 20% of nitrogen and frees soil phosphorus'}
+GOVERNMENT_SCHEMES = [
+    {'name': 'Soil Health Card', 'subsidy': 'Free', 'eligibility': 'All farmers; soil tested every 2 years',
+     'link': 'https://soilhealth.dac.gov.in'},
+    {'name': 'Nutrient Based Subsidy (NBS)', 'subsidy': 'Included in MRP',
+     'eligibility': 'P and K fertilizers bought from authorised dealers', 'link': 'https://www.fert.nic.in'},
+    {'name': 'PM-KISAN', 'subsidy': '₹ 6,000/year', 'eligibility': 'Landholding farmer families',
+     'link': 'https://pmkisan.gov.in'},
+]
+
+def current_season(today=None):
+    month = (today or date.today()).month
+    if month in (6, 7, 8, 9, 10):
+        return 'kharif'
+    if month in (4, 5):
+        return 'zaid'
+    return 'rabi'
+
+def normalize_choice(value, table, aliases):
+    """Map free-text input ('Chickpea (Chana)', 'Red Soil', 'Kharif (Monsoon)') to a table key"""
+    if not value:
+        return None
+    value = str(value).strip().lower()
+    for candidate in [value, re.sub(r'\s*\(.*?\)', '', value)] + re.findall(r'\((.*?)\)', value):
+        for name in [candidate.strip()] + candidate.split('/'):
+            name = aliases.get(name.strip(), name.strip())
+            if name in table:
+                return name
+    return None
+
+def scale_factors(*factor_sets):
+    n = p = k = 1.0
+    for fn, fp, fk in factor_sets:
+        n, p, k = n * fn, p * fp, k * fk
+    return n, p, k
+
+@functools.lru_cache(maxsize=4096)
+def nutrient_plan_per_acre(crop, soil, irrigation, season):
+    """
+    Per-acre nutrient and product doses for normalised keys (None = unknown).
+    The result is cached and shared: do not mutate it.
+    """
+    base, group = CROP_NUTRIENTS.get(crop, DEFAULT_CROP_NUTRIENTS)
+    fn, fp, fk = scale_factors(SOIL_FACTORS.get(soil, NEUTRAL_FACTORS),
+                               IRRIGATION_FACTORS.get(irrigation, NEUTRAL_FACTORS),
+                               SEASON_FACTORS.get(season, NEUTRAL_FACTORS))
+    n, p, k = (base[0] * fn / HECTARE_ACRES, base[1] * fp / HECTARE_ACRES, base[2] * fk / HECTARE_ACRES)
+
+    # DAP covers all the P2O5 (and some N), MOP the K2O, urea the remaining N
+    dap = p / FERTILIZER_PRODUCTS['DAP'][0][1]
+    n_from_dap = dap * FERTILIZER_PRODUCTS['DAP'][0][0]
+    mop = k / FERTILIZER_PRODUCTS['MOP'][0][2]
+    urea_n = max(n - n_from_dap, 0.0)
+
+    splits = APPLICATION_SPLITS[group]
+    basal_urea_n = max(n * splits[0][2] - n_from_dap, 0.0)
+    later_n_share = sum(split[2] for split in splits[1:])
+    schedule = []
+    for index, (stage, timing, n_share, k_share) in enumerate(splits):
+        if index == 0:
+            stage_urea_n = basal_urea_n
+            products = {'DAP': dap}
+        else:
+            stage_urea_n = (urea_n - basal_urea_n) * n_share / later_n_share
+            products = {}
+        products['Urea'] = stage_urea_n / FERTILIZER_PRODUCTS['Urea'][0][0]
+        products['MOP'] = mop * k_share
+        schedule.append((stage, timing, {name: kg for name, kg in products.items() if kg >= 0.5}))
+
+    return {
+        'crop_matched': crop in CROP_NUTRIENTS,
+        'group': group,
+        'nutrients': (n, p, k),
+        'products': {'Urea': urea_n / FERTILIZER_PRODUCTS['Urea'][0][0], 'DAP': dap, 'MOP': mop},
+        'schedule': schedule
+    }
+
+def application_method(stage_index, group, irrigation):
+    if group == 'fruit':
+        return 'Spread evenly in the tree basin, mix into the topsoil and irrigate'
+    if stage_index == 0:
+        return 'Broadcast and incorporate into the soil before sowing'
+    if irrigation == 'drip':
+        return 'Dissolve and apply through the drip line (fertigation)'
+    return 'Side-dress near the root zone, then irrigate lightly'
+
+def fertilizer_inputs(data, user):
+    """Read crop/soil/irrigation/season/farm size from the fertilizer form or a profile dict"""
+    def pick(*keys, default=None):
+        for key in keys:
+            if data.get(key) not in (None, ''):
+                return data[key]
+        return default
+
+    try:
+        farm_size = float(pick('farmSize', 'farm_size', default=user.farm_size) or 1)
+    except (TypeError, ValueError):
+        farm_size = 1.0
+    if not math.isfinite(farm_size) or farm_size <= 0:
+        farm_size = 1.0
+    return {
+        'crop': pick('crop', 'primary_crop', default=user.primary_crop) or 'Rice',
+        'soil_type': pick('soilType', 'soil_type', default=user.soil_type),
+        'irrigation_type': pick('irrigationType', 'irrigation_type', default=user.irrigation_type),
+        'season': pick('currentSeason', 'season') or current_season(),
+        'growth_stage': pick('growthStage', 'growth_stage'),
+        'farm_size': farm_size
+    }
+
+def build_fertilizer_plan(inputs, lang='en'):
+    """Numeric fertilizer recommendation for one farm (no LLM involved)"""
+    keys = (normalize_choice(inputs['crop'], CROP_NUTRIENTS, CROP_ALIASES),
+            normalize_choice(inputs['soil_type'], SOIL_FACTORS, SOIL_ALIASES),
+            normalize_choice(inputs['irrigation_type'], IRRIGATION_FACTORS, {}),
+            normalize_choice(inputs['season'], SEASON_FACTORS, {}))
+    plan = nutrient_plan_per_acre(*keys)
+    farm_size = inputs['farm_size']
+    n, p, k = (round(value) for value in plan['nutrients'])
+    total_nutrients = (n + p + k) or 1
+    t = get_translation_manager().get_text
+
+    schedule = []
+    for index, (stage, timing, products) in enumerate(plan['schedule']):
+        schedule.append({
+            'stage': stage,
+            'timing': timing,
+            'fertilizer': ' + '.join(products),
+            'quantity': ' + '.join(f"{round(kg)} kg {name}" for name, kg in products.items()) + ' per acre',
+            'method': application_method(index, plan['group'], keys[2])
+        })
+
+    products_for_farm = []
+    cost = 0.0
+    for name, kg_per_acre in plan['products'].items():
+        if kg_per_acre < 0.5:
+            continue
+        _, bag_kg, bag_price, _, _ = FERTILIZER_PRODUCTS[name]
+        kg = kg_per_acre * farm_size
+        cost += kg / bag_kg * bag_price
+        products_for_farm.append({'name': name, 'kg_per_acre': round(kg_per_acre),
+                                  'kg': round(kg), 'bags': math.ceil(kg / bag_kg)})
+    cost_per_acre = cost / farm_size
+    product_kg_per_acre = sum(item['kg_per_acre'] for item in products_for_farm)
+
+    return {
+        'npk_ratio': f"{n}:{p}:{k}",
+        'nitrogen_details': {'amount': f"{n} kg/acre", 'role': t('for_leaf_growth', lang),
+                             'percentage': round(n / total_nutrients * 100)},
+        'phosphorus_details': {'amount': f"{p} kg/acre", 'role': t('for_root_development', lang),
+                               'percentage': round(p / total_nutrients * 100)},
+        'potassium_details': {'amount': f"{k} kg/acre", 'role': t('for_disease_resistance', lang),
+                              'percentage': round(k / total_nutrients * 100)},
+        'quantity_per_acre': f"{product_kg_per_acre} kg",
+        'total_required': f"{round(product_kg_per_acre * farm_size):,} kg",
+        'products_for_farm': products_for_farm,
+        'application_schedule': schedule,
+        'recommended_products': [{
+            'name': item['name'],
+            'type': FERTILIZER_PRODUCTS[item['name']][3],
+            'npk': ':'.join(str(round(share * 100)) for share in FERTILIZER_PRODUCTS[item['name']][0]),
+            'brand': FERTILIZER_PRODUCTS[item['name']][4],
+            'approx_price': f"₹ {FERTILIZER_PRODUCTS[item['name']][2]:,g}/{FERTILIZER_PRODUCTS[item['name']][1]} kg bag"
+        } for item in products_for_farm],
+        'organic_alternatives': ORGANIC_ALTERNATIVES + [BIOFERTILIZERS.get(plan['group'], DEFAULT_BIOFERTILIZER)],
+        'government_schemes': GOVERNMENT_SCHEMES,
+        'estimated_cost': f"₹ {round(cost):,}",
+        'cost_range': next((label for limit, label in COST_RANGES if cost_per_acre < limit), 'high'),
+        'basis': {
+            'crop': keys[0] or 'general',
+            'soil_type': keys[1] or 'unknown',
+            'irrigation_type': keys[2] or 'unknown',
+            'season': keys[3] or 'unknown',
+            'crop_matched': plan['crop_matched'],
+            'farm_size_acres': farm_size
+        }
+    }
+
+NARRATIVE_FIELDS = ('plan_summary', 'pro_tip', 'weather_adjustment', 'soil_health_tips',
+                    'irrigation_tips', 'personalized_advice')
+
+def default_fertilizer_narrative(inputs, plan):
+    """Template narrative used for quick results and when the LLM is unavailable"""
+    basis = plan['basis']
+    conditions = [f"{basis[key]} {label}" for key, label in
+                  (('soil_type', 'soil'), ('irrigation_type', 'irrigation'), ('season', 'season'))
+                  if basis[key] != 'unknown']
+    splits = len(plan['application_schedule'])
+    return {
+        'plan_summary': (f"Apply {plan['npk_ratio']} kg/acre of N:P2O5:K2O for {inputs['crop']}"
+                         f"{' (' + ', '.join(conditions) + ')' if conditions else ''}, "
+                         f"in {splits} application{'s' if splits > 1 else ''}."),
+        'pro_tip': 'Apply urea on moist soil and cover it lightly; never apply it just before heavy rain.',
+        'weather_adjustment': 'Postpone top dressing if more than 20 mm of rain is forecast in the next 48 hours.',
+        'soil_health_tips': 'Add 4-5 tonnes/acre of farmyard manure or compost every season to build organic carbon.',
+        'irrigation_tips': 'Irrigate lightly after each top dressing so the fertilizer reaches the root zone.',
+        'personalized_advice': ('Get a Soil Health Card test: if your soil tests high in P or K, '
+                                'cut those doses by up to 25%.')
+    }
+
+def fertilizer_narrative_flow(inputs, plan, lang):
+    """Flow: LLM narrative for a plan, shared by every farm in the same cohort and language"""
+    basis = plan['basis']
+    # The prompt names the crop as entered, so unlisted crops (all 'general' in
+    # the tables) each get their own cohort
+    crop = basis['crop'] if basis['crop_matched'] else str(inputs['crop']).strip().lower()
+    cohort_key = ('fertilizer-recommendation', crop, basis['soil_type'], basis['irrigation_type'],
+                  basis['season'], inputs['growth_stage'], date.today().isoformat())
+    narrative = yield from canonical_advisory_flow(
+        cohort_key, create_fertilizer_narrative_prompt(inputs, plan),
+        lambda r: isinstance(r, dict) and all(isinstance(r.get(field), str) for field in NARRATIVE_FIELDS)
+    )
+    if not isinstance(narrative, dict) or not all(isinstance(narrative.get(field), str) for field in NARRATIVE_FIELDS):
+        return default_fertilizer_narrative(inputs, plan)
+    narrative = {field: narrative[field] for field in NARRATIVE_FIELDS}
+    return (yield from render_advisory_flow(cohort_key, narrative, lang))
+
 # ========== PERSONALIZED RECOMMENDATION ROUTES ==========
-@app.route('/api/personalized-market', methods=['POST'])
+@bp.route('/api/personalized-market', methods=['POST'])
 @login_required
 def personalized_market():
     """Get personalized market prices"""
+    return run_flow(personalized_market_flow())
+
+def personalized_market_flow():
     try:
         user_data = request.json
         
@@ -1266,7 +3836,7 @@ def personalized_market():
         prompt = create_market_prompt(user_data)
         
         # Call LLM
-        market_data = call_llm_api(prompt)
+        market_data = yield from llm_json_flow(prompt, call_site='personalized-market')
         
         # Add timestamp
         market_data['timestamp'] = datetime.utcnow().isoformat()
@@ -1289,10 +3859,13 @@ def personalized_market():
             'fallback_data': generate_fallback_response("market")
         }), 500
 
-@app.route('/api/fertilizer-recommendation', methods=['POST'])
+@bp.route('/api/fertilizer-recommendation', methods=['POST'])
 @login_required
 def fertilizer_recommendation():
     """Get personalized fertilizer recommendations"""
+    return run_flow(fertilizer_recommendation_flow())
+
+def fertilizer_recommendation_flow():
     try:
         user_data = request.json
         
@@ -1300,23 +3873,27 @@ def fertilizer_recommendation():
         if not user_data:
             user_data = current_user.to_dict()
         
-        # Create prompt
-        prompt = create_fertilizer_prompt(user_data)
-        
-        # Call LLM
-        fertilizer_data = call_llm_api(prompt)
+        # Doses come from the nutrient tables; the LLM only explains them
+        user_lang = current_user.preferred_language or 'en'
+        inputs = fertilizer_inputs(user_data, current_user)
+        fertilizer_data = build_fertilizer_plan(inputs, user_lang)
+        if user_data.get('quickResults'):
+            narrative = default_fertilizer_narrative(inputs, fertilizer_data)
+        else:
+            narrative = yield from fertilizer_narrative_flow(inputs, fertilizer_data, user_lang)
+        fertilizer_data.update(narrative)
         
         # Add timestamp and user info
         fertilizer_data['timestamp'] = datetime.utcnow().isoformat()
-        fertilizer_data['user_crop'] = user_data.get('primary_crop', current_user.primary_crop)
-        fertilizer_data['farm_size'] = user_data.get('farm_size', current_user.farm_size)
+        fertilizer_data['user_crop'] = inputs['crop']
+        fertilizer_data['farm_size'] = inputs['farm_size']
         
         return jsonify({
             'success': True,
             'fertilizer_data': fertilizer_data,
             'user': {
-                'crop': user_data.get('primary_crop', current_user.primary_crop),
-                'farm_size': user_data.get('farm_size', current_user.farm_size)
+                'crop': inputs['crop'],
+                'farm_size': inputs['farm_size']
             }
         }), 200
         
@@ -1327,7 +3904,7 @@ def fertilizer_recommendation():
             'fallback_data': generate_fallback_response("fertilizer")
         }), 500
 # ========== WEATHER INSIGHTS - PERSONALIZED LLM ENDPOINT ==========
-@app.route('/api/weather-insights', methods=['POST'])
+@bp.route('/api/weather-insights', methods=['POST'])
 @login_required
 def get_weather_insights():
     """
@@ -1335,38 +3912,31 @@ def get_weather_insights():
     Takes: location, crop, current weather, forecast
     Returns: critical alerts, quick tips, hourly advice
     """
+    return run_flow(weather_insights_flow())
+
+def weather_insights_flow():
     try:
         data = request.json
         location = data.get('location', 'your farm')
         crop = data.get('crop', 'crops')
         weather_data = data.get('weather_data', {})
         
-        current = weather_data.get('current', {})
-        daily = weather_data.get('daily', {})
-        hourly = weather_data.get('hourly', {})
+        # Round readings so users with near-identical weather share one advisory
+        cohort_weather = round_weather_for_cohort(weather_data)
+        current = cohort_weather['current']
+        daily = cohort_weather['daily']
         
-        # Get user's preferred language
+        # Get user's preferred language (applied when rendering, not generating)
         user_lang = current_user.preferred_language or 'en'
-        lang_name = {
-            'en': 'English',
-            'hi': 'Hindi',
-            'te': 'Telugu',
-            'ta': 'Tamil'
-        }.get(user_lang, 'English')
+        
+        cohort_key = ('weather-insights', location, crop, date.today().isoformat(),
+                      json.dumps(cohort_weather, sort_keys=True))
         
         # Create LLM prompt
+        prompt_span = start_span('prompt.weather_insights')
         prompt = f"""
         You are an agricultural expert advisor for Indian farmers.
-        
-        --- CRITICAL LANGUAGE INSTRUCTION ---
-        You MUST respond in {lang_name} language.
-        The user's preferred language is {user_lang}.
-        
-        If user prefers Hindi: Write ALL text in Hindi (हिन्दी)
-        If user prefers Telugu: Write ALL text in Telugu (తెలుగు)
-        If user prefers Tamil: Write ALL text in Tamil (தமிழ்)
-        If user prefers English: Write in English
-        --------------------------------------
+        Write ALL text in English.
         
         Generate personalized farming advice based on this weather data:
         
@@ -1423,13 +3993,19 @@ def get_weather_insights():
         • Critical alert ONLY if weather is extreme (heavy rain >20mm, temp >35°C, temp <5°C, wind >30km/h)
         • Otherwise, set severity to "info" or "success"
         """
+        finish_span(prompt_span)
         
-        # Call LLM
-        llm_response = call_llm_api(prompt)
+        # Generate once per cohort, then render in the user's language
+        llm_response = yield from canonical_advisory_flow(
+            cohort_key, prompt,
+            lambda r: isinstance(r, dict) and 'critical_alert' in r
+        )
         
         # Ensure we have valid response
-        if not isinstance(llm_response, dict):
+        if not isinstance(llm_response, dict) or 'critical_alert' not in llm_response:
             llm_response = generate_fallback_weather_insights(location, crop, weather_data)
+        else:
+            llm_response = yield from render_advisory_flow(cohort_key, llm_response, user_lang)
         
         return jsonify({
             'success': True,
@@ -1450,6 +4026,7 @@ def get_weather_insights():
         }), 200
 
 
+@counts_fallback('weather_insights')
 def generate_fallback_weather_insights(location, crop, weather_data):
     """Generate fallback weather insights when LLM fails"""
     current = weather_data.get('current', {})
@@ -1520,7 +4097,7 @@ def generate_fallback_weather_insights(location, crop, weather_data):
         ]
     }
 # ========== FARM UPDATES - PERSONALIZED LLM ENDPOINT ==========
-@app.route('/api/farm-updates', methods=['GET'])
+@bp.route('/api/farm-updates', methods=['GET'])
 @login_required
 def get_farm_updates():
     """
@@ -1528,20 +4105,15 @@ def get_farm_updates():
     Based on: crop, location, season, soil, irrigation, weather
     Returns: [{icon, iconColor, bgColor, title, content}]
     """
+    return run_flow(farm_updates_flow())
+
+def farm_updates_flow():
     try:
         user = current_user
         
         # ========== 1. LANGUAGE DETECTION ==========
-        # Get user's preferred language
+        # Applied when rendering - the advisory itself is generated in English
         user_lang = user.preferred_language or 'en'
-        lang_name = {
-            'en': 'English',
-            'hi': 'Hindi',
-            'te': 'Telugu',
-            'ta': 'Tamil',
-            'mr': 'Marathi',
-            'bn': 'Bengali'
-        }.get(user_lang, 'English')
         
         # ========== 2. SEASON DETECTION ==========
         month = datetime.now().month
@@ -1571,7 +4143,8 @@ def get_farm_updates():
         weather_temp = "28"
         if user.latitude and user.longitude:
             try:
-                weather_response = requests.get(
+                weather_response = yield UpstreamRequest(
+                    'GET',
                     f"https://api.open-meteo.com/v1/forecast",
                     params={
                         'latitude': user.latitude,
@@ -1580,7 +4153,8 @@ def get_farm_updates():
                         'forecast_days': 1,
                         'timezone': 'auto'
                     },
-                    timeout=3
+                    timeout=3,
+                    name='open_meteo'
                 )
                 if weather_response.ok:
                     weather_data = weather_response.json()
@@ -1598,27 +4172,23 @@ def get_farm_updates():
                 pass
         
         # ========== 5. LLM PROMPT ==========
+        farm_size_bucket = get_farm_size_bucket(user.farm_size)
+        cohort_key = ('farm-updates', user.state, user.district, user.primary_crop,
+                      user.soil_type, user.irrigation_type, farm_size_bucket,
+                      season, crop_stage, weather_temp, weather_condition,
+                      date.today().isoformat())
+        
+        prompt_span = start_span('prompt.farm_updates')
         prompt = f"""
         You are an agricultural expert advisor for Indian farmers.
-        
-        --- CRITICAL LANGUAGE INSTRUCTION ---
-        You MUST respond in {lang_name} language.
-        The user's preferred language is {user_lang}.
-        
-        If user prefers Hindi: Write ALL text in Hindi (हिन्दी)
-        If user prefers Telugu: Write ALL text in Telugu (తెలుగు)
-        If user prefers Tamil: Write ALL text in Tamil (தமிழ்)
-        If user prefers English: Write in English
-        
-        DO NOT write in English if the user prefers another language.
-        --------------------------------------
+        Write ALL text in English.
         
         Generate 3 personalized, actionable farm updates based on this farmer's profile:
 
         --- FARMER PROFILE ---
         • Location: {user.district or 'Unknown'}, {user.state or 'Unknown'}
         • Primary Crop: {user.primary_crop or 'Not specified'}
-        • Farm Size: {user.farm_size or 'Unknown'} acres
+        • Farm Size: {farm_size_bucket}
         • Soil Type: {user.soil_type or 'Not specified'}
         • Irrigation: {user.irrigation_type or 'Not specified'}
         • Crop Stage: {crop_stage}
@@ -1658,12 +4228,15 @@ def get_farm_updates():
         • No generic advice like "monitor crops regularly"
         • Each update should be from a different category
         """
+        finish_span(prompt_span)
 
-        # ========== 6. CALL LLM ==========
-        llm_response = call_llm_api(prompt)
+        # ========== 6. CALL LLM (once per cohort) ==========
+        llm_response = yield from canonical_advisory_flow(cohort_key, prompt, is_valid_farm_updates)
         
         # ========== 7. PROCESS RESPONSE ==========
-        if isinstance(llm_response, dict) and 'updates' in llm_response:
+        if is_valid_farm_updates(llm_response):
+            llm_response = yield from render_advisory_flow(cohort_key, llm_response, user_lang,
+                                                           is_valid_farm_updates)
             updates = llm_response['updates'][:3]
         else:
             updates = generate_fallback_updates(user)
@@ -1683,6 +4256,12 @@ def get_farm_updates():
         }), 200
 
 
+@counts_fallback('updates')
+def is_valid_farm_updates(advisory):
+    """An LLM farm-updates advisory is only shared if 'updates' is a non-empty list of dicts"""
+    updates = advisory.get('updates') if isinstance(advisory, dict) else None
+    return isinstance(updates, list) and bool(updates) and all(isinstance(u, dict) for u in updates)
+
 def generate_fallback_updates(user):
     """Generate fallback farm updates when LLM fails"""
     crop = user.primary_crop or 'your crops'
@@ -1719,20 +4298,20 @@ def generate_fallback_updates(user):
             "content": f"{crop} prices are stable. Consider checking local mandi rates."
         }
     ]
-@app.route('/api/quick-recommendations', methods=['GET'])
+@bp.route('/api/quick-recommendations', methods=['GET'])
 @login_required
 def quick_recommendations():
     """Get quick personalized recommendations for dashboard"""
     try:
         user = current_user
         
-        # Create simple prompts for quick responses
+        # Create simple prompt for the market quick response
         market_prompt = f"Current market price for {user.primary_crop} in {user.district}, {user.state} in JSON: {{'price': '₹ X,XXX', 'trend': 'up/down'}}"
-        fertilizer_prompt = f"Brief fertilizer for {user.primary_crop} on {user.soil_type} soil in JSON: {{'npk': 'X:X:X', 'quantity': 'XXX kg/acre'}}"
         
         # Get quick responses
-        market_response = call_llm_api(market_prompt)
-        fertilizer_response = call_llm_api(fertilizer_prompt)
+        market_response = call_llm_api(market_prompt, call_site='quick-recommendations:market')
+        plan = build_fertilizer_plan(fertilizer_inputs({}, user), user.preferred_language or 'en')
+        fertilizer_response = {'npk': plan['npk_ratio'], 'quantity': f"{plan['quantity_per_acre']}/acre"}
         
         return jsonify({
             'success': True,
@@ -1754,7 +4333,7 @@ def quick_recommendations():
         }), 200
 
 # ========== TASK-BASED RECOMMENDATIONS ==========
-@app.route('/api/task-recommendation/<task_type>', methods=['GET'])
+@bp.route('/api/task-recommendation/<task_type>', methods=['GET'])
 @login_required
 def task_recommendation(task_type):
     """Get specific task-based recommendations"""
@@ -1775,7 +4354,7 @@ def task_recommendation(task_type):
             }), 400
         
         prompt = task_prompts[task_type]
-        recommendation = call_llm_api(prompt)
+        recommendation = call_llm_api(prompt, call_site='task-recommendation')
         
         return jsonify({
             'success': True,
@@ -1791,7 +4370,7 @@ def task_recommendation(task_type):
         }), 500
 
 # ========== DASHBOARD ROUTE ==========
-@app.route('/dashboard-data', methods=['GET'])
+@bp.route('/dashboard-data', methods=['GET'])
 def dashboard_data():
     """Get dashboard data"""
     try:
@@ -1804,16 +4383,16 @@ def dashboard_data():
             
         user = current_user
         
-        # Get chat statistics
-        chat_sessions = ChatSession.query.filter_by(user_id=user.id).count()
-        total_messages = ChatMessage.query.filter_by(user_id=user.id).count()
+        # Get chat statistics (maintained counters, no table scans)
+        chat_sessions = user.session_count or 0
+        total_messages = user.message_count or 0
         
         # Generate personalized market data using LLM
         user_data = user.to_dict()
         market_prompt = f"Current market price for {user.primary_crop} in {user.district} in JSON format."
         
         try:
-            market_response = call_llm_api(market_prompt)
+            market_response = call_llm_api(market_prompt, call_site='dashboard-data:market')
             market_data = {
                 'crop': user.primary_crop or 'Rice',
                 'price': market_response.get('price', '₹ 2,100'),
@@ -1833,12 +4412,13 @@ def dashboard_data():
                 'location': f"{user.state}, {user.district}"
             }
         
-        # Generate crop status
+        # Generate crop status (placeholder figures, fixed per user and day)
+        rng = random.Random(f"{user.id}|{date.today().isoformat()}")
         crop_status = {
             'stage': get_crop_stage(user.primary_crop),
-            'progress': random.randint(30, 80),
+            'progress': rng.randint(30, 80),
             'next_action': get_next_action(user.primary_crop),
-            'days_to_harvest': random.randint(30, 120)
+            'days_to_harvest': rng.randint(30, 120)
         }
         
         # Generate farm updates
@@ -1873,6 +4453,7 @@ def dashboard_data():
             'stats': {
                 'chat_sessions': chat_sessions,
                 'total_messages': total_messages,
+                'last_activity': user.last_activity.isoformat() if user.last_activity else None,
                 'farm_size': user.farm_size,
                 'crop_age': '45 days'
             },
@@ -1893,7 +4474,7 @@ def dashboard_data():
         }), 500
 
 # ========== CHAT ROUTES ==========
-@app.route('/chat/init', methods=['POST'])
+@bp.route('/chat/init', methods=['POST'])
 def init_chat():
     """Initialize chat session"""
     try:            
@@ -1916,7 +4497,9 @@ def init_chat():
                     title=title
                 )
                 db.session.add(chat_session)
+                increment_user_chat_counters(user_id, sessions=1)
                 db.session.commit()
+                invalidate_cached_user(user_id)
         
         return jsonify({
             'success': True,
@@ -1932,19 +4515,47 @@ def init_chat():
             'message': f'Error initializing chat: {str(e)}'
         }), 500
 
-@app.route('/chat/<session_id>/messages', methods=['GET'])
+@bp.route('/chat/<session_id>/messages', methods=['GET'])
 def get_session_messages(session_id):
-    """Get chat messages for a session"""
+    """
+    Get chat messages for a session, one page at a time.
+    Query params: limit, before=<cursor> (older page), after=<cursor> (newer page)
+    """
     try:
         user_id = current_user.id if current_user.is_authenticated else None
         
-        messages = get_chat_history(session_id, user_id)
+        try:
+            limit = int(request.args.get('limit', CHAT_HISTORY_DEFAULT_LIMIT))
+        except ValueError:
+            limit = CHAT_HISTORY_DEFAULT_LIMIT
+        limit = max(1, min(limit, CHAT_HISTORY_MAX_LIMIT))
+        
+        try:
+            before = decode_chat_cursor(request.args['before']) if request.args.get('before') else None
+            after = decode_chat_cursor(request.args['after']) if request.args.get('after') else None
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        # Bring the session back from cold storage if it was archived
+        rehydrate_chat_session(session_id, user_id)
+        
+        # Fetch one extra row to know whether another page exists
+        messages = get_chat_history(session_id, user_id, before=before, after=after, limit=limit + 1)
+        has_more = len(messages) > limit
+        if has_more:
+            messages = messages[:limit] if after is not None else messages[1:]
         
         return jsonify({
             'success': True,
             'messages': messages,
             'session_id': session_id,
-            'user_authenticated': bool(user_id)
+            'user_authenticated': bool(user_id),
+            'has_more': has_more,
+            'prev_cursor': messages[0]['cursor'] if messages else None,
+            'next_cursor': messages[-1]['cursor'] if messages else None
         }), 200
         
     except Exception as e:
@@ -1953,9 +4564,15 @@ def get_session_messages(session_id):
             'message': f'Error loading messages: {str(e)}'
         }), 500
 
-@app.route("/chat", methods=["POST"])
+@bp.route("/chat", methods=["POST"])
 def chat():
     """Handle chat messages"""
+    return run_flow(chat_flow())
+
+def chat_flow():
+    # Set once the message is accepted; until the turn is saved, errors save it with no reply
+    received_at = None
+    turn_saved = False
     try:
         data = request.get_json()
         user_msg = data.get("message", "")
@@ -1978,13 +4595,14 @@ def chat():
         # Get user language for saving message
         user_language = get_user_language_from_request(request)
         
-        # Save user message
-        save_chat_message(session_id, user_id, 'user', user_msg, language=user_language)
+        # The user message is saved together with the reply below
+        received_at = datetime.utcnow()
 
         # Check if API key is available
         if not GROQ_API_KEY:
             reply = "Chat functionality is currently unavailable. Please check the server configuration."
-            save_chat_message(session_id, user_id, 'assistant', reply, language=user_language)
+            save_chat_turn(session_id, user_id, user_msg, reply,
+                           language=user_language, received_at=received_at)
             
             return jsonify({
                 'success': True,
@@ -1993,14 +4611,9 @@ def chat():
                 'saved_to_db': True
             }), 200
 
-        # Call Groq API
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        # Get chat history for context
-        history = get_chat_history(session_id, user_id)
+        # Get recent chat history for context (the current message is not saved yet)
+        rehydrate_chat_session(session_id, user_id)
+        history = get_chat_history(session_id, user_id, limit=10)
         
         # Prepare messages for AI with personalized context
         user_info = ""
@@ -2026,26 +4639,20 @@ Always mention if advice is specific to the farmer's location or crop.
 If you don't know something, admit it and suggest where to find accurate information."""}]
         
         # Add recent history
-        for msg in history[-10:]:
+        for msg in history:
             ai_messages.append({"role": msg['role'], "content": msg['content']})
         
         # Add current message
         ai_messages.append({"role": "user", "content": user_msg})
 
-        data = {
-            "model": "llama-3.1-8b-instant",
-            "messages": ai_messages,
-            "temperature": 0.7,
-            "max_tokens": 1024
-        }
-
-        response = requests.post(GROQ_API_URL, headers=headers, json=data)
-        response.raise_for_status()
-        result = response.json()
-        reply = result['choices'][0]['message']['content']
+        # Call Groq API
+        llm_call, reply = yield from groq_completion_flow(ai_messages, temperature=0.7, call_site='chat')
+        finish_llm_call(llm_call, 'ok')
 
-        # Save AI response
-        save_chat_message(session_id, user_id, 'assistant', reply, language=user_language)
+        # Save user message and AI response in one transaction
+        save_chat_turn(session_id, user_id, user_msg, reply,
+                       language=user_language, received_at=received_at)
+        turn_saved = True
 
         return jsonify({
             'success': True,
@@ -2056,17 +4663,24 @@ If you don't know something, admit it and suggest where to find accurate informa
         }), 200
         
     except requests.exceptions.RequestException as e:
+        # Keep the user's message even though there is no reply
+        save_chat_turn(session_id, user_id, user_msg, None,
+                       language=user_language, received_at=received_at)
         return jsonify({
             'success': False,
             'message': f'Error connecting to AI service: {str(e)}'
         }), 500
     except Exception as e:
+        # e.g. an unexpected Groq response shape; the user's message is still kept
+        if received_at is not None and not turn_saved:
+            save_chat_turn(session_id, user_id, user_msg, None,
+                           language=user_language, received_at=received_at)
         return jsonify({
             'success': False,
             'message': f'Chat error: {str(e)}'
         }), 500
 
-@app.route('/user/chat-sessions', methods=['GET'])
+@bp.route('/user/chat-sessions', methods=['GET'])
 @login_required
 def get_chat_sessions():
     """Get user's chat sessions"""
@@ -2084,19 +4698,79 @@ def get_chat_sessions():
             'message': f'Error loading chat sessions: {str(e)}'
         }), 500
 
+@bp.route('/user/chat-search', methods=['GET'])
+@login_required
+def chat_search():
+    """Search the current user's chat history"""
+    try:
+        text = request.args.get('q', '').strip()
+        if not text:
+            return jsonify({
+                'success': False,
+                'message': 'Search query is required'
+            }), 400
+        
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, CHAT_SEARCH_MAX_LIMIT))
+        
+        if not chat_search_available():
+            return jsonify({
+                'success': False,
+                'message': 'Chat search is unavailable on this server'
+            }), 503
+        
+        results = search_chat_messages(current_user.id, text, limit)
+        
+        return jsonify({
+            'success': True,
+            'query': text,
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error searching chat history: {str(e)}'
+        }), 500
+
+@bp.route('/user/chat-export', methods=['GET'])
+@login_required
+def chat_export():
+    """Stream the current user's full chat history as NDJSON (?format=gzip to compress)"""
+    user_id = current_user.id
+    use_gzip = request.args.get('format', 'ndjson').lower() == 'gzip'
+    filename = f"chat-export-{date.today().isoformat()}.ndjson"
+    
+    lines = iter_chat_export_lines(user_id)
+    if use_gzip:
+        body = iter_gzip(lines)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+    else:
+        body = (line.encode('utf-8') for line in lines)
+        mimetype = 'application/x-ndjson'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 # ========== DATA ROUTES ==========
-@app.route('/states-districts.json', methods=['GET'])
+@bp.route('/states-districts.json', methods=['GET'])
 def get_states_districts_json():
     """Return states-districts data as JSON"""
     try:
-        return jsonify(stateDistricts), 200
+        return jsonify(get_state_districts()), 200
     except Exception as e:
         return jsonify({
             'success': False,
             'message': str(e)
         }), 500
 
-@app.route('/user/data', methods=['GET'])
+@bp.route('/user/data', methods=['GET'])
 @login_required
 def get_user_data():
     """Get user data"""
@@ -2124,7 +4798,7 @@ def get_user_data():
         }), 500
 
 # ========== TEST & DEBUG ROUTES ==========
-@app.route('/test', methods=['GET'])
+@bp.route('/test', methods=['GET'])
 def test():
     """Test endpoint"""
     return jsonify({
@@ -2141,6 +4815,8 @@ def test():
             'GET /states-districts.json',
             'POST /chat',
             'GET /user/chat-sessions',
+            'GET /user/chat-search',
+            'GET /user/chat-export',
             'POST /chat/init',
             'GET /chat/<session_id>/messages',
             'POST /api/personalized-market',
@@ -2153,7 +4829,11 @@ def test():
             'GET /api/detect-language',
             'POST /api/translate',
             'POST /api/voice/settings',
-            'POST /api/voice/speak'
+            'POST /api/voice/speak',
+            'GET /api/metrics/compression',
+            'GET /metrics',
+            'GET /admin/llm-telemetry',
+            'GET /admin/profiles'
         ],
         'language_info': {
             'current_language': get_user_language_from_request(request),
@@ -2165,7 +4845,7 @@ def test():
     })
 
 # ========== CORS HEADERS ==========
-@app.after_request
+@bp.after_app_request
 def after_request(response):
     """Add CORS headers to all responses"""
     origin = request.headers.get('Origin', '')
@@ -2185,6 +4865,129 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Credentials', 'true')
     return response
 
+# ========== RESPONSE COMPRESSION ==========
+# JSON responses get a weak ETag (so unchanged payloads come back as 304) and
+# are compressed with brotli or gzip when larger than COMPRESSION_MIN_SIZE.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+COMPRESSIBLE_MIMETYPES = {'application/json'}
+# Top-level fields left out of the ETag, so an unchanged payload with a fresh
+# timestamp still revalidates as 304. Only GET/HEAD responses get an ETag.
+ETAG_IGNORED_FIELDS = ('generated_at',)
+
+class CompressionMetrics:
+    """Thread-safe counters for bytes saved by compression and 304 responses"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {'compressed': 0, 'not_modified': 0, 'uncompressed': 0}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.bytes_saved_not_modified = 0
+        self.by_encoding = {}
+
+    def record_compressed(self, encoding, size_before, size_after):
+        with self._lock:
+            self.counts['compressed'] += 1
+            self.bytes_in += size_before
+            self.bytes_out += size_after
+            self.by_encoding[encoding] = self.by_encoding.get(encoding, 0) + 1
+
+    def record_not_modified(self, size):
+        with self._lock:
+            self.counts['not_modified'] += 1
+            self.bytes_saved_not_modified += size
+
+    def record_uncompressed(self):
+        with self._lock:
+            self.counts['uncompressed'] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'responses': dict(self.counts),
+                'by_encoding': dict(self.by_encoding),
+                'bytes_before_compression': self.bytes_in,
+                'bytes_after_compression': self.bytes_out,
+                'bytes_saved_compression': self.bytes_in - self.bytes_out,
+                'bytes_saved_not_modified': self.bytes_saved_not_modified,
+                'bytes_saved_total': self.bytes_in - self.bytes_out + self.bytes_saved_not_modified
+            }
+
+compression_metrics = CompressionMetrics()
+
+def collect_compression_metrics():
+    stats = compression_metrics.stats()
+    responses = Counter('http_compression_responses_total', 'JSON responses by compression outcome', ('outcome',))
+    for outcome, count in stats['responses'].items():
+        responses.inc(count, outcome=outcome)
+    saved = Counter('http_compression_saved_bytes_total', 'Bytes not sent thanks to compression or 304s', ('source',))
+    saved.inc(stats['bytes_saved_compression'], source='compression')
+    saved.inc(stats['bytes_saved_not_modified'], source='not_modified')
+    return [responses, saved]
+
+metrics.add_collector(collect_compression_metrics)
+
+def etag_payload(data):
+    """The bytes an ETag is computed from: the JSON body without ETAG_IGNORED_FIELDS"""
+    if not any(f'"{field}"'.encode('utf-8') in data for field in ETAG_IGNORED_FIELDS):
+        return data
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return data
+    if not isinstance(payload, dict):
+        return data
+    for field in ETAG_IGNORED_FIELDS:
+        payload.pop(field, None)
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL)
+
+@bp.after_app_request
+def compress_response(response):
+    """Add a weak ETag to JSON responses, answer 304 when it matches, else compress"""
+    if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    data = response.get_data()
+    
+    if request.method in ('GET', 'HEAD'):
+        response.set_etag(hashlib.blake2b(etag_payload(data), digest_size=16).hexdigest(), weak=True)
+        if not response.cache_control.no_store:
+            # Let browsers keep the payload but revalidate it on every use
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+        response.make_conditional(request)
+        if response.status_code == 304:
+            compression_metrics.record_not_modified(len(data))
+            return response
+    
+    response.vary.add('Accept-Encoding')
+    encodings = ['br', 'gzip'] if brotli else ['gzip']
+    encoding = request.accept_encodings.best_match(encodings)
+    if len(data) < COMPRESSION_MIN_SIZE or encoding is None:
+        compression_metrics.record_uncompressed()
+        return response
+    
+    compressed = compress_body(data, encoding)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    compression_metrics.record_compressed(encoding, len(data), len(compressed))
+    return response
+
+@bp.route('/api/metrics/compression', methods=['GET'])
+def compression_stats():
+    """Bytes saved by response compression and conditional GETs in this process"""
+    return jsonify({'success': True, 'compression': compression_metrics.stats()})
+
 # ========== AUTO-OPEN BROWSER FUNCTION ==========
 def open_browser():
     """Automatically open browser when server starts"""
@@ -2206,38 +5009,124 @@ def open_browser():
         print(f"⚠️  Could not open browser automatically: {e}")
         print(f"\n📱 Please manually open: {url}")
 
-# ========== INITIALIZE DATABASE & TRANSLATIONS ==========
-with app.app_context():
-    db.create_all()
-    
-    # Initialize translation manager
-    translation_manager = TranslationManager(app)
-    
-    print("=" * 60)
-    print("✅ Database initialized!")
-    print("🌍 Translation manager loaded")
-    print(f"📚 Available languages: {', '.join(translation_manager.get_available_languages())}")
-    print("🚀 Smart Crop Advisory System Ready!")
-    print("📊 SQLite database: users.db")
-    print("🌐 Server: http://localhost:5001")
-    print("🔐 Flask-Login Authentication")
-    print("📍 Districts data loaded from districts.json")
-    print(f"📝 States available: {len(stateDistricts)}")
-    print("🔄 CORS configured for local development")
-    print("🤖 LLM-Powered Personalized Recommendations")
-    print("💰 Personalized Market Prices API")
-    print("🌱 Personalized Fertilizer Recommendations API")
-    print("🗣️  Voice Features Enabled")
-    print("🌍 Multi-Language Support Available")
-    print("📱 Industry-standard language detection")
-    print("👤 Guest user language persistence")
-    print("🔗 Context processor provides {{ user_language }} and {{ t() }}")
-    print("=" * 60)
+# ========== BACKGROUND WORKERS ==========
+def start_background_workers(app):
+    """
+    Start this process's background threads. Threads do not survive fork(), so
+    a pre-forking server sets DEFER_BACKGROUND_WORKERS=true and calls this in
+    each worker instead (see gunicorn.conf.py).
+    """
+    global chat_write_queue
+    
+    if CHAT_WRITE_BEHIND and chat_write_queue is None:
+        chat_write_queue = ChatWriteQueue(app, CHAT_WRITE_BEHIND_BATCH, CHAT_WRITE_BEHIND_INTERVAL)
+        chat_write_queue.start()
+        print(f"✓ Chat write-behind enabled (batch {CHAT_WRITE_BEHIND_BATCH})")
+    
+    if GUEST_CHAT_SWEEP_INTERVAL > 0:
+        start_guest_chat_sweeper(app)
+
+# ========== APPLICATION FACTORY ==========
+def create_app(config=None):
+    """
+    Create and configure the Flask app. `config` is a dict of overrides.
+    Translations, districts data and the LLM client are loaded lazily on first
+    use, so creating the app stays fast.
+    """
+    # Static files are served by main.serve_static, which sets the cache policy
+    app = Flask(__name__, 
+                static_folder=None,
+                template_folder='templates')
+    app.config.update(get_default_config())
+    if config:
+        app.config.update(config)
+    
+    # Compiled templates are cached on disk so new workers skip recompiling
+    bytecode_dir = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if bytecode_dir:
+        os.makedirs(bytecode_dir, exist_ok=True)
+        app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(bytecode_dir)}
+    
+    # Initialize extensions
+    db.init_app(app)
+    bcrypt.init_app(app)
+    login_manager.init_app(app)
+    
+    # Configure CORS properly
+    CORS(app, 
+         resources={r"/*": {
+             "origins": ["http://localhost:5500", "http://127.0.0.1:5500", 
+                        "http://localhost:3000", "http://127.0.0.1:3000",
+                        "http://localhost:8080", "http://127.0.0.1:8080",
+                        "http://localhost:5000", "http://127.0.0.1:5000"],
+             "supports_credentials": True,
+             "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Accept"],
+             "expose_headers": ["Set-Cookie", "Content-Type", "Authorization"],
+             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
+         }},
+         supports_credentials=True)
+    
+    app.register_blueprint(bp)
+    
+    with app.app_context():
+        install_query_hooks(db.engine, app.config['DB_SLOW_QUERY_MS'])
+    
+    if app.config['AUTO_MIGRATE']:
+        with app.app_context():
+            db.create_all()
+            run_migrations()
+    
+    if os.environ.get('DEFER_BACKGROUND_WORKERS', 'false').lower() != 'true':
+        start_background_workers(app)
     
     if not GROQ_API_KEY:
-        print("⚠️  IMPORTANT: Set GROQ_API_KEY in .env file for chat functionality")
+        print("⚠️  WARNING: GROQ_API_KEY environment variable not set!")
+        print("⚠️  Chat functionality will not work without API key")
+        print("⚠️  Set it in .env file: GROQ_API_KEY='your-key-here'")
+    
+    return app
+
+_app = None
+
+def __getattr__(name):
+    """Create the module-level `app` on first access (e.g. `from app import app`)"""
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def print_startup_banner(app):
+    with app.app_context():
+        print("=" * 60)
+        print("✅ Database initialized!")
+        print("🌍 Translation manager loaded")
+        print(f"📚 Available languages: {', '.join(get_translation_manager().get_available_languages())}")
+        print("🚀 Smart Crop Advisory System Ready!")
+        print("📊 SQLite database: users.db")
+        print("🌐 Server: http://localhost:5001")
+        print("🔐 Flask-Login Authentication")
+        print("📍 Districts data loaded from districts.json")
+        print(f"📝 States available: {len(get_state_districts())}")
+        print("🔄 CORS configured for local development")
+        print("🤖 LLM-Powered Personalized Recommendations")
+        print("💰 Personalized Market Prices API")
+        print("🌱 Personalized Fertilizer Recommendations API")
+        print("🗣️  Voice Features Enabled")
+        print("🌍 Multi-Language Support Available")
+        print("📱 Industry-standard language detection")
+        print("👤 Guest user language persistence")
+        print("🔗 Context processor provides {{ user_language }} and {{ t() }}")
+        print("=" * 60)
+        
+        if not GROQ_API_KEY:
+            print("⚠️  IMPORTANT: Set GROQ_API_KEY in .env file for chat functionality")
 
 if __name__ == "__main__":
+    app = create_app()
+    print_startup_banner(app)
+    
     # Start browser in background thread
     browser_thread = threading.Thread(target=open_browser, daemon=True)
     browser_thread.start()
@@ -0,0 +1,240 @@
+"""
+ASGI entry point: serves the app on an asyncio event loop.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 4
+
+The LLM- and weather-bound routes (/chat, /api/farm-updates,
+/api/weather-insights, /api/personalized-market,
+/api/fertilizer-recommendation) return their upstream calls
+as flows (see UPSTREAM CALLS in app.py). Here those calls are awaited on a
+shared httpx.AsyncClient, so a request waiting on Groq or Open-Meteo holds no
+thread. The Flask code between upstream calls (auth, DB access, rendering)
+still runs on a small thread pool, in the request's own context.
+
+Settings (environment variables):
+  ASYNC_THREADS          threads for the Flask steps (default 32)
+  ASYNC_MAX_CONNECTIONS  concurrent upstream connections (default 1000)
+  ASYNC_UPSTREAM_TIMEOUT seconds per upstream call without its own timeout (default 60)
+"""
+import asyncio
+import contextvars
+import functools
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import requests
+from flask import request_started
+
+# Hides debug-only response headers such as X-DB-Queries
+os.environ.setdefault('APP_ENV', 'production')
+
+from app import (app as flask_app, db, ASYNC_FLOW_ENVIRON_KEY, DeferredFlow, UpstreamResponse,
+                 advance_flow, record_upstream_call, run_profiled_step)
+
+ASYNC_THREADS = int(os.environ.get('ASYNC_THREADS', 32))
+ASYNC_MAX_CONNECTIONS = int(os.environ.get('ASYNC_MAX_CONNECTIONS', 1000))
+ASYNC_UPSTREAM_TIMEOUT = float(os.environ.get('ASYNC_UPSTREAM_TIMEOUT', 60))
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope into a WSGI environ"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        ASYNC_FLOW_ENVIRON_KEY: True,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        value = value.decode('latin1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        if key in environ:
+            separator = '; ' if key == 'HTTP_COOKIE' else ','
+            value = f'{environ[key]}{separator}{value}'
+        environ[key] = value
+    return environ
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+class AsyncFlaskApp:
+    """ASGI app that runs a Flask app's views and awaits their upstream calls"""
+    def __init__(self, app, threads=ASYNC_THREADS, max_connections=ASYNC_MAX_CONNECTIONS,
+                 timeout=ASYNC_UPSTREAM_TIMEOUT):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi-worker')
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=min(max_connections, 100))
+        self.timeout = timeout
+        self.client = None
+
+    def get_client(self):
+        # Created on first use so it binds to the server's event loop
+        if self.client is None:
+            self.client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self.client
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            body = await read_body(receive)
+            await self.handle(build_environ(scope, body), send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.client is not None:
+                    await self.client.aclose()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle(self, environ, send):
+        """Mirror Flask.wsgi_app, awaiting a view's deferred flow between steps"""
+        loop = asyncio.get_running_loop()
+        # Every step runs in this one context, so the pushed request context
+        # (and the DB session scoped to it) follows the request across threads.
+        # A profiled request's profiler is switched on for each step's thread.
+        context = contextvars.copy_context()
+
+        def in_thread(fn, *args):
+            return loop.run_in_executor(self.executor, functools.partial(context.run, run_profiled_step, fn, *args))
+
+        ctx = self.app.request_context(environ)
+        await in_thread(ctx.push)
+        error = None
+        try:
+            try:
+                rv = await in_thread(self.dispatch)
+                while isinstance(rv, DeferredFlow):
+                    rv = await self.drive(rv.flow, in_thread)
+                response = await in_thread(self.app.finalize_request, rv)
+            except Exception as e:
+                error = e
+                response = await in_thread(self.app.handle_exception, e)
+            await self.send_response(response, environ, send, in_thread)
+        finally:
+            await in_thread(ctx.pop, error)
+
+    def dispatch(self):
+        """Flask.full_dispatch_request without finalizing; the view may return a DeferredFlow"""
+        self.app._got_first_request = True
+        try:
+            request_started.send(self.app)
+            rv = self.app.preprocess_request()
+            if rv is None:
+                rv = self.app.dispatch_request()
+        except Exception as e:
+            rv = self.app.handle_user_exception(e)
+        return rv
+
+    def advance(self, flow, value=None, error=None):
+        try:
+            finished, result = advance_flow(flow, value, error)
+        except Exception as e:
+            return True, self.app.handle_user_exception(e)
+        if not finished:
+            # Give the DB connection back to the pool while the upstream call is awaited
+            db.session.close()
+        return finished, result
+
+    async def drive(self, flow, in_thread):
+        finished, result = await in_thread(self.advance, flow)
+        while not finished:
+            try:
+                response = await self.fetch(result)
+            except requests.exceptions.RequestException as e:
+                finished, result = await in_thread(self.advance, flow, None, e)
+            else:
+                finished, result = await in_thread(self.advance, flow, response)
+        return result
+
+    async def fetch(self, upstream_request):
+        """Perform an UpstreamRequest, raising the requests exceptions flows expect"""
+        timeout = upstream_request.timeout
+        if timeout is None:
+            timeout = httpx.USE_CLIENT_DEFAULT
+        started_at = time.perf_counter()
+        try:
+            try:
+                response = await self.get_client().request(
+                    upstream_request.method,
+                    upstream_request.url,
+                    headers=upstream_request.headers,
+                    params=upstream_request.params,
+                    json=upstream_request.json,
+                    timeout=timeout
+                )
+            except httpx.TimeoutException as e:
+                raise requests.exceptions.Timeout(str(e)) from e
+            except httpx.HTTPError as e:
+                raise requests.exceptions.ConnectionError(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            record_upstream_call(upstream_request, started_at, error=e)
+            raise
+        record_upstream_call(upstream_request, started_at, status_code=response.status_code)
+        return UpstreamResponse(response.status_code, response.content)
+
+    async def send_response(self, response, environ, send, in_thread):
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = headers
+
+        body = await in_thread(response, environ, start_response)
+        await send({
+            'type': 'http.response.start',
+            'status': started['status'],
+            'headers': [(name.lower().encode('latin1'), value.encode('latin1'))
+                        for name, value in started['headers']]
+        })
+        try:
+            # Pulled one chunk per step so streaming responses (e.g. the chat
+            # export) run inside the request context
+            iterator = iter(body)
+            while True:
+                chunk = await in_thread(next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            if hasattr(body, 'close'):
+                await in_thread(body.close)
+        await send({'type': 'http.response.body', 'body': b''})
+
+app = AsyncFlaskApp(flask_app)
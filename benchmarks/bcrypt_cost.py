@@ -0,0 +1,50 @@
+"""
+Report bcrypt throughput (hashes/sec) for a range of cost factors.
+
+Use it to pick BCRYPT_LOG_ROUNDS and BCRYPT_WORKERS for the deployment host:
+    python benchmarks/bcrypt_cost.py --min-cost 8 --max-cost 14 --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+PASSWORD = b'correct-horse-battery'
+
+def measure(cost, seconds, workers):
+    """Return hashes/sec for one cost factor using `workers` threads"""
+    salt = bcrypt.gensalt(rounds=cost)
+
+    def hash_until(deadline):
+        count = 0
+        while time.perf_counter() < deadline:
+            bcrypt.hashpw(PASSWORD, salt)
+            count += 1
+        return count
+
+    start = time.perf_counter()
+    deadline = start + seconds
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        total = sum(executor.map(hash_until, [deadline] * workers))
+    elapsed = time.perf_counter() - start
+    return total / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min-cost', type=int, default=8)
+    parser.add_argument('--max-cost', type=int, default=14)
+    parser.add_argument('--seconds', type=float, default=2.0, help='Time spent per cost factor')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help='Parallel hashing threads (compare with BCRYPT_WORKERS)')
+    args = parser.parse_args()
+
+    print(f"{'cost':>4}  {'1 thread':>12}  {f'{args.workers} threads':>12}  {'ms/hash':>8}")
+    for cost in range(args.min_cost, args.max_cost + 1):
+        single = measure(cost, args.seconds, 1)
+        parallel = measure(cost, args.seconds, args.workers)
+        print(f"{cost:>4}  {single:>10.1f}/s  {parallel:>10.1f}/s  {1000 / single:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Microbenchmarks for the app's pure hot paths, compared against a saved baseline.
+
+    python benchmarks/hot_paths.py --save          # record benchmarks/baselines/hot_paths.json
+    python benchmarks/hot_paths.py                 # compare; exits 1 on a regression
+    python benchmarks/hot_paths.py -k language --tolerance 0.5
+
+Each case reports the best per-call time over --repeat rounds (as timeit
+recommends, the minimum is the least noisy estimate). A case regresses when it
+is more than --tolerance slower than its baseline. Baselines are only
+comparable on the machine that recorded them; record one per CI runner.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baselines', 'hot_paths.json')
+
+os.environ.setdefault('DEFER_BACKGROUND_WORKERS', 'true')
+sys.path.insert(0, ROOT)
+
+import app as smartcrop  # noqa: E402
+
+ACCEPT_LANGUAGE = 'te-IN,te;q=0.9,hi;q=0.8,en-US;q=0.6,en;q=0.5'
+HISTORY_MESSAGES = 500
+
+USER_DATA = {
+    'state': 'Telangana',
+    'district': 'Warangal',
+    'primary_crop': 'Cotton',
+    'farm_size': 4.5,
+    'soil_type': 'Black',
+    'irrigation_type': 'Drip',
+    'preferred_language': 'te'
+}
+
+FERTILIZER_INPUTS = {
+    'crop': 'Cotton',
+    'soil_type': 'Black Soil',
+    'irrigation_type': 'Drip',
+    'season': 'Kharif',
+    'growth_stage': 'Flowering',
+    'farm_size': 4.5
+}
+
+LLM_REPLY = '''Here is the advice:
+```json
+{"price": "₹ 2,450 per quintal", "trend": "up", "trend_percentage": "3.2%",
+ "nearby_mandis": [{"name": "Warangal APMC", "price": "₹ 2,500", "distance": "12 km"},
+                   {"name": "Hanamkonda", "price": "₹ 2,430", "distance": "18 km"}],
+ "personalized_advice": "Hold your cotton for two weeks if storage allows."}
+```'''
+
+WEATHER_DATA = {
+    'current': {'temperature_2m': 36.5, 'precipitation': 0.0, 'wind_speed_10m': 14.0,
+                'relative_humidity_2m': 42},
+    'daily': {'temperature_2m_max': [37, 38, 36, 35, 34, 36, 37],
+              'temperature_2m_min': [26, 27, 25, 24, 24, 25, 26],
+              'precipitation_sum': [0, 0, 2.5, 8.0, 0, 0, 0]}
+}
+
+def seed_chat_history(user_id, session_id):
+    """Write HISTORY_MESSAGES messages (half user, half assistant) to one session"""
+    start = datetime(2024, 1, 1)
+    turns = [{
+        'session_id': session_id,
+        'user_id': user_id,
+        'user_message': f'Question {i} about irrigation scheduling for cotton?',
+        'reply': f'Answer {i}: water every 4-5 days and watch for bollworm.',
+        'language': 'en',
+        'received_at': start + timedelta(minutes=i),
+        'replied_at': start + timedelta(minutes=i, seconds=5)
+    } for i in range(HISTORY_MESSAGES // 2)]
+    smartcrop.persist_chat_turns(turns)
+
+def build_cases(flask_app):
+    """Return {name: zero-argument callable}; callables run inside flask_app's contexts"""
+    smartcrop.db.session.add(smartcrop.User(
+        username='bench', email='bench@example.com', password_hash='x', **USER_DATA))
+    smartcrop.db.session.commit()
+    user = smartcrop.User.query.filter_by(username='bench').one()
+    seed_chat_history(user.id, 'bench-session')
+    user_id = user.id
+
+    manager = smartcrop.get_translation_manager()
+    fertilizer_plan = smartcrop.build_fertilizer_plan(FERTILIZER_INPUTS)
+    state, district = next(iter(smartcrop.get_district_coordinates()))
+
+    def in_request(fn):
+        def run():
+            with flask_app.test_request_context('/', headers={'Accept-Language': ACCEPT_LANGUAGE}):
+                return fn()
+        return run
+
+    def extract_reply_json():
+        _, text = smartcrop.extract_json_text(LLM_REPLY)
+        return json.loads(text)
+
+    return {
+        'request_context': in_request(lambda: None),
+        'detect_browser_language': in_request(lambda: smartcrop.detect_browser_language(smartcrop.request)),
+        'get_user_language_from_request': in_request(
+            lambda: smartcrop.get_user_language_from_request(smartcrop.request)),
+        'get_coordinates_from_json': lambda: smartcrop.get_coordinates_from_json(state, district),
+        'get_coordinates_from_json:fallback': lambda: smartcrop.get_coordinates_from_json('Telangana', 'Nowhere'),
+        'translation_get_text': lambda: manager.get_text('welcome_message', 'hi'),
+        'create_market_prompt': lambda: smartcrop.create_market_prompt(USER_DATA),
+        'build_fertilizer_plan': lambda: smartcrop.build_fertilizer_plan(FERTILIZER_INPUTS),
+        'create_fertilizer_narrative_prompt': lambda: smartcrop.create_fertilizer_narrative_prompt(
+            FERTILIZER_INPUTS, fertilizer_plan),
+        'llm_json_extraction': extract_reply_json,
+        'generate_fallback_weather_insights': lambda: smartcrop.generate_fallback_weather_insights(
+            'Warangal, Telangana', 'Cotton', WEATHER_DATA),
+        'get_chat_history:latest_50': lambda: smartcrop.get_chat_history('bench-session', user_id, limit=50),
+        'get_chat_history:all': lambda: smartcrop.get_chat_history('bench-session', user_id),
+    }
+
+def measure(fn, repeat):
+    """Best seconds per call over `repeat` rounds of an auto-ranged loop"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('-k', '--filter', default='', help='Only run cases whose name contains this')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown before a case fails (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    flask_app = smartcrop.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'DB_QUERY_HEADERS': False})
+    baseline = None if args.save else load_baseline(args.baseline)
+
+    results = {}
+    regressions = []
+    with flask_app.app_context():
+        cases = build_cases(flask_app)
+        print(f"{'case':<40} {'µs/call':>10} {'baseline':>10} {'change':>8}")
+        for name, fn in cases.items():
+            if args.filter not in name:
+                continue
+            fn()  # warm caches (translations, districts, statement cache)
+            micros = measure(fn, args.repeat) * 1e6
+            results[name] = round(micros, 3)
+
+            previous = (baseline or {}).get('results', {}).get(name)
+            if previous:
+                change = micros / previous - 1
+                flag = '  REGRESSION' if change > args.tolerance else ''
+                print(f"{name:<40} {micros:>10.2f} {previous:>10.2f} {change:>+7.0%}{flag}")
+                if flag:
+                    regressions.append(name)
+            else:
+                print(f"{name:<40} {micros:>10.2f} {'-':>10} {'':>8}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+                'results': results
+            }, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {os.path.relpath(args.baseline, ROOT)}")
+    elif baseline is None:
+        print("No baseline yet; record one with --save")
+    elif regressions:
+        print(f"FAIL: {len(regressions)} case(s) more than {args.tolerance:.0%} slower: {', '.join(regressions)}")
+        sys.exit(1)
+    else:
+        print("OK")
+
+if __name__ == '__main__':
+    main()
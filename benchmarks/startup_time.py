@@ -0,0 +1,54 @@
+"""
+Measure cold-start time: `import app` and `create_app()`, each in a fresh
+interpreter. Exits non-zero if the median exceeds the target.
+
+    python benchmarks/startup_time.py --runs 5 --max-import-ms 1500 --max-create-ms 300
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+created = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'create_ms': (created - imported) * 1000}))
+"""
+
+def run_probe():
+    env = dict(os.environ, DEFER_BACKGROUND_WORKERS='true')
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    # The probe prints its measurements on the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=1500)
+    parser.add_argument('--max-create-ms', type=float, default=300)
+    args = parser.parse_args()
+
+    run_probe()  # warm the bytecode cache
+    samples = [run_probe() for _ in range(args.runs)]
+    import_ms = statistics.median(s['import_ms'] for s in samples)
+    create_ms = statistics.median(s['create_ms'] for s in samples)
+
+    print(f"import app:   {import_ms:8.1f} ms (target {args.max_import_ms:.0f} ms)")
+    print(f"create_app(): {create_ms:8.1f} ms (target {args.max_create_ms:.0f} ms)")
+
+    if import_ms > args.max_import_ms or create_ms > args.max_create_ms:
+        print("FAIL: cold start over target")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Build the static bundles: minify static/src/{css,js}/*, fingerprint the
+results into static/dist/ and write static/dist/manifest.json.
+
+    python build_assets.py        (or: flask --app wsgi build-assets)
+
+Templates link bundles with {{ asset_url('js/dashboard.js') }}, which resolves
+through the manifest to e.g. /static/dist/js/dashboard.1a2b3c4d.min.js. The
+fingerprint changes with the content, so the files are served as immutable.
+Without a build, asset_url() falls back to the unminified source.
+
+rjsmin/rcssmin are used when installed; otherwise a conservative built-in
+minifier strips comments and whitespace.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_FOLDER = os.path.join(ROOT, 'static')
+SOURCE_DIR = 'src'
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# A '/' after one of these starts a regex literal rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do', 'else'}
+
+def js_tokens(source):
+    """
+    Split JavaScript into (kind, text) pieces, where kind is 'code', 'string',
+    'template' (literal text of a template string, including its delimiters),
+    'regex' or 'comment'. Concatenating the texts gives back the source.
+    """
+    tokens = []
+    i, n = 0, len(source)
+    start = 0
+    # One entry per open template literal: the brace depth of its current ${...}
+    template_depths = []
+
+    def flush(end):
+        if end > start:
+            tokens.append(('code', source[start:end]))
+
+    def previous_code():
+        for kind, text in reversed(tokens):
+            if kind == 'comment':
+                continue
+            if kind != 'code':
+                return kind, text
+            stripped = text.rstrip()
+            if stripped:
+                return kind, stripped
+        return 'code', ''
+
+    def scan_template(pos):
+        """Scan template text from pos; returns (end, opens_substitution)"""
+        while pos < n:
+            ch = source[pos]
+            if ch == '\\':
+                pos += 2
+            elif ch == '`':
+                return pos + 1, False
+            elif ch == '$' and source.startswith('${', pos):
+                return pos + 2, True
+            else:
+                pos += 1
+        return n, False
+
+    while i < n:
+        ch = source[i]
+        if ch in '\'"':
+            flush(i)
+            j = i + 1
+            while j < n and source[j] != ch and source[j] != '\n':
+                j += 2 if source[j] == '\\' else 1
+            tokens.append(('string', source[i:j + 1]))
+            i = start = j + 1
+        elif ch == '`':
+            flush(i)
+            end, opens = scan_template(i + 1)
+            tokens.append(('template', source[i:end]))
+            if opens:
+                template_depths.append(0)
+            i = start = end
+        elif ch == '{' and template_depths:
+            template_depths[-1] += 1
+            i += 1
+        elif ch == '}' and template_depths and template_depths[-1] == 0:
+            # Closes a ${...}: continue the enclosing template literal
+            flush(i)
+            template_depths.pop()
+            end, opens = scan_template(i + 1)
+            tokens.append(('template', source[i:end]))
+            if opens:
+                template_depths.append(0)
+            i = start = end
+        elif ch == '}' and template_depths:
+            template_depths[-1] -= 1
+            i += 1
+        elif source.startswith('//', i):
+            flush(i)
+            j = source.find('\n', i)
+            j = n if j == -1 else j
+            tokens.append(('comment', source[i:j]))
+            i = start = j
+        elif source.startswith('/*', i):
+            flush(i)
+            j = source.find('*/', i + 2)
+            j = n if j == -1 else j + 2
+            tokens.append(('comment', source[i:j]))
+            i = start = j
+        elif ch == '/':
+            flush(i)
+            start = i
+            kind, text = previous_code()
+            last_word = re.search(r'[A-Za-z_$][\w$]*$', text)
+            if kind == 'code' and (not text or text[-1] in REGEX_PRECEDERS
+                                   or (last_word and last_word.group() in REGEX_KEYWORDS)):
+                j = i + 1
+                in_class = False
+                while j < n and source[j] != '\n':
+                    if source[j] == '\\':
+                        j += 2
+                        continue
+                    if source[j] == '[':
+                        in_class = True
+                    elif source[j] == ']':
+                        in_class = False
+                    elif source[j] == '/' and not in_class:
+                        break
+                    j += 1
+                j += 1
+                while j < n and (source[j].isalnum() or source[j] == '_'):
+                    j += 1  # flags
+                tokens.append(('regex', source[i:j]))
+                i = start = j
+            else:
+                i += 1
+        else:
+            i += 1
+    flush(n)
+    return tokens
+
+def minify_code(code):
+    """Collapse whitespace in a run of JS code, keeping newlines for ASI"""
+    lines = [re.sub(r'[ \t]+', ' ', line.strip()) for line in code.split('\n')]
+    code = '\n'.join(lines)
+    code = re.sub(r'\n+', '\n', code)
+    return re.sub(r' ?([{}()\[\];,:=]) ?', r'\1', code)
+
+def minify_js(source):
+    if rjsmin:
+        return rjsmin.jsmin(source)
+    pieces = ['']
+    for kind, text in js_tokens(source):
+        if kind == 'comment':
+            # Keep a line break so the comment cannot join two statements
+            text = '\n' if text.startswith('//') or '\n' in text else ' '
+        elif kind == 'code':
+            text = minify_code(text)
+        else:
+            pieces.append(text)
+            continue
+        # Newlines inside strings and templates are content; only collapse these
+        if pieces[-1].endswith('\n'):
+            text = text.lstrip('\n')
+        pieces.append(text)
+    return ''.join(pieces).strip() + '\n'
+
+def minify_css(source):
+    if rcssmin:
+        return rcssmin.cssmin(source)
+    # Keep quoted strings intact while collapsing everything else
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', source)
+    out = []
+    for index, part in enumerate(parts):
+        if index % 2:
+            out.append(part)
+            continue
+        part = re.sub(r'/\*.*?\*/', '', part, flags=re.S)
+        part = re.sub(r'\s+', ' ', part)
+        part = re.sub(r' ?([{};,>]) ?', r'\1', part)
+        # Only the space after ':' goes; 'a :hover' in a selector means something else
+        part = part.replace(': ', ':')
+        out.append(part.replace(';}', '}'))
+    return ''.join(out).strip() + '\n'
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+def build_assets(static_folder=STATIC_FOLDER, verbose=True):
+    """Minify and fingerprint every source asset. Returns the manifest."""
+    source_root = os.path.join(static_folder, SOURCE_DIR)
+    dist_root = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist_root, ignore_errors=True)
+
+    manifest = {}
+    for directory, _, filenames in os.walk(source_root):
+        for filename in sorted(filenames):
+            stem, ext = os.path.splitext(filename)
+            if ext not in MINIFIERS:
+                continue
+            source_path = os.path.join(directory, filename)
+            logical = os.path.relpath(source_path, source_root).replace(os.sep, '/')
+            with open(source_path, encoding='utf-8') as f:
+                source = f.read()
+
+            data = MINIFIERS[ext](source).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            built = f'{DIST_DIR}/{os.path.dirname(logical)}/{stem}.{digest}.min{ext}'.replace('//', '/')
+            target = os.path.join(static_folder, built)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+            # Precompressed copies, picked by serve_static from Accept-Encoding
+            with open(target + '.gz', 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli:
+                with open(target + '.br', 'wb') as f:
+                    f.write(brotli.compress(data))
+
+            manifest[logical] = built
+            if verbose:
+                print(f"✓ {logical}: {len(source.encode('utf-8'))} -> {len(data)} bytes ({built})")
+
+    os.makedirs(dist_root, exist_ok=True)
+    with open(os.path.join(dist_root, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+if __name__ == '__main__':
+    build_assets()
@@ -0,0 +1,244 @@
+"""
+Generate a large synthetic dataset for scale testing.
+
+    flask --app wsgi generate-dataset --users 100000 --sessions 1000000 --messages 10000000
+
+Users get profiles drawn from districts.json and the crop/soil/irrigation
+options of the signup and profile forms. Sessions per user and messages per
+session follow a long-tailed distribution, so there are a few heavy users and
+long conversations as in real traffic. Message lengths are log-normal (short
+questions, longer answers). The same --seed produces the same users and
+conversations; timestamps are relative to the time of the run.
+
+Rows are written with executemany in batches inside one transaction, and the
+chat counters are computed while generating. The full-text search triggers
+are dropped during the load and the index is rebuilt once at the end, which
+is much faster than updating it row by row. Every generated user's password
+is DATASET_PASSWORD.
+"""
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from app import (db, bcrypt, User, ChatSession, ChatMessage, DISTRICTS_FILE,
+                 create_chat_search_index, make_chat_title)
+
+DATASET_PASSWORD = 'password123'
+
+CROPS = ['Rice', 'Wheat', 'Maize', 'Barley', 'Millets', 'Chickpea (Chana)', 'Pigeon Pea (Tur/Arhar)',
+         'Black Gram (Urad)', 'Green Gram (Moong)', 'Cotton', 'Sugarcane', 'Jute', 'Tomato', 'Potato',
+         'Onion', 'Brinjal (Eggplant)', 'Mango', 'Banana', 'Orange', 'Guava']
+SOIL_TYPES = ['Clay', 'Loam', 'Sandy', 'Silt', 'Red Soil', 'Black Soil']
+IRRIGATION_TYPES = ['Drip', 'Sprinkler', 'Flood', 'Manual']
+
+# Regional language by state; the rest of the users use English
+STATE_LANGUAGES = {
+    'Telangana': 'te', 'Andhra Pradesh': 'te', 'Tamil Nadu': 'ta', 'West Bengal': 'bn',
+    'Maharashtra': 'mr', 'Uttar Pradesh': 'hi', 'Madhya Pradesh': 'hi', 'Rajasthan': 'hi',
+    'Haryana': 'hi', 'Gujarat': 'hi', 'Punjab': 'hi', 'Karnataka': 'en'
+}
+REGIONAL_LANGUAGE_SHARE = 0.6
+
+QUESTION_TEMPLATES = [
+    'What fertilizer should I use for {crop} on {soil} soil?',
+    'When is the best time to sow {crop} in {district}?',
+    'How often should I water {crop} with {irrigation} irrigation?',
+    'My {crop} leaves are turning yellow, what should I do?',
+    'What is the market price of {crop} in {district} this week?',
+    'How do I control pests in {crop} without chemicals?',
+    'Which government schemes can help a {size} acre farmer in {state}?',
+    'Will the rain next week affect my {crop} harvest?',
+]
+ANSWER_WORDS = (
+    'apply nitrogen phosphorus potash urea DAP compost mulch irrigation schedule soil moisture '
+    'seedlings germination harvest yield quintal acre spray neem pest fungus leaf blight rust '
+    'weather rainfall temperature humidity mandi price subsidy scheme PM-KISAN soil health card '
+    'organic manure vermicompost drip sprinkler furrow weeding intercropping rotation kharif rabi '
+    'sowing transplanting flowering maturity storage drying grading market trend week days '
+    'recommended dose split basal top dressing zinc sulphate micronutrients pH testing'
+).split()
+
+# Log-normal lengths: median ~60 characters per question, ~550 per answer
+QUESTION_LENGTH = (math.log(60), 0.5)
+ANSWER_LENGTH = (math.log(550), 0.6)
+MAX_MESSAGE_LENGTH = 4000
+CORPUS_WORDS = 200000
+# Pareto shape for sessions per user and turns per session (smaller = longer tail)
+ACTIVITY_SHAPE = 1.6
+HISTORY_DAYS = 365
+
+def load_districts():
+    with open(DISTRICTS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def spread(total, buckets, rng, minimum=0):
+    """Split `total` into `buckets` long-tailed counts, each at least `minimum`"""
+    if buckets == 0:
+        return []
+    free = max(total - minimum * buckets, 0)
+    # Lomax (Pareto shifted to start at 0), so many buckets stay at the minimum
+    weights = [rng.paretovariate(ACTIVITY_SHAPE) - 1 for _ in range(buckets)]
+    scale = free / (sum(weights) or 1)
+    counts = [minimum + int(w * scale) for w in weights]
+    # Rounding down loses less than one per bucket; hand it back at random
+    for index in rng.sample(range(buckets), max(total - sum(counts), 0)):
+        counts[index] += 1
+    return counts
+
+def build_corpus(rng):
+    """A long run of random words; message bodies are slices of it"""
+    words = rng.choices(ANSWER_WORDS, k=CORPUS_WORDS)
+    return ' '.join(words)
+
+def random_text(rng, corpus, length_params, prefix=''):
+    """A log-normal length slice of the corpus, cut at word boundaries"""
+    mu, sigma = length_params
+    target = max(min(int(rng.lognormvariate(mu, sigma)) - len(prefix), MAX_MESSAGE_LENGTH), 1)
+    start = corpus.find(' ', rng.randrange(len(corpus) - MAX_MESSAGE_LENGTH - 1)) + 1
+    end = corpus.rfind(' ', start, start + target + 1)
+    text = corpus[start:end if end > start else corpus.find(' ', start)]
+    if prefix:
+        return f'{prefix} {text}.'
+    return text[:1].upper() + text[1:] + '.'
+
+def make_user(rng, user_id, district, password_hash, now):
+    state = district['state']
+    language = STATE_LANGUAGES.get(state, 'en') if rng.random() < REGIONAL_LANGUAGE_SHARE else 'en'
+    return {
+        'id': user_id,
+        'username': f'farmer{user_id}',
+        'email': f'farmer{user_id}@example.com',
+        'password_hash': password_hash,
+        'preferred_language': language,
+        'voice_enabled': rng.random() < 0.7,
+        'created_at': now - timedelta(days=rng.uniform(1, HISTORY_DAYS)),
+        'is_active': True,
+        'state': state,
+        'district': district['district'],
+        'farm_size': max(0.5, round(rng.lognormvariate(math.log(2.5), 0.7) * 2) / 2),
+        'primary_crop': rng.choice(CROPS),
+        'soil_type': rng.choice(SOIL_TYPES),
+        'irrigation_type': rng.choice(IRRIGATION_TYPES),
+        'profile_completed': True,
+        'latitude': district.get('lat'),
+        'longitude': district.get('lon'),
+        'last_weather_fetch': None,
+        'message_count': 0,
+        'session_count': 0,
+        'last_activity': None
+    }
+
+def make_question(rng, user):
+    return rng.choice(QUESTION_TEMPLATES).format(
+        crop=user['primary_crop'], soil=user['soil_type'].lower(), district=user['district'],
+        irrigation=user['irrigation_type'].lower(), size=user['farm_size'], state=user['state'])
+
+class BatchWriter:
+    """Buffers rows per table and writes them with executemany"""
+    def __init__(self, connection, batch_size):
+        self.connection = connection
+        self.batch_size = batch_size
+        # Flushed in this order, so rows are never written before their parents
+        self.buffers = {User.__table__: [], ChatSession.__table__: [], ChatMessage.__table__: []}
+        self.written = {table.name: 0 for table in self.buffers}
+
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for table, rows in self.buffers.items():
+            if rows:
+                self.connection.execute(table.insert(), rows)
+                self.written[table.name] += len(rows)
+                rows.clear()
+
+def drop_search_triggers(connection):
+    for trigger in ('chat_message_fts_insert', 'chat_message_fts_delete', 'chat_message_fts_update'):
+        connection.execute(db.text(f'DROP TRIGGER IF EXISTS {trigger}'))
+
+def generate_dataset(users, sessions, messages, seed=42, batch_size=10000, verbose=True):
+    """Insert the users, sessions and messages. Returns rows written per table."""
+    rng = random.Random(seed)
+    districts = load_districts()
+    corpus = build_corpus(rng)
+    now = datetime.utcnow()
+    password_hash = bcrypt.generate_password_hash(DATASET_PASSWORD).decode('utf-8')
+    started = time.perf_counter()
+
+    # Messages come in question/answer pairs and every session has at least one
+    sessions = sessions if users else 0
+    turns = max(messages // 2, sessions)
+    sessions_per_user = spread(sessions, users, rng)
+    turns_per_session = spread(turns, sessions, rng, minimum=1)
+
+    with db.engine.begin() as connection:
+        if connection.dialect.name == 'sqlite':
+            connection.execute(db.text('PRAGMA synchronous = OFF'))
+            connection.execute(db.text('PRAGMA temp_store = MEMORY'))
+        drop_search_triggers(connection)
+        first_id = (connection.execute(db.text('SELECT MAX(id) FROM "user"')).scalar() or 0) + 1
+        writer = BatchWriter(connection, batch_size)
+        next_session = 0
+
+        for offset in range(users):
+            user = make_user(rng, first_id + offset, rng.choice(districts), password_hash, now)
+            session_rows, message_rows = [], []
+            clock = user['created_at']
+            for _ in range(sessions_per_user[offset]):
+                # Sessions are spread over the time since the user signed up
+                clock = min(clock + timedelta(minutes=rng.expovariate(1 / (60 * 24 * 7))), now)
+                started_at = clock
+                session_id = f"session_{int(started_at.timestamp() * 1000)}_{rng.getrandbits(32):08x}"
+                title = None
+                for _ in range(turns_per_session[next_session]):
+                    question = make_question(rng, user)
+                    title = title or make_chat_title(question)
+                    clock += timedelta(seconds=rng.uniform(20, 600))
+                    message_rows.append({
+                        'session_id': session_id, 'user_id': user['id'], 'role': 'user',
+                        'content': random_text(rng, corpus, QUESTION_LENGTH, question) if rng.random() < 0.3 else question,
+                        'language': user['preferred_language'], 'was_spoken': rng.random() < 0.1,
+                        'timestamp': clock
+                    })
+                    clock += timedelta(seconds=rng.uniform(2, 15))
+                    message_rows.append({
+                        'session_id': session_id, 'user_id': user['id'], 'role': 'assistant',
+                        'content': random_text(rng, corpus, ANSWER_LENGTH),
+                        'language': user['preferred_language'], 'was_spoken': False,
+                        'timestamp': clock
+                    })
+                session_rows.append({
+                    'session_id': session_id, 'user_id': user['id'], 'title': title,
+                    'created_at': started_at, 'updated_at': clock, 'is_active': True,
+                    'message_count': 2 * turns_per_session[next_session]
+                })
+                next_session += 1
+
+            user['message_count'] = len(message_rows)
+            user['session_count'] = len(session_rows)
+            user['last_activity'] = message_rows[-1]['timestamp'] if message_rows else None
+            # The user goes into the batch before its sessions and messages
+            writer.add(User.__table__, user)
+            for row in session_rows:
+                writer.add(ChatSession.__table__, row)
+            for row in message_rows:
+                writer.add(ChatMessage.__table__, row)
+
+            if verbose and (offset + 1) % 10000 == 0:
+                print(f"  {offset + 1}/{users} users, {writer.written['chat_message']} messages "
+                      f"({time.perf_counter() - started:.0f}s)")
+        writer.flush()
+
+    if verbose:
+        print(f"✓ Inserted {writer.written} in {time.perf_counter() - started:.1f}s; rebuilding search index")
+    # Recreates the triggers and rebuilds chat_message_fts from chat_message
+    create_chat_search_index()
+    db.session.commit()
+    if verbose:
+        print(f"✓ Dataset ready in {time.perf_counter() - started:.1f}s")
+    return writer.written
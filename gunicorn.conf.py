@@ -0,0 +1,71 @@
+"""
+Gunicorn settings for production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden with the environment variables below.
+
+The app is preloaded in the master, and translations and districts data are
+loaded there in when_ready, so they and the compiled code are loaded once and
+shared copy-on-write with the workers. The bcrypt semaphore (see
+BCRYPT_MAX_CONCURRENT in app.py) is created in the master too, so it limits
+password hashing across all workers.
+
+Reloading:
+  - kill -HUP <master>   restarts workers gracefully (config changes only;
+                         with preload the application code is NOT re-read)
+  - kill -USR2 <master>  starts a new master with the new code, then
+    kill -TERM <old>     stop the old master once the new one is serving
+"""
+import gc
+import multiprocessing
+import os
+
+# Background threads are started per worker in post_fork, not in the master
+os.environ.setdefault('DEFER_BACKGROUND_WORKERS', 'true')
+# Hides debug-only response headers such as X-DB-Queries
+os.environ.setdefault('APP_ENV', 'production')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = True
+
+# LLM calls can take a while; keep the timeout above the slowest upstream call
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    from app import app, preload_shared_data
+
+    # Translations and districts load lazily; load them here so workers
+    # inherit the master's copies instead of each loading their own
+    preload_shared_data(app)
+
+    # Move preloaded objects out of the collector's generations so workers'
+    # GC passes do not write to (and un-share) the master's memory pages
+    gc.freeze()
+    server.log.info("Preloaded app frozen for copy-on-write sharing")
+
+
+def post_fork(server, worker):
+    from app import app, db, start_background_workers
+
+    # Never share SQLite connections opened in the master with a worker
+    with app.app_context():
+        db.engine.dispose()
+
+    start_background_workers(app)
+    server.log.info(f"Worker {worker.pid} started background workers")
@@ -0,0 +1,772 @@
+    // Global variables with translation support
+    window.translations = {
+        thinking: I18N.thinking,
+        heard: I18N.heard,
+        microphone_denied: I18N.microphone_denied,
+        voice_not_supported: I18N.voice_not_supported,
+        click_stop: I18N.click_stop,
+        clear_chat_confirm: I18N.clear_chat_confirm,
+        no_messages: I18N.no_messages,
+        chat_exported: I18N.chat_exported,
+        you: I18N.you,
+        assistant: I18N.assistant,
+        farm_assistant: I18N.assistant_name
+    };
+
+    // Voice Assistant Class - Fully Translated
+    class VoiceAssistant {
+        constructor() {
+            this.speechSynthesis = window.speechSynthesis;
+            this.recognition = null;
+            this.isListening = false;
+            this.isSpeaking = false;
+            this.currentLanguage = 'en-IN';
+            this.supportedVoices = [];
+            this.voiceEnabled = true;
+            this.ttsEnabled = false;
+            this.autoSendEnabled = false;
+            this.initSpeechRecognition();
+            this.loadVoiceSettings();
+            this.loadAvailableVoices();
+        }
+
+        initSpeechRecognition() {
+            const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
+            
+            if (!SpeechRecognition) {
+                console.warn('Speech recognition not supported');
+                this.showBrowserCompatibilityWarning();
+                return;
+            }
+
+            this.recognition = new SpeechRecognition();
+            this.recognition.continuous = false;
+            this.recognition.interimResults = false;
+            this.recognition.lang = this.currentLanguage;
+            
+            this.recognition.onresult = (event) => {
+                const transcript = event.results[0][0].transcript;
+                console.log('Voice input:', transcript);
+                this.onSpeechResult(transcript);
+            };
+            
+            this.recognition.onerror = (event) => {
+                console.error('Speech recognition error:', event.error);
+                this.isListening = false;
+                this.updateListeningUI(false);
+                
+                if (event.error === 'not-allowed') {
+                    this.showPermissionError();
+                }
+            };
+            
+            this.recognition.onend = () => {
+                this.isListening = false;
+                this.updateListeningUI(false);
+            };
+        }
+
+        loadAvailableVoices() {
+            const loadVoices = () => {
+                this.supportedVoices = this.speechSynthesis.getVoices();
+            };
+            
+            this.speechSynthesis.onvoiceschanged = loadVoices;
+            loadVoices();
+        }
+
+        loadVoiceSettings() {
+            this.voiceEnabled = localStorage.getItem('voiceEnabled') !== 'false';
+            this.ttsEnabled = localStorage.getItem('ttsEnabled') === 'true';
+            this.autoSendEnabled = localStorage.getItem('autoSendEnabled') === 'true';
+            
+            document.getElementById('voiceInputToggle').checked = this.voiceEnabled;
+            document.getElementById('ttsToggle').checked = this.ttsEnabled;
+            document.getElementById('autoSendToggle').checked = this.autoSendEnabled;
+        }
+
+        saveVoiceSettings() {
+            localStorage.setItem('voiceEnabled', this.voiceEnabled);
+            localStorage.setItem('ttsEnabled', this.ttsEnabled);
+            localStorage.setItem('autoSendEnabled', this.autoSendEnabled);
+        }
+
+        setLanguage(langCode) {
+            const languageMap = {
+                'en': 'en-IN',
+                'hi': 'hi-IN',
+                'te': 'te-IN',
+                'ta': 'ta-IN',
+                'mr': 'mr-IN',
+                'bn': 'bn-IN'
+            };
+            
+            this.currentLanguage = languageMap[langCode] || 'en-IN';
+            if (this.recognition) {
+                this.recognition.lang = this.currentLanguage;
+            }
+            console.log('Voice Assistant language set to:', this.currentLanguage);
+        }
+
+        startListening() {
+            if (!this.recognition || this.isListening || !this.voiceEnabled) return;
+            
+            try {
+                this.recognition.start();
+                this.isListening = true;
+                this.updateListeningUI(true);
+            } catch (error) {
+                console.error('Failed to start recognition:', error);
+                this.showPermissionError();
+            }
+        }
+
+        stopListening() {
+            if (this.recognition && this.isListening) {
+                this.recognition.stop();
+                this.isListening = false;
+                this.updateListeningUI(false);
+            }
+        }
+
+        toggleListening() {
+            if (this.isListening) {
+                this.stopListening();
+            } else {
+                this.startListening();
+            }
+        }
+
+        onSpeechResult(transcript) {
+            if (!transcript || transcript.trim().length === 0) return;
+            
+            const chatInput = document.getElementById('chatInput');
+            if (chatInput) {
+                chatInput.value = transcript;
+                chatInput.style.height = 'auto';
+                chatInput.style.height = Math.min(chatInput.scrollHeight, 150) + 'px';
+                chatInput.focus();
+                updateSendButton();
+                
+                if (this.autoSendEnabled && transcript.trim().length > 0 && transcript.trim().length < 50) {
+                    setTimeout(() => {
+                        sendMessage();
+                    }, 800);
+                }
+            }
+            
+            this.showTranscriptFeedback(transcript);
+        }
+
+        updateListeningUI(isListening) {
+            const micBtn = document.getElementById('voiceBtn');
+            const indicator = document.getElementById('listeningIndicator');
+            
+            if (micBtn) {
+                if (isListening) {
+                    micBtn.classList.add('listening');
+                    micBtn.innerHTML = '<i class="fas fa-stop"></i>';
+                    micBtn.title = window.translations.click_stop;
+                } else {
+                    micBtn.classList.remove('listening');
+                    micBtn.innerHTML = '<i class="fas fa-microphone"></i>';
+                    micBtn.title = I18N.voice_input;
+                }
+            }
+            
+            if (indicator) {
+                if (isListening) {
+                    indicator.classList.add('active');
+                    indicator.onclick = () => this.stopListening();
+                } else {
+                    indicator.classList.remove('active');
+                    indicator.onclick = null;
+                }
+            }
+        }
+
+        showTranscriptFeedback(transcript) {
+            const feedback = document.createElement('div');
+            feedback.className = 'transcript-feedback';
+            feedback.innerHTML = `
+                <div class="transcript-text">
+                    <i class="fas fa-check-circle"></i>
+                    <span>${window.translations.heard}: "<strong>${transcript}</strong>"</span>
+                </div>
+            `;
+            
+            const chatContainer = document.querySelector('.main-content') || document.body;
+            chatContainer.appendChild(feedback);
+            
+            setTimeout(() => {
+                feedback.classList.add('fade-out');
+                setTimeout(() => feedback.remove(), 500);
+            }, 3000);
+        }
+
+        speakText(text, lang = null) {
+            if (!this.speechSynthesis || !text || this.isSpeaking || !this.ttsEnabled) return;
+            
+            this.stopSpeaking();
+            
+            const utterance = new SpeechSynthesisUtterance(text);
+            
+            if (lang) {
+                utterance.lang = lang;
+            } else {
+                utterance.lang = this.currentLanguage;
+            }
+            
+            utterance.rate = 0.9;
+            utterance.pitch = 1.0;
+            utterance.volume = 1.0;
+            
+            const targetLang = lang || this.currentLanguage;
+            const langPrefix = targetLang.split('-')[0];
+            const preferredVoice = this.supportedVoices.find(v => v.lang.startsWith(langPrefix));
+            
+            if (preferredVoice) {
+                utterance.voice = preferredVoice;
+            }
+            
+            utterance.onstart = () => {
+                this.isSpeaking = true;
+                this.updateSpeakingUI(true);
+            };
+            
+            utterance.onend = () => {
+                this.isSpeaking = false;
+                this.updateSpeakingUI(false);
+            };
+            
+            utterance.onerror = (event) => {
+                console.error('Speech synthesis error:', event);
+                this.isSpeaking = false;
+                this.updateSpeakingUI(false);
+            };
+            
+            this.speechSynthesis.speak(utterance);
+        }
+
+        stopSpeaking() {
+            if (this.speechSynthesis && this.isSpeaking) {
+                this.speechSynthesis.cancel();
+                this.isSpeaking = false;
+                this.updateSpeakingUI(false);
+            }
+        }
+
+        updateSpeakingUI(isSpeaking, messageElement = null) {
+            document.querySelectorAll('.tts-btn').forEach(btn => {
+                btn.classList.remove('speaking');
+                btn.innerHTML = '<i class="fas fa-volume-up"></i>';
+                btn.title = I18N.listen;
+            });
+            
+            if (isSpeaking && messageElement) {
+                const ttsBtn = messageElement.querySelector('.tts-btn');
+                if (ttsBtn) {
+                    ttsBtn.classList.add('speaking');
+                    ttsBtn.innerHTML = '<i class="fas fa-stop"></i>';
+                    ttsBtn.title = I18N.stop;
+                }
+            }
+        }
+
+        showBrowserCompatibilityWarning() {
+            console.warn('Voice not supported');
+            const voiceBtn = document.getElementById('voiceBtn');
+            if (voiceBtn) {
+                voiceBtn.classList.add('disabled');
+                voiceBtn.title = window.translations.voice_not_supported;
+                voiceBtn.onclick = null;
+            }
+        }
+
+        showPermissionError() {
+            const feedback = document.createElement('div');
+            feedback.className = 'transcript-feedback';
+            feedback.style.background = 'rgba(220, 38, 38, 0.95)';
+            feedback.innerHTML = `
+                <div class="transcript-text">
+                    <i class="fas fa-exclamation-triangle"></i>
+                    <span>${window.translations.microphone_denied}</span>
+                </div>
+            `;
+            
+            const chatContainer = document.querySelector('.main-content') || document.body;
+            chatContainer.appendChild(feedback);
+            
+            setTimeout(() => {
+                feedback.classList.add('fade-out');
+                setTimeout(() => feedback.remove(), 500);
+            }, 5000);
+        }
+    }
+
+    // Chat Application Variables
+    let voiceAssistant = null;
+    let currentSessionId = null;
+    let isFirstMessage = true;
+    let messages = [];
+    let isProcessing = false;
+
+    const welcomeCenter = document.getElementById('welcomeCenter');
+    const messagesContainer = document.getElementById('messagesContainer');
+    const messagesArea = document.getElementById('messages');
+    const chatInput = document.getElementById('chatInput');
+    const sendBtn = document.getElementById('sendBtn');
+    const voiceBtn = document.getElementById('voiceBtn');
+    const voiceSettingsPanel = document.getElementById('voiceSettingsPanel');
+
+    // Initialize
+    document.addEventListener('DOMContentLoaded', function() {
+        console.log('🚀 Farm Assistant initialized');
+        
+        currentSessionId = 'chat_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+        console.log('Session ID:', currentSessionId);
+        
+        initializeVoiceAssistant();
+        setupEventListeners();
+        initializeInput();
+        
+        const presetQuery = sessionStorage.getItem('preset_chat_query');
+        if (presetQuery) {
+            setTimeout(() => {
+                startChatWithMessage(presetQuery);
+                sessionStorage.removeItem('preset_chat_query');
+            }, 500);
+        }
+    });
+
+    function initializeVoiceAssistant() {
+        voiceAssistant = new VoiceAssistant();
+        
+        if (!('webkitSpeechRecognition' in window || 'SpeechRecognition' in window)) {
+            voiceBtn.classList.add('disabled');
+            voiceBtn.title = window.translations.voice_not_supported;
+        }
+        
+        const pageLanguage = document.documentElement.lang || 'en';
+        voiceAssistant.setLanguage(pageLanguage);
+    }
+
+    function setupEventListeners() {
+        chatInput.addEventListener('keydown', (e) => {
+            if (e.key === 'Enter' && !e.shiftKey) {
+                e.preventDefault();
+                sendMessage();
+            }
+        });
+
+        chatInput.addEventListener('input', function() {
+            this.style.height = 'auto';
+            this.style.height = Math.min(this.scrollHeight, 150) + 'px';
+            updateSendButton();
+        });
+
+        document.getElementById('voiceInputToggle').addEventListener('change', function() {
+            voiceAssistant.voiceEnabled = this.checked;
+            voiceAssistant.saveVoiceSettings();
+        });
+        
+        document.getElementById('ttsToggle').addEventListener('change', function() {
+            voiceAssistant.ttsEnabled = this.checked;
+            voiceAssistant.saveVoiceSettings();
+        });
+        
+        document.getElementById('autoSendToggle').addEventListener('change', function() {
+            voiceAssistant.autoSendEnabled = this.checked;
+            voiceAssistant.saveVoiceSettings();
+        });
+
+        setTimeout(() => {
+            chatInput.focus();
+        }, 100);
+    }
+
+    function toggleVoiceInput() {
+        if (voiceAssistant && voiceAssistant.voiceEnabled) {
+            voiceAssistant.toggleListening();
+        }
+    }
+
+    function toggleVoiceSettings() {
+        voiceSettingsPanel.classList.toggle('hidden');
+    }
+
+    function initializeInput() {
+        chatInput.style.height = '56px';
+        chatInput.style.minHeight = '56px';
+        updateSendButton();
+    }
+
+    function updateSendButton() {
+        const hasText = chatInput.value.trim().length > 0;
+        sendBtn.disabled = !hasText || isProcessing;
+        sendBtn.style.opacity = hasText && !isProcessing ? '1' : '0.5';
+        sendBtn.style.cursor = hasText && !isProcessing ? 'pointer' : 'not-allowed';
+    }
+
+    function startQuickChat(prompt) {
+        console.log('Quick chat:', prompt.substring(0, 50) + '...');
+        startChatWithMessage(prompt);
+    }
+
+    function startChatWithMessage(message) {
+        if (!message || !message.trim()) return;
+        
+        if (isFirstMessage) {
+            welcomeCenter.classList.add('hidden');
+            messagesContainer.classList.remove('hidden');
+            isFirstMessage = false;
+        }
+        
+        addMessageToUI(message, 'user');
+        processAIResponse(message);
+    }
+
+    async function sendMessage() {
+        const message = chatInput.value.trim();
+        
+        if (!message || isProcessing) return;
+        
+        startChatWithMessage(message);
+        
+        chatInput.value = '';
+        initializeInput();
+        chatInput.focus();
+    }
+
+    function addMessageToUI(content, role) {
+        const messageRow = document.createElement('div');
+        messageRow.className = `message-row ${role}`;
+        
+        const messageBubble = document.createElement('div');
+        messageBubble.className = `message-bubble ${role === 'user' ? 'user-message' : 'bot-message'}`;
+        
+        const avatar = role === 'user' ? '👤' : '🤖';
+        const name = role === 'user' ? window.translations.you : window.translations.assistant;
+        const time = new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+        
+        let messageHTML = `
+            <div class="message-header">
+                <div class="avatar ${role}">${avatar}</div>
+                <span class="text-sm font-semibold ${role === 'user' ? 'text-green-800' : 'text-gray-700'}">${name}</span>
+            </div>
+            <div class="message-content">${formatMessageContent(content)}</div>
+            <div class="timestamp">${time}</div>
+        `;
+        
+        messageBubble.innerHTML = messageHTML;
+        messageRow.appendChild(messageBubble);
+        
+        if (role === 'assistant') {
+            const ttsBtn = document.createElement('button');
+            ttsBtn.className = 'tts-btn';
+            ttsBtn.title = I18N.listen;
+            ttsBtn.innerHTML = '<i class="fas fa-volume-up"></i>';
+            
+            ttsBtn.onclick = (e) => {
+                e.stopPropagation();
+                
+                if (voiceAssistant && voiceAssistant.isSpeaking) {
+                    voiceAssistant.stopSpeaking();
+                    ttsBtn.innerHTML = '<i class="fas fa-volume-up"></i>';
+                    ttsBtn.title = I18N.listen;
+                    ttsBtn.classList.remove('speaking');
+                } else {
+                    speakMessage(content, messageRow);
+                    ttsBtn.innerHTML = '<i class="fas fa-stop"></i>';
+                    ttsBtn.title = I18N.stop;
+                }
+            };
+            
+            const actionsDiv = document.createElement('div');
+            actionsDiv.className = 'message-actions';
+            actionsDiv.appendChild(ttsBtn);
+            
+            messageBubble.appendChild(actionsDiv);
+        }
+        
+        messagesArea.appendChild(messageRow);
+        
+        messages.push({ 
+            content, 
+            role, 
+            timestamp: new Date().toISOString(),
+            session: currentSessionId 
+        });
+        
+        setTimeout(() => {
+            messagesArea.scrollTop = messagesArea.scrollHeight;
+        }, 50);
+    }
+
+    function speakMessage(text, messageElement = null) {
+        if (voiceAssistant) {
+            voiceAssistant.speakText(text);
+            if (messageElement) {
+                voiceAssistant.updateSpeakingUI(true, messageElement);
+            }
+        }
+    }
+
+    function formatMessageContent(content) {
+        return content
+            .replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')
+            .replace(/\*(.*?)\*/g, '<em>$1</em>')
+            .replace(/\n/g, '<br>')
+            .replace(/^- (.*?)(?=\n|$)/gm, '• $1<br>')
+            .replace(/(\d+)\. (.*?)(?=\n|$)/gm, '$1. $2<br>');
+    }
+
+    function showTypingIndicator() {
+        const messageRow = document.createElement('div');
+        messageRow.className = 'message-row assistant';
+        messageRow.id = 'typingIndicator';
+        
+        const messageBubble = document.createElement('div');
+        messageBubble.className = 'message-bubble bot-message';
+        
+        messageBubble.innerHTML = `
+            <div class="message-header">
+                <div class="avatar bot">🤖</div>
+                <span class="text-sm font-semibold text-gray-700">${window.translations.farm_assistant}</span>
+            </div>
+            <div class="typing-indicator">
+                <span class="text-gray-600 mr-2">${window.translations.thinking}</span>
+                <div class="typing-dot"></div>
+                <div class="typing-dot" style="animation-delay: 0.2s"></div>
+                <div class="typing-dot" style="animation-delay: 0.4s"></div>
+            </div>
+        `;
+        
+        messageRow.appendChild(messageBubble);
+        messagesArea.appendChild(messageRow);
+        messagesArea.scrollTop = messagesArea.scrollHeight;
+    }
+
+    function hideTypingIndicator() {
+        const typingIndicator = document.getElementById('typingIndicator');
+        if (typingIndicator) {
+            typingIndicator.remove();
+        }
+    }
+
+    async function processAIResponse(message) {
+        isProcessing = true;
+        updateSendButton();
+        
+        showTypingIndicator();
+        
+        try {
+            console.log('Processing:', message.substring(0, 50) + '...');
+            
+            const userContext = getUserContext();
+            const enhancedMessage = enhancePrompt(message);
+            
+            const response = await fetch('/chat', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                },
+                credentials: 'include',
+                body: JSON.stringify({ 
+                    message: enhancedMessage,
+                    session_id: currentSessionId,
+                    user_context: userContext
+                })
+            });
+
+            hideTypingIndicator();
+            
+            if (response.ok) {
+                const data = await response.json();
+                if (data.success) {
+                    console.log('✅ Received AI response');
+                    const completeResponse = ensureCompleteResponse(data.reply, message);
+                    addMessageToUI(completeResponse, 'assistant');
+                } else {
+                    console.error('❌ API error:', data.message);
+                    addMessageToUI(getDetailedFallbackResponse(message), 'assistant');
+                }
+            } else {
+                console.error('❌ HTTP error:', response.status);
+                addMessageToUI(getDetailedFallbackResponse(message), 'assistant');
+            }
+            
+        } catch (error) {
+            hideTypingIndicator();
+            console.error('❌ Network error:', error);
+            addMessageToUI(getDetailedFallbackResponse(message), 'assistant');
+        } finally {
+            isProcessing = false;
+            updateSendButton();
+        }
+    }
+
+    function enhancePrompt(message) {
+        const lower = message.toLowerCase();
+        
+        if (lower.includes('crop') && lower.includes('season')) {
+            return message + " Please include sowing time, duration, yield expectations, and suitable varieties.";
+        }
+        else if (lower.includes('fertilizer')) {
+            return message + " Please provide NPK ratio, quantity per acre, application schedule, and recommended brands.";
+        }
+        else if (lower.includes('pest') || lower.includes('disease')) {
+            return message + " Include both preventive measures and treatment methods, with organic options if available.";
+        }
+        else if (lower.includes('irrigation') || lower.includes('water')) {
+            return message + " Provide schedule, water requirements per acre, and efficiency tips.";
+        }
+        else if (lower.includes('weather') || lower.includes('rain')) {
+            return message + " Include impact on farming activities and precautions to take.";
+        }
+        else if (lower.includes('soil') || lower.includes('land')) {
+            return message + " Include soil preparation methods and improvement techniques.";
+        }
+        
+        return message + " Please provide detailed, practical information suitable for farmers.";
+    }
+
+    function ensureCompleteResponse(response, originalQuery) {
+        const lowerQuery = originalQuery.toLowerCase();
+        const lowerResponse = response.toLowerCase();
+        
+        if (response.length < 100 && !lowerResponse.includes('?') && !lowerResponse.includes('.')) {
+            return response + "\n\nFor more detailed information, please visit our specialized pages or ask a more specific question.";
+        }
+        
+        if (lowerQuery.includes('crop') && !lowerResponse.includes('yield') && !lowerResponse.includes('harvest')) {
+            return response + "\n\n🌾 **Additional Tips:**\n• Monitor soil moisture regularly\n• Check for pest infestation weekly\n• Maintain proper plant spacing\n• Test soil nutrients before sowing";
+        }
+        
+        if (lowerQuery.includes('fertilizer') && !lowerResponse.includes('apply') && !lowerResponse.includes('schedule')) {
+            return response + "\n\n🌱 **Application Tips:**\n• Apply fertilizers in the evening\n• Water immediately after application\n• Avoid application before heavy rain\n• Use soil testing for precise needs";
+        }
+        
+        return response;
+    }
+
+    function getUserContext() {
+        try {
+            const location = localStorage.getItem('user_location');
+            const crop = localStorage.getItem('primary_crop');
+            const soil = localStorage.getItem('soil_type');
+            
+            if (location || crop || soil) {
+                return {
+                    location: location || 'Unknown location',
+                    crop: crop || 'General farming',
+                    soil_type: soil || 'Various soil types',
+                    irrigation: localStorage.getItem('irrigation_type') || 'Not specified'
+                };
+            }
+            return null;
+        } catch (error) {
+            return null;
+        }
+    }
+
+    function getDetailedFallbackResponse(message) {
+        const lower = message.toLowerCase();
+        
+        if (lower.includes('weather')) {
+            return `**Weather Information:**\n\n• Check the Weather page for real-time agricultural weather forecasts\n• Monitor rainfall patterns for irrigation planning\n• Protect crops from extreme temperatures with shade/cover\n• Ideal farming temperature: 20-30°C\n• Rain requirement: 500-1000mm annually for most crops\n\n**Action:** Visit Weather page for detailed forecasts and farming advisories.`;
+        } 
+        else if (lower.includes('fertilizer') || lower.includes('npk')) {
+            return `**Fertilizer Guidance:**\n\n• General NPK ratio for most crops: 4:2:1 (N:P:K)\n• Apply 100-150 kg/acre for cereal crops\n• Split application: 50% basal, 25% at 30 days, 25% at 60 days\n• Organic alternatives: Vermicompost (2-3 tonnes/acre), Farmyard manure (5-10 tonnes/acre)\n• Always conduct soil test before application\n\n**Recommendation:** Use the Fertilizer page for personalized recommendations based on your crop and soil.`;
+        }
+        else if (lower.includes('pest') || lower.includes('insect')) {
+            return `**Pest Control Methods:**\n\n**Preventive Measures:**\n• Crop rotation every season\n• Maintain field sanitation\n• Use resistant varieties\n• Proper spacing for air circulation\n\n**Organic Treatments:**\n• Neem oil spray: 5ml per liter water (weekly)\n• Garlic-chilli spray for chewing insects\n• Yellow sticky traps for flying pests\n• Biological control: Ladybugs for aphids\n\n**Chemical (if severe):**\n• Imidacloprid for sucking pests\n• Chlorpyriphos for soil insects\n• Always follow recommended dosage`;
+        }
+        else if (lower.includes('irrigation') || lower.includes('water')) {
+            return `**Irrigation Management:**\n\n**Methods (Most efficient first):**\n1. Drip irrigation - Saves 30-50% water\n2. Sprinkler irrigation - Good for light soils\n3. Furrow irrigation - Traditional, less efficient\n\n**Water Requirements:**\n• Rice: 1200-1500mm (standing water)\n• Wheat: 450-650mm (4-6 irrigations)\n• Vegetables: 500-800mm (frequent light irrigation)\n\n**Best Practices:**\n• Irrigate early morning (5-8 AM)\n• Monitor soil moisture at 15cm depth\n• Mulch to reduce evaporation\n• Use rainwater harvesting`;
+        }
+        else if (lower.includes('crop') && lower.includes('season')) {
+            return `**Seasonal Crop Calendar:**\n\n**KHARIF (June-September):**\n• Rice: June-July sowing, Oct-Nov harvest\n• Maize: June-July sowing, Sep-Oct harvest\n• Cotton: May-June sowing, Dec-Jan harvest\n• Soybean: June-July sowing, Sep-Oct harvest\n\n**RABI (October-March):**\n• Wheat: Nov-Dec sowing, Mar-Apr harvest\n• Chickpea: Oct-Nov sowing, Feb-Mar harvest\n• Mustard: Oct-Nov sowing, Feb-Mar harvest\n• Barley: Oct-Nov sowing, Mar-Apr harvest\n\n**Yield Expectations:**\n• Rice: 25-30 quintals/acre\n• Wheat: 20-25 quintals/acre\n• Vegetables: 80-120 quintals/acre`;
+        }
+        else {
+            return `I can help with detailed farming information about:\n\n🌾 **Crop Management:** Selection, sowing, harvesting\n🌱 **Fertilizers:** NPK ratios, organic options, application\n🐛 **Pest Control:** Prevention, organic treatments\n💧 **Irrigation:** Methods, scheduling, water conservation\n🌤️ **Weather:** Impact on farming, precautions\n💰 **Economics:** Costs, market prices, profitability\n\n**For specific advice:** Please ask detailed questions or visit our specialized pages for Weather, Fertilizer, and Market information.`;
+        }
+    }
+
+    function suggestPrompt(type) {
+        const prompts = {
+            weather: I18N.weather_prompt,
+            fertilizer: I18N.fertilizer_prompt,
+            pest: I18N.pest_prompt,
+            irrigation: I18N.irrigation_prompt
+        };
+        
+        if (prompts[type]) {
+            chatInput.value = prompts[type];
+            chatInput.style.height = 'auto';
+            chatInput.style.height = Math.min(chatInput.scrollHeight, 150) + 'px';
+            updateSendButton();
+            chatInput.focus();
+        }
+    }
+
+    function clearChat() {
+        if (messages.length === 0 && isFirstMessage) {
+            return;
+        }
+        
+        if (confirm(window.translations.clear_chat_confirm)) {
+            messages = [];
+            messagesArea.innerHTML = '';
+            welcomeCenter.classList.remove('hidden');
+            messagesContainer.classList.add('hidden');
+            isFirstMessage = true;
+            chatInput.value = '';
+            initializeInput();
+            chatInput.focus();
+            
+            if (voiceAssistant) {
+                voiceAssistant.stopSpeaking();
+            }
+            
+            currentSessionId = 'chat_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+            console.log('🆕 New session:', currentSessionId);
+        }
+    }
+
+    function exportChat() {
+        if (messages.length === 0) {
+            alert(window.translations.no_messages);
+            return;
+        }
+        
+        let exportText = `${window.translations.farm_assistant} Chat - ${new Date().toLocaleString()}\n\n`;
+        
+        messages.forEach(msg => {
+            const role = msg.role === 'user' ? window.translations.you : window.translations.assistant;
+            const time = new Date(msg.timestamp).toLocaleTimeString();
+            exportText += `${role} (${time}):\n${msg.content}\n\n`;
+        });
+        
+        const blob = new Blob([exportText], { type: 'text/plain' });
+        const url = URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = `farm-chat-${new Date().toISOString().split('T')[0]}.txt`;
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
+        URL.revokeObjectURL(url);
+        
+        alert(window.translations.chat_exported);
+    }
+
+    // Make functions globally available
+    window.startQuickChat = startQuickChat;
+    window.sendMessage = sendMessage;
+    window.suggestPrompt = suggestPrompt;
+    window.clearChat = clearChat;
+    window.exportChat = exportChat;
+    window.toggleVoiceInput = toggleVoiceInput;
+    window.toggleVoiceSettings = toggleVoiceSettings;
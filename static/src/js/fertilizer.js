@@ -0,0 +1,767 @@
+    // ========== TRANSLATIONS FOR JAVASCRIPT ==========
+    window.fertilizerTranslations = {
+        please_select_crop: I18N.js_please_select_crop,
+        please_select_soil: I18N.js_please_select_soil,
+        generating: I18N.js_generating,
+        generate_new: I18N.js_generate_new,
+        enter_date: I18N.js_enter_date,
+        reminder_set: I18N.js_reminder_set,
+        redirecting: I18N.js_redirecting,
+        chat_error: I18N.js_chat_error,
+        welcome_title: I18N.js_welcome_title,
+        welcome_message: I18N.js_welcome_message,
+        get_recommendations: I18N.js_get_recommendations,
+        
+        // Crop names for fallback
+        crop_rice: I18N.crop_rice,
+        crop_wheat: I18N.crop_wheat,
+        crop_maize: I18N.crop_maize,
+        crop_cotton: I18N.crop_cotton,
+        crop_sugarcane: I18N.crop_sugarcane,
+        
+        // Soil types
+        soil_clay: I18N.clay,
+        soil_sandy: I18N.sandy,
+        soil_loamy: I18N.loamy,
+        soil_silt: I18N.silt,
+        
+        // Growth stages
+        stage_seedling: I18N.seedling,
+        stage_vegetative: I18N.vegetative,
+        stage_flowering: I18N.flowering,
+        stage_fruiting: I18N.fruiting,
+        stage_maturity: I18N.maturity,
+        
+        // Budget
+        budget_low: I18N.budget_low,
+        budget_medium: I18N.budget_medium,
+        budget_high: I18N.budget_high,
+        
+        // NPK roles
+        nitrogen_role: I18N.for_leaf_growth,
+        phosphorus_role: I18N.for_root_development,
+        potassium_role: I18N.for_disease_resistance,
+        
+        // Action buttons
+        download_pdf: I18N.download_pdf,
+        share_plan: I18N.share_plan,
+        set_reminder: I18N.set_reminder,
+        ask_expert: I18N.ask_expert,
+        compare_prices: I18N.compare_prices,
+        
+        // Pro tip
+        pro_tip_default: I18N.pro_tip_default
+    };
+
+    // Global variables
+    let currentUserData = null;
+    let currentRecommendation = null;
+    let chatHistory = [];
+
+    // Initialize on page load
+    document.addEventListener('DOMContentLoaded', function() {
+        loadUserProfile();
+        setupEventListeners();
+        initializeForm();
+    });
+
+    // ========== USER PROFILE LOADING ==========
+    function loadUserProfile() {
+        try {
+            // Get user data from localStorage (from dashboard)
+            const userName = localStorage.getItem('user-name') || 'Farmer';
+            const userLocation = localStorage.getItem('user_location') || I18N.not_specified;
+            const userCrop = localStorage.getItem('primary_crop') || I18N.not_specified;
+            const userSoil = localStorage.getItem('soil_type') || I18N.not_specified;
+            const userIrrigation = localStorage.getItem('irrigation_type') || I18N.not_specified;
+            
+            // Update UI
+            document.getElementById('userCrop').textContent = userCrop;
+            document.getElementById('userLocation').textContent = userLocation;
+            document.getElementById('userSoil').textContent = userSoil;
+            document.getElementById('userIrrigation').textContent = userIrrigation;
+            
+            // Pre-fill form with user data
+            if (userCrop && userCrop !== I18N.not_specified) {
+                const cropSelect = document.getElementById('cropSelect');
+                for (let option of cropSelect.options) {
+                    if (option.text === userCrop) {
+                        cropSelect.value = userCrop;
+                        break;
+                    }
+                }
+            }
+            
+            if (userSoil && userSoil !== I18N.not_specified) {
+                selectSoil(userSoil);
+            }
+            
+            // Store user data globally
+            currentUserData = {
+                username: userName,
+                location: userLocation,
+                crop: userCrop,
+                soil: userSoil,
+                irrigation: userIrrigation,
+                farmSize: localStorage.getItem('farm_size') || '5'
+            };
+            
+            // Set farm size if available
+            if (currentUserData.farmSize) {
+                document.getElementById('farmSize').value = currentUserData.farmSize;
+                document.getElementById('farmSizeInput').value = currentUserData.farmSize;
+            }
+            
+        } catch (error) {
+            console.error('Error loading user profile:', error);
+        }
+    }
+
+    // ========== FORM HANDLING ==========
+    function setupEventListeners() {
+        // Farm size synchronization
+        const farmSizeSlider = document.getElementById('farmSize');
+        const farmSizeInput = document.getElementById('farmSizeInput');
+        
+        farmSizeSlider.addEventListener('input', function() {
+            farmSizeInput.value = this.value;
+        });
+        
+        farmSizeInput.addEventListener('input', function() {
+            farmSizeSlider.value = this.value;
+        });
+        
+        farmSizeInput.addEventListener('change', function() {
+            if (this.value < 0.5) this.value = 0.5;
+            if (this.value > 100) this.value = 100;
+            farmSizeSlider.value = this.value;
+        });
+    }
+
+    function initializeForm() {
+        // Set default selections
+        selectSoil('Loamy');
+        selectStage('Vegetative');
+        selectBudget('medium');
+        
+        // Set default checkboxes
+        document.getElementById('organicPreference').checked = true;
+        document.getElementById('sustainable').checked = true;
+    }
+
+    function selectSoil(soilType) {
+        document.getElementById('soilType').value = soilType;
+        
+        // Update button styles
+        document.querySelectorAll('.soil-btn').forEach(btn => {
+            if (btn.getAttribute('data-soil') === soilType) {
+                btn.classList.add('border-leaf', 'bg-green-50', 'text-leaf');
+                btn.classList.remove('border-gray-300', 'bg-white');
+            } else {
+                btn.classList.remove('border-leaf', 'bg-green-50', 'text-leaf');
+                btn.classList.add('border-gray-300', 'bg-white');
+            }
+        });
+    }
+
+    function selectStage(stage) {
+        document.getElementById('growthStage').value = stage;
+        
+        // Update button styles
+        document.querySelectorAll('.stage-btn').forEach(btn => {
+            if (btn.textContent.includes(stage)) {
+                btn.classList.add('border-leaf', 'bg-green-50', 'text-leaf');
+                btn.classList.remove('border-gray-300', 'bg-white');
+            } else {
+                btn.classList.remove('border-leaf', 'bg-green-50', 'text-leaf');
+                btn.classList.add('border-gray-300', 'bg-white');
+            }
+        });
+    }
+
+    function selectBudget(budget) {
+        document.getElementById('budgetRange').value = budget;
+        
+        // Update button styles
+        document.querySelectorAll('.budget-btn').forEach(btn => {
+            const text = btn.textContent.toLowerCase();
+            if (text.includes(budget)) {
+                btn.classList.add('border-leaf', 'bg-green-50', 'text-leaf');
+                btn.classList.remove('border-gray-300', 'bg-white');
+            } else {
+                btn.classList.remove('border-leaf', 'bg-green-50', 'text-leaf');
+                btn.classList.add('border-gray-300', 'bg-white');
+            }
+        });
+    }
+
+    function scrollToForm() {
+        document.getElementById('customizationForm').scrollIntoView({ behavior: 'smooth' });
+    }
+
+    function editProfile() {
+        window.location.href = '/dashboard#profile';
+    }
+
+    // ========== AI RECOMMENDATION GENERATION ==========
+    async function generateRecommendation() {
+        // Get form data
+        const formData = getFormData();
+        
+        // Validate
+        if (!formData.crop) {
+            alert(window.fertilizerTranslations.please_select_crop);
+            return;
+        }
+        
+        if (!formData.soilType) {
+            alert(window.fertilizerTranslations.please_select_soil);
+            return;
+        }
+        
+        // Show loading state
+        showLoadingState();
+        
+        try {
+            // Generate recommendation using LLM
+            const recommendation = await callLLMForRecommendation(formData);
+            
+            // Store recommendation
+            currentRecommendation = recommendation;
+            
+            // Display results
+            displayRecommendation(recommendation);
+            
+            // Hide loading, show results
+            hideLoadingState();
+            showResultsSection();
+            
+            // Scroll to results
+            document.getElementById('resultsSection').scrollIntoView({ behavior: 'smooth' });
+            
+        } catch (error) {
+            console.error('Error generating recommendation:', error);
+            showErrorState(window.fertilizerTranslations.chat_error);
+        }
+    }
+
+    function getFormData() {
+        return {
+            crop: document.getElementById('cropSelect').value,
+            soilType: document.getElementById('soilType').value,
+            growthStage: document.getElementById('growthStage').value,
+            farmSize: parseFloat(document.getElementById('farmSize').value),
+            budgetRange: document.getElementById('budgetRange').value,
+            organicPreference: document.getElementById('organicPreference').checked,
+            waterSaving: document.getElementById('waterSaving').checked,
+            quickResults: document.getElementById('quickResults').checked,
+            sustainable: document.getElementById('sustainable').checked,
+            additionalNotes: document.getElementById('additionalNotes').value,
+            location: currentUserData?.location || 'Unknown location',
+            currentSeason: getCurrentSeason()
+        };
+    }
+
+    function getCurrentSeason() {
+        const month = new Date().getMonth() + 1;
+        if (month >= 10 || month <= 2) return 'Rabi';
+        if (month >= 7 && month <= 9) return 'Kharif';
+        return 'Zaid';
+    }
+
+    // ========== LLM API CALL ==========
+    async function callLLMForRecommendation(formData) {
+        // Create the prompt for LLM
+        const prompt = createFertilizerPrompt(formData);
+        
+        try {
+            // Call your Flask backend LLM endpoint
+            const response = await fetch('/api/fertilizer-recommendation', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                },
+                body: JSON.stringify(formData),
+                credentials: 'include'
+            });
+            
+            if (response.ok) {
+                const data = await response.json();
+                if (data.success && data.fertilizer_data) {
+                    return data.fertilizer_data;
+                }
+            }
+            
+            // If API fails, generate fallback data
+            return generateFallbackRecommendation(formData);
+            
+        } catch (error) {
+            console.error('LLM API error:', error);
+            return generateFallbackRecommendation(formData);
+        }
+    }
+
+    function createFertilizerPrompt(formData) {
+        return `You are an agricultural scientist specializing in Indian farming. Provide detailed fertilizer recommendation in JSON format.
+
+FARMER DETAILS:
+- Crop: ${formData.crop}
+- Growth Stage: ${formData.growthStage}
+- Soil Type: ${formData.soilType}
+- Farm Size: ${formData.farmSize} acres
+- Location: ${formData.location}
+- Season: ${formData.currentSeason}
+- Budget: ${formData.budgetRange}
+- Preferences: ${formData.organicPreference ? 'Organic preferred' : 'Conventional'}
+- Additional Notes: ${formData.additionalNotes || 'None'}
+
+Provide this JSON structure:
+{
+    "npk_ratio": "X:X:X",
+    "nitrogen_details": {"amount": "XX kg/acre", "role": "description", "percentage": XX},
+    "phosphorus_details": {"amount": "XX kg/acre", "role": "description", "percentage": XX},
+    "potassium_details": {"amount": "XX kg/acre", "role": "description", "percentage": XX},
+    "application_schedule": [
+        {"stage": "Basal", "timing": "At sowing/transplanting", "fertilizer": "Type", "quantity": "XX kg/acre", "method": "Application method"},
+        {"stage": "Top Dressing 1", "timing": "XX days after sowing", "fertilizer": "Type", "quantity": "XX kg/acre", "method": "Application method"},
+        {"stage": "Top Dressing 2", "timing": "XX days after sowing", "fertilizer": "Type", "quantity": "XX kg/acre", "method": "Application method"}
+    ],
+    "recommended_products": [
+        {"name": "Product Name", "type": "NPK/Organic", "npk": "X:X:X", "brand": "Brand", "approx_price": "₹ XXX/bag"},
+        {"name": "Product Name", "type": "NPK/Organic", "npk": "X:X:X", "brand": "Brand", "approx_price": "₹ XXX/bag"}
+    ],
+    "organic_alternatives": [
+        {"name": "Alternative Name", "source": "Source", "quantity": "XX kg/acre", "benefits": "Benefits"}
+    ],
+    "government_schemes": [
+        {"name": "Scheme Name", "subsidy": "XX%", "eligibility": "Eligibility criteria", "link": "Application link"}
+    ],
+    "total_required": "XXX kg",
+    "estimated_cost": "₹ X,XXX",
+    "pro_tip": "Practical tip for the farmer",
+    "plan_summary": "Brief summary of the recommendation",
+    "weather_adjustment": "How current weather affects application",
+    "cost_range": "Budget category"
+}
+
+Make it realistic for Indian farming conditions.`;
+    }
+
+    function generateFallbackRecommendation(formData) {
+        // Fallback data with realistic values
+        const cropNPK = {
+            'Rice': '60:30:30',
+            'Wheat': '120:60:40',
+            'Maize': '120:60:40',
+            'Cotton': '80:40:40',
+            'Sugarcane': '200:80:100',
+            'Vegetables': '100:50:50',
+            'default': '80:40:40'
+        };
+        
+        const npk = cropNPK[formData.crop] || cropNPK.default;
+        const [n, p, k] = npk.split(':').map(x => parseInt(x));
+        const totalPerAcre = n + p + k;
+        const totalRequired = Math.round(totalPerAcre * formData.farmSize);
+        
+        return {
+            npk_ratio: npk,
+            nitrogen_details: {
+                amount: `${n} kg/acre`,
+                role: window.fertilizerTranslations.nitrogen_role,
+                percentage: Math.round((n / totalPerAcre) * 100)
+            },
+            phosphorus_details: {
+                amount: `${p} kg/acre`,
+                role: window.fertilizerTranslations.phosphorus_role,
+                percentage: Math.round((p / totalPerAcre) * 100)
+            },
+            potassium_details: {
+                amount: `${k} kg/acre`,
+                role: window.fertilizerTranslations.potassium_role,
+                percentage: Math.round((k / totalPerAcre) * 100)
+            },
+            application_schedule: [
+                {
+                    stage: "Basal Application",
+                    timing: "At sowing/transplanting",
+                    fertilizer: "DAP + MOP",
+                    quantity: `${Math.round(p * 0.5)} kg DAP + ${Math.round(k * 0.5)} kg MOP per acre`,
+                    method: "Broadcast and mix in soil"
+                },
+                {
+                    stage: "First Top Dressing",
+                    timing: "30 days after sowing",
+                    fertilizer: "Urea",
+                    quantity: `${Math.round(n * 0.4)} kg per acre`,
+                    method: "Side dressing near roots"
+                },
+                {
+                    stage: "Second Top Dressing",
+                    timing: "60 days after sowing",
+                    fertilizer: "Urea + MOP",
+                    quantity: `${Math.round(n * 0.6)} kg Urea + ${Math.round(k * 0.5)} kg MOP per acre`,
+                    method: "Side dressing, followed by light irrigation"
+                }
+            ],
+            recommended_products: [
+                {
+                    name: "IFFCO Nano Urea",
+                    type: "Nitrogen",
+                    npk: "46:0:0",
+                    brand: "IFFCO",
+                    approx_price: "₹ 300/bag"
+                },
+                {
+                    name: "DAP",
+                    type: "Phosphorus",
+                    npk: "18:46:0",
+                    brand: "Coromandel",
+                    approx_price: "₹ 1,400/bag"
+                },
+                {
+                    name: "MOP",
+                    type: "Potassium",
+                    npk: "0:0:60",
+                    brand: "IPL",
+                    approx_price: "₹ 1,800/bag"
+                }
+            ],
+            organic_alternatives: [
+                {
+                    name: "Vermicompost",
+                    source: "Earthworm casting",
+                    quantity: "2-3 tonnes/acre",
+                    benefits: "Improves soil structure, provides slow-release nutrients"
+                },
+                {
+                    name: "Neem Cake",
+                    source: "Neem seed residue",
+                    quantity: "200-300 kg/acre",
+                    benefits: "Natural pest repellent, provides nitrogen"
+                },
+                {
+                    name: "Farmyard Manure",
+                    source: "Animal waste",
+                    quantity: "5-10 tonnes/acre",
+                    benefits: "Complete nutrient source, improves water retention"
+                }
+            ],
+            government_schemes: [
+                {
+                    name: "PM-KISAN",
+                    subsidy: "40% on fertilizers",
+                    eligibility: "All farmers with land holdings",
+                    link: "https://pmkisan.gov.in"
+                },
+                {
+                    name: "Soil Health Card",
+                    subsidy: "Free soil testing",
+                    eligibility: "All farmers",
+                    link: "https://soilhealth.dac.gov.in"
+                }
+            ],
+            total_required: `${totalRequired} kg`,
+            estimated_cost: `₹ ${Math.round(totalRequired * 40).toLocaleString()}`,
+            pro_tip: window.fertilizerTranslations.pro_tip_default,
+            plan_summary: `Optimized ${formData.crop} fertilizer plan for ${formData.soilType} soil in ${formData.currentSeason} season`,
+            weather_adjustment: "Adjust irrigation based on rainfall to prevent nutrient leaching",
+            cost_range: formData.budgetRange === 'high' ? 'Premium' : 'Cost-effective'
+        };
+    }
+
+    // ========== DISPLAY RECOMMENDATION ==========
+    function displayRecommendation(data) {
+        // Update NPK section
+        document.getElementById('npkRatio').textContent = data.npk_ratio;
+        document.getElementById('nitrogenAmount').textContent = data.nitrogen_details.amount;
+        document.getElementById('nitrogenBar').style.width = `${data.nitrogen_details.percentage}%`;
+        document.getElementById('nitrogenRole').textContent = data.nitrogen_details.role;
+        
+        document.getElementById('phosphorusAmount').textContent = data.phosphorus_details.amount;
+        document.getElementById('phosphorusBar').style.width = `${data.phosphorus_details.percentage}%`;
+        document.getElementById('phosphorusRole').textContent = data.phosphorus_details.role;
+        
+        document.getElementById('potassiumAmount').textContent = data.potassium_details.amount;
+        document.getElementById('potassiumBar').style.width = `${data.potassium_details.percentage}%`;
+        document.getElementById('potassiumRole').textContent = data.potassium_details.role;
+        
+        // Update schedule
+        const scheduleList = document.getElementById('scheduleList');
+        scheduleList.innerHTML = '';
+        
+        data.application_schedule.forEach(item => {
+            const scheduleItem = document.createElement('div');
+            scheduleItem.className = 'p-4 border border-gray-200 rounded-lg';
+            scheduleItem.innerHTML = `
+                <div class="flex justify-between items-start mb-2">
+                    <div>
+                        <div class="font-medium text-gray-800">${item.stage}</div>
+                        <div class="text-sm text-gray-600">${item.timing}</div>
+                    </div>
+                    <span class="px-2 py-1 bg-blue-100 text-blue-800 text-xs rounded">${item.fertilizer}</span>
+                </div>
+                <div class="text-sm text-gray-700 mb-1">${item.quantity}</div>
+                <div class="text-xs text-gray-500">${I18N.method_label}: ${item.method}</div>
+            `;
+            scheduleList.appendChild(scheduleItem);
+        });
+        
+        // Update products
+        const productList = document.getElementById('productList');
+        productList.innerHTML = '';
+        
+        data.recommended_products.forEach(product => {
+            const productItem = document.createElement('div');
+            productItem.className = 'p-4 border border-gray-200 rounded-lg';
+            productItem.innerHTML = `
+                <div class="flex justify-between items-start mb-2">
+                    <div>
+                        <div class="font-medium text-gray-800">${product.name}</div>
+                        <div class="text-sm text-gray-600">${product.brand} • ${product.type}</div>
+                    </div>
+                    <div class="text-right">
+                        <div class="font-medium text-gray-800">${product.npk}</div>
+                        <div class="text-sm text-green-600">${product.approx_price}</div>
+                    </div>
+                </div>
+                <div class="text-xs text-gray-500">NPK Ratio: ${product.npk}</div>
+            `;
+            productList.appendChild(productItem);
+        });
+        
+        // Update organic alternatives
+        const organicList = document.getElementById('organicList');
+        organicList.innerHTML = '';
+        
+        data.organic_alternatives.forEach(organic => {
+            const organicItem = document.createElement('div');
+            organicItem.className = 'p-4 border border-green-200 bg-green-50 rounded-lg';
+            organicItem.innerHTML = `
+                <div class="font-medium text-gray-800 mb-1">${organic.name}</div>
+                <div class="text-sm text-gray-700 mb-2">${organic.quantity}</div>
+                <div class="text-xs text-gray-600">${organic.benefits}</div>
+            `;
+            organicList.appendChild(organicItem);
+        });
+        
+        // Update government schemes
+        const schemesList = document.getElementById('schemesList');
+        schemesList.innerHTML = '';
+        
+        data.government_schemes.forEach(scheme => {
+            const schemeItem = document.createElement('div');
+            schemeItem.className = 'p-4 border border-yellow-200 bg-yellow-50 rounded-lg';
+            schemeItem.innerHTML = `
+                <div class="font-medium text-gray-800 mb-1">${scheme.name}</div>
+                <div class="text-sm text-green-600 mb-2">${scheme.subsidy} ${I18N.subsidies}</div>
+                <div class="text-xs text-gray-600 mb-2">${scheme.eligibility}</div>
+                <a href="${scheme.link}" target="_blank" class="text-xs text-blue-600 hover:text-blue-800">${I18N.learn_more} →</a>
+            `;
+            schemesList.appendChild(schemeItem);
+        });
+        
+        // Update totals and tips
+        document.getElementById('totalFertilizer').textContent = data.total_required;
+        document.getElementById('estimatedCost').textContent = data.estimated_cost;
+        document.getElementById('proTip').textContent = data.pro_tip;
+        document.getElementById('planSummary').textContent = data.plan_summary;
+        document.getElementById('weatherStatus').textContent = data.weather_adjustment;
+        document.getElementById('costRange').textContent = data.cost_range;
+    }
+
+    // ========== UI STATE MANAGEMENT ==========
+    function showLoadingState() {
+        document.getElementById('loadingState').classList.remove('hidden');
+        document.getElementById('resultsSection').classList.add('hidden');
+        document.getElementById('errorState').classList.add('hidden');
+        
+        // Disable generate button
+        const btn = document.getElementById('generateBtn');
+        btn.innerHTML = `<i class="fas fa-spinner fa-spin mr-2"></i>${window.fertilizerTranslations.generating}`;
+        btn.disabled = true;
+    }
+
+    function hideLoadingState() {
+        document.getElementById('loadingState').classList.add('hidden');
+        
+        // Re-enable generate button
+        const btn = document.getElementById('generateBtn');
+        btn.innerHTML = `<i class="fas fa-magic mr-2"></i>${window.fertilizerTranslations.generate_new}`;
+        btn.disabled = false;
+    }
+
+    function showResultsSection() {
+        document.getElementById('resultsSection').classList.remove('hidden');
+    }
+
+    function showErrorState(message) {
+        document.getElementById('errorState').classList.remove('hidden');
+        document.getElementById('errorMessage').textContent = message;
+        hideLoadingState();
+    }
+
+    function retryGeneration() {
+        document.getElementById('errorState').classList.add('hidden');
+        generateRecommendation();
+    }
+
+    // ========== ACTION BUTTONS ==========
+    function downloadPlan() {
+        alert(window.fertilizerTranslations.download_pdf + ' ' + window.fertilizerTranslations.redirecting);
+        // In production: Generate PDF from currentRecommendation data
+    }
+
+    function sharePlan() {
+        if (navigator.share) {
+            navigator.share({
+                title: `${window.fertilizerTranslations.fertilizer_page_title} - ${currentUserData?.crop || window.fertilizerTranslations.crop_rice}`,
+                text: window.fertilizerTranslations.share_plan,
+                url: window.location.href
+            });
+        } else {
+            alert(window.fertilizerTranslations.share_plan + ' ' + window.fertilizerTranslations.redirecting);
+            navigator.clipboard.writeText(window.location.href);
+        }
+    }
+
+    function setReminder() {
+        const date = prompt(window.fertilizerTranslations.enter_date, new Date().toISOString().split('T')[0]);
+        if (date) {
+            alert(`${window.fertilizerTranslations.reminder_set} ${date}!`);
+        }
+    }
+
+    function askExpert() {
+        showChatbot();
+    }
+
+    function comparePrices() {
+        alert(window.fertilizerTranslations.redirecting);
+        // In production: Redirect to market price page or open modal
+    }
+
+    // ========== CHATBOT ==========
+    function showChatbot() {
+        document.getElementById('chatbotModal').classList.remove('hidden');
+    }
+
+    function hideChatbot() {
+        document.getElementById('chatbotModal').classList.add('hidden');
+    }
+
+    async function sendChatMessage() {
+        const input = document.getElementById('chatInput');
+        const message = input.value.trim();
+        
+        if (!message) return;
+        
+        // Add user message
+        addChatMessage('user', message);
+        input.value = '';
+        
+        // Show typing indicator
+        addChatMessage('assistant', '...', true);
+        
+        try {
+            // Call chatbot API
+            const response = await fetch('/chat', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    message: message,
+                    session_id: 'fertilizer_chat',
+                    context: {
+                        topic: 'fertilizer',
+                        recommendation: currentRecommendation,
+                        user_data: currentUserData
+                    }
+                }),
+                credentials: 'include'
+            });
+            
+            if (response.ok) {
+                const data = await response.json();
+                // Remove typing indicator
+                removeTypingIndicator();
+                // Add assistant response
+                addChatMessage('assistant', data.reply);
+            } else {
+                throw new Error('Chat failed');
+            }
+            
+        } catch (error) {
+            removeTypingIndicator();
+            addChatMessage('assistant', window.fertilizerTranslations.chat_error);
+        }
+    }
+
+    function addChatMessage(role, content, isTyping = false) {
+        const chatMessages = document.getElementById('chatMessages');
+        
+        const messageDiv = document.createElement('div');
+        messageDiv.className = `mb-4 ${role === 'user' ? 'text-right' : 'text-left'}`;
+        
+        if (isTyping) {
+            messageDiv.id = 'typingIndicator';
+            messageDiv.innerHTML = `
+                <div class="inline-block px-4 py-2 bg-gray-100 rounded-lg">
+                    <div class="flex space-x-1">
+                        <div class="w-2 h-2 bg-gray-400 rounded-full animate-bounce"></div>
+                        <div class="w-2 h-2 bg-gray-400 rounded-full animate-bounce" style="animation-delay: 0.2s"></div>
+                        <div class="w-2 h-2 bg-gray-400 rounded-full animate-bounce" style="animation-delay: 0.4s"></div>
+                    </div>
+                </div>
+            `;
+        } else {
+            messageDiv.innerHTML = `
+                <div class="inline-block max-w-xs md:max-w-md px-4 py-2 rounded-lg ${role === 'user' ? 'bg-leaf text-white' : 'bg-gray-100 text-gray-800'}">
+                    ${content}
+                </div>
+            `;
+        }
+        
+        chatMessages.appendChild(messageDiv);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+    }
+
+    function removeTypingIndicator() {
+        const typingIndicator = document.getElementById('typingIndicator');
+        if (typingIndicator) {
+            typingIndicator.remove();
+        }
+    }
+
+    // ========== INITIALIZE ON LOAD ==========
+    // Load a sample recommendation on first visit
+    setTimeout(() => {
+        if (!localStorage.getItem('fertilizer_demo_shown')) {
+            // Auto-fill form with user data
+            if (currentUserData?.crop && currentUserData.crop !== I18N.not_specified) {
+                document.getElementById('cropSelect').value = currentUserData.crop;
+                localStorage.setItem('fertilizer_demo_shown', 'true');
+                
+                // Show welcome message
+                const welcomeMsg = document.createElement('div');
+                welcomeMsg.className = 'fixed bottom-4 right-4 bg-white p-4 rounded-lg shadow-lg max-w-sm z-50';
+                welcomeMsg.innerHTML = `
+                    <div class="flex justify-between items-start mb-2">
+                        <div class="font-medium text-gray-800">${window.fertilizerTranslations.welcome_title}</div>
+                        <button onclick="this.parentElement.parentElement.remove()" class="text-gray-400 hover:text-gray-600">
+                            <i class="fas fa-times"></i>
+                        </button>
+                    </div>
+                    <div class="text-sm text-gray-600 mb-3">
+                        ${window.fertilizerTranslations.welcome_message}
+                    </div>
+                    <button onclick="this.parentElement.remove(); scrollToForm()" class="w-full px-4 py-2 bg-leaf text-white rounded-lg hover:bg-green-700">
+                        ${window.fertilizerTranslations.get_recommendations}
+                    </button>
+                `;
+                document.body.appendChild(welcomeMsg);
+            }
+        }
+    }, 1000);
@@ -0,0 +1,11 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Unlike `python app.py` this does not start the debug server or open a browser.
+"""
+from app import app
+
+if __name__ == "__main__":
+    print("Run with a WSGI server, e.g.: gunicorn -c gunicorn.conf.py wsgi:app")